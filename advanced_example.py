@@ -1,6 +1,4 @@
-import csv
 from dataclasses import dataclass
-from datetime import datetime
 from typing import List, TypeVar
 
 import math
@@ -18,8 +16,10 @@ from PyQt5.QtWidgets import (
 from chart import AdvancedChartWidget
 from chart import CandleAxisX, ValueAxisY
 from chart import ChartWidget
-from chart import CandleData, DataSource, CandleDataSource
+from chart import CandleData, RingDataSource
+from chart import CandleCsvFile
 from chart import BarChartDrawer, CandleChartDrawer
+from chart import FrameProfiler
 
 T = TypeVar("T")
 
@@ -76,8 +76,9 @@ class MainWindow(QMainWindow):
         self.datas = datas
         self.data_last_index = 0
 
-        main_data_source = CandleDataSource(self)
-        sub_data_source = DataSource(self)
+        # keep only latest 3000 records
+        main_data_source = RingDataSource(3000, self)
+        sub_data_source = RingDataSource(3000, self)
 
         main_chart = ChartWidget()
         sub_chart = ChartWidget()
@@ -104,8 +105,10 @@ class MainWindow(QMainWindow):
 
         cs1 = self.advanced_chart_widget.add_chart(
             main_chart, 5
-        ).create_cross_hair()
-        cs2 = self.advanced_chart_widget.add_chart(sub_chart, 1).create_cross_hair()
+        ).create_default_cross_hair()
+        cs2 = self.advanced_chart_widget.add_chart(
+            sub_chart, 1
+        ).create_default_cross_hair()
         cs1.link_x_to(cs2)
         cs2.link_x_to(cs1)
 
@@ -120,7 +123,7 @@ class MainWindow(QMainWindow):
         self.stress_fps_tick()
         # self.t.start(1000)
 
-        self.hook_paint_event()
+        self.profile_main_chart()
 
     def _init_ui(self):
         # status layout
@@ -147,14 +150,11 @@ class MainWindow(QMainWindow):
         self.fps = fps
         self.n = n
 
-    def hook_paint_event(self):
-        org_paint_handler = self.main_chart.paintEvent
-
-        def paintEventWithFPSCounter(*args):
-            org_paint_handler(*args)
-            self.fps.tick()
-
-        self.main_chart.paintEvent = paintEventWithFPSCounter
+    def profile_main_chart(self):
+        profiler = FrameProfiler(parent=self)
+        profiler.frame_profiled.connect(lambda profile: self.fps.tick())
+        self.main_chart.profiler = profiler
+        self.main_chart.profiler_hud_visible = True
 
     def on_timer(self):
         self.add_one_data()
@@ -166,13 +166,13 @@ class MainWindow(QMainWindow):
     def add_one_data(self):
         if self.data_last_index == len(self.datas):
             self.data_last_index = 0
-            self.sub_data_source.clear()
         data = self.datas[self.data_last_index]
 
         self.main_data_source.append(data)
         self.sub_data_source.append(data.volume)
-        self.main_chart.set_x_range(0, self.data_last_index)
-        self.sub_chart.set_x_range(0, self.data_last_index)
+        x_range = self.main_data_source.first_index, len(self.main_data_source)
+        self.main_chart.set_x_range(*x_range)
+        self.sub_chart.set_x_range(*x_range)
 
         self.data_last_index += 1
         self.n.setText(
@@ -182,39 +182,29 @@ class MainWindow(QMainWindow):
         )
 
 
-def parse_datetime(dt_str: str):
-    return datetime.strptime(dt_str, "%Y-%m-%d")
-
-
 def gen_wave(i, p=0, T=360, a=1000):
     return a * math.sin((i - p) / T * math.pi)
 
 
 def read_data():
-    with open("Stk_Day.csv", "rt", encoding="gbk") as f:
-        reader = csv.DictReader(f)
-        i = 0
-        for item in reader:
-            symbol = item["代码"]
-            if symbol != "SH600000":
-                continue
-            # 代码, 时间, 开盘价, 最高价, 最低价, 收盘价, 成交量(股), 成交额(元)
-            open_price = float(item["开盘价"])
-            high = float(item["最高价"])
-            low = float(item["最低价"])
-            close = float(item["收盘价"])
-            dt_str = item["时间"]
-            datetime = parse_datetime(dt_str)
-            bar_data = MyData(
-                open_price=open_price,
-                low_price=low,
-                high_price=high,
-                close_price=close,
-                datetime=datetime,
-                volume=gen_wave(i, 31) + gen_wave(i, 15, 70) + gen_wave(i, 30, 80),
-            )
-            i += 1
-            yield bar_data
+    columns = CandleCsvFile("Stk_Day.csv").read_columns("SH600000")
+    for i, (open_price, low, high, close, datetime) in enumerate(
+        zip(
+            columns["open_price"].tolist(),
+            columns["low_price"].tolist(),
+            columns["high_price"].tolist(),
+            columns["close_price"].tolist(),
+            columns["datetime"].tolist(),
+        )
+    ):
+        yield MyData(
+            open_price=open_price,
+            low_price=low,
+            high_price=high,
+            close_price=close,
+            datetime=datetime,
+            volume=gen_wave(i, 31) + gen_wave(i, 15, 70) + gen_wave(i, 30, 80),
+        )
 
 
 def main():
@@ -0,0 +1,356 @@
+"""
+Benchmark of the drawing pipeline of ChartWidget, under the offscreen platform.
+
+Charts of Stk_Day.csv and of synthetic candles(random walk) are measured:
+  * memory per bar of the DataSource, and of the whole process after the first frame
+  * time of the first frame(caches of drawers generated) and of the first zoomed out frame
+  * frame time broken down by _prepare_painting, _paint_axis, _paint_drawers, _paint_box_edge
+    (with layer cache disabled, so every frame paints everything)
+  * frame rate of scrolling(1 bar per frame) and zooming, with layer cache enabled
+    (ChartWidget.use_layer_cache, off by default)
+The QtChart based chart in legacy/main.py is measured the same way if PyQt5.QtChart is installed.
+
+usage:
+    python benchmark.py [--sizes 1000 100000 1000000 10000000] [--lod] [--output result.json]
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from chart import (  # noqa: E402
+    CandleArrayDataSource,
+    CandleAxisX,
+    CandleChartDrawer,
+    CandleCsvFile,
+    ChartWidget,
+    ValueAxisY,
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CSV_PATH = os.path.join(HERE, "Stk_Day.csv")
+LEGACY_PATH = os.path.join(HERE, "legacy", "main.py")
+
+_app: Optional[QApplication] = None  # kept alive until the end of main()
+
+PHASES = ("_prepare_painting", "_paint_axis", "_paint_drawers", "_paint_box_edge")
+
+
+def synthetic_columns(n: int, seed: int = 0) -> Dict[str, "np.ndarray"]:
+    """n 1-minute candles of a random walk"""
+    random = np.random.default_rng(seed)
+    close = 100 + np.cumsum(random.normal(0, 1, n))
+    open = np.append(100, close[:-1])
+    spread = np.abs(random.normal(0, 0.5, (2, n)))
+    return {
+        "datetime": np.datetime64("1990-01-01", "us") + np.arange(n) * np.timedelta64(1, "m"),
+        "open_price": open,
+        "high_price": np.maximum(open, close) + spread[0],
+        "low_price": np.minimum(open, close) - spread[1],
+        "close_price": close,
+    }
+
+
+def csv_columns() -> Dict[str, "np.ndarray"]:
+    """all the records of Stk_Day.csv"""
+    csv = CandleCsvFile(CSV_PATH)
+    try:
+        return csv.read_columns()
+    finally:
+        csv.close()
+
+
+def rss() -> Optional[int]:
+    """resident memory of this process in bytes, None if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """milliseconds of samples(in seconds)"""
+    ms = sorted(i * 1000 for i in samples)
+    return {
+        "median_ms": statistics.median(ms),
+        "p95_ms": ms[min(int(len(ms) * 0.95), len(ms) - 1)],
+        "max_ms": ms[-1],
+    }
+
+
+class PhaseTimer:
+    """time methods of a chart by wrapping them on the instance"""
+
+    def __init__(self, chart: "ChartWidget", names=PHASES):
+        self.samples: Dict[str, List[float]] = {name: [] for name in names}
+        self._current: Dict[str, float] = {}
+        for name in names:
+            setattr(chart, name, self._wrap(name, getattr(chart, name)))
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._current[name] = self._current.get(name, 0) + time.perf_counter() - start
+
+        return wrapper
+
+    def end_frame(self):
+        for name, samples in self.samples.items():
+            samples.append(self._current.get(name, 0))
+        self._current.clear()
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def fps(frame_times: List[float]) -> float:
+    return len(frame_times) / sum(frame_times) if frame_times else 0
+
+
+def bench_chart(columns: Dict[str, "np.ndarray"], args) -> Dict[str, Any]:
+    n = len(columns["close_price"])
+    window = min(args.window, n)
+    gc.collect()
+    rss_before = rss()
+
+    tracemalloc.start()
+    load_time = time.perf_counter()
+    data_source = CandleArrayDataSource(capacity=n)
+    data_source.extend_columns(**columns)
+    load_time = time.perf_counter() - load_time
+    data_source_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    chart = ChartWidget()
+    chart.resize(args.width, args.height)
+    drawer = CandleChartDrawer(data_source)
+    drawer.use_lod = args.lod
+    chart.add_drawer(drawer)
+    chart.add_axis(CandleAxisX(data_source), ValueAxisY())
+    chart.show()
+
+    result: Dict[str, Any] = {"bars": n, "window": window, "load_ms": load_time * 1000}
+
+    # first frames: caches of drawers, MinMaxIndex and Pyramid are built
+    chart.set_x_range(n - window, n)
+    result["first_frame_ms"] = timed(chart.grab) * 1000
+    chart.set_x_range(0, n)
+    result["first_zoomed_out_frame_ms"] = timed(chart.grab) * 1000
+    rss_after = rss()
+    result["memory"] = {
+        "data_source_bytes_per_bar": data_source_bytes / n,
+        "process_bytes_per_bar": None
+        if rss_before is None
+        else (rss_after - rss_before) / n,
+    }
+
+    # frames painting everything, broken down by phase
+    chart.use_layer_cache = False
+    frames = {}
+    for name, x_range in (("window", (n - window, n)), ("zoomed_out", (0, n))):
+        chart.set_x_range(*x_range)
+        chart.grab()
+        timer = PhaseTimer(chart)
+        totals = []
+        for _ in range(args.frames):
+            totals.append(timed(chart.grab))
+            timer.end_frame()
+        frames[name] = {
+            "total": summarize(totals),
+            "phases": {phase: summarize(s) for phase, s in timer.samples.items()},
+        }
+        for phase in PHASES:
+            delattr(chart, phase)  # remove wrappers
+    result["frame"] = frames
+    chart.use_layer_cache = True
+
+    # scrolling and zooming with cached layers
+    chart.set_x_range(max(n - window - args.frames, 0), max(n - args.frames, window))
+    chart.grab()
+    scroll = []
+    for _ in range(args.frames):
+        chart.scroll_x(1)
+        scroll.append(timed(chart.grab))
+    zoom = []
+    for i in range(args.frames):
+        width = window if i % 2 else max(window // 2, 1)
+        chart.set_x_range(n - width, n)
+        zoom.append(timed(chart.grab))
+    result["scroll"] = {"fps": fps(scroll), **summarize(scroll)}
+    result["zoom"] = {"fps": fps(zoom), **summarize(zoom)}
+
+    chart.close()
+    chart.deleteLater()
+    QApplication.processEvents()
+    return result
+
+
+def load_legacy():
+    """legacy/main.py as a module, None if PyQt5.QtChart is not available"""
+    try:
+        spec = importlib.util.spec_from_file_location("legacy_main", LEGACY_PATH)
+        module = importlib.util.module_from_spec(spec)
+        # dataclasses look up the module of a class in sys.modules
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+    except ImportError:
+        sys.modules.pop("legacy_main", None)
+        return None
+
+
+def bench_legacy(legacy, columns: Dict[str, "np.ndarray"], args) -> Dict[str, Any]:
+    n = len(columns["close_price"])
+    window = min(args.window, n)
+    bars = [
+        legacy.BarData("", o, l, h, c, dt)
+        for o, l, h, c, dt in zip(
+            columns["open_price"].tolist(),
+            columns["low_price"].tolist(),
+            columns["high_price"].tolist(),
+            columns["close_price"].tolist(),
+            columns["datetime"].tolist(),
+        )
+    ]
+    view = legacy.CandlestickView()
+    view.resize(args.width, args.height)
+    view.show()
+
+    def frame():
+        # redraw of legacy chart is scheduled by a QTimer
+        QApplication.processEvents()
+        view.grab()
+
+    result: Dict[str, Any] = {"bars": n, "window": window}
+    start = time.perf_counter()
+    for bar in bars:
+        view.append_record(bar)
+    result["load_ms"] = (time.perf_counter() - start) * 1000
+    view.set_days_to_show(window)
+    result["first_frame_ms"] = timed(frame) * 1000
+
+    frames = [timed(frame) for _ in range(args.frames)]
+    result["frame"] = {"window": {"total": summarize(frames)}}
+    scroll = []
+    for i in range(args.frames):
+        view.set_showing_index_end(-i - 1)
+        scroll.append(timed(frame))
+    zoom = []
+    for i in range(args.frames):
+        view.set_days_to_show(window if i % 2 else max(window // 2, 1))
+        zoom.append(timed(frame))
+    result["scroll"] = {"fps": fps(scroll), **summarize(scroll)}
+    result["zoom"] = {"fps": fps(zoom), **summarize(zoom)}
+
+    view.close()
+    view.deleteLater()
+    QApplication.processEvents()
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+
+def print_result(name: str, result: Dict[str, Any]):
+    frame = result["frame"]["window"]["total"]
+    print(
+        f"{name:<22}{result['bars']:>10} bars"
+        f"  first frame {result['first_frame_ms']:8.1f}ms"
+        f"  frame {frame['median_ms']:7.2f}ms"
+        f"  scroll {result['scroll']['fps']:7.1f}fps"
+        f"  zoom {result['zoom']['fps']:7.1f}fps"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="*", default=[1000, 100000, 1000000, 10000000],
+        help="numbers of synthetic bars",
+    )
+    parser.add_argument("--no-csv", action="store_true", help="skip Stk_Day.csv")
+    parser.add_argument("--frames", type=int, default=30, help="frames measured for each test")
+    parser.add_argument("--window", type=int, default=1000, help="bars shown when not zoomed out")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument(
+        "--legacy-max", type=int, default=100000,
+        help="largest number of bars to measure with legacy QtChart chart",
+    )
+    parser.add_argument(
+        "--lod", action="store_true",
+        help="merge candles of a pixel column(CandleChartDrawer.use_lod), "
+        "faster with millions of bars but not identical to drawing every candle",
+    )
+    parser.add_argument("--output", help="write results as json into this file")
+    args = parser.parse_args()
+
+    global _app
+    _app = QApplication.instance() or QApplication([])
+    legacy = load_legacy()
+    if legacy is None:
+        print("PyQt5.QtChart is not available, legacy chart is skipped.")
+
+    datasets = [] if args.no_csv else [("Stk_Day.csv", csv_columns)]
+    datasets += [(f"synthetic-{n}", lambda n=n: synthetic_columns(n)) for n in args.sizes]
+
+    results = []
+    for name, create_columns in datasets:
+        columns = create_columns()
+        result = {"dataset": name, "chart": bench_chart(columns, args)}
+        print_result(name, result["chart"])
+        if legacy is not None and len(columns["close_price"]) <= args.legacy_max:
+            result["legacy"] = bench_legacy(legacy, columns, args)
+            print_result(f"{name} (legacy)", result["legacy"])
+        results.append(result)
+        del columns
+        gc.collect()
+
+    output = {
+        "environment": environment(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "legacy_available": legacy is not None,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
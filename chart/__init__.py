@@ -22,7 +22,34 @@ from .axis import (
     ValueSequenceGenerator,
 )
 from .base import Alignment, DrawConfig, DrawingCache, Orientation
-from .data_source import CandleData, CandleDataSource, DataSource, DataSourceQObject
-from .drawer import BarChartDrawer, CandleChartDrawer, ChartDrawerBase, HistogramDrawer
+from .text_cache import TextCache
+from .ticks import TickGenerator, Ticks, nice_step
+from .label_cache import DateTimeLabelCache, format_datetimes
+from .data_source import (
+    ArrayDataSource,
+    CandleArrayDataSource,
+    CandleData,
+    CandleDataSource,
+    DataSource,
+    DataSourceQObject,
+    RingDataSource,
+)
+from .mmap_data_source import MmapCandleDataSource
+from .ingest import IngestQueue
+from .loader import CandleCsvFile
+from .range_index import MinMaxIndex
+from .pyramid import Pyramid, PyramidLevel
+from .rect_array import RectArray
+from .drawer import (
+    BarChartDrawer,
+    CandleChartDrawer,
+    ChartDrawerBase,
+    ChartDrawerQObject,
+    HistogramDrawer,
+)
+from .profiling import FrameProfile, FrameProfiler
+from .scheduler import FrameScheduler
+from .render_thread import RenderThread
 from .chart import ChartWidget
 from .advanced_chart import AdvancedChartWidget
+from .batch import BatchRenderer, RenderJob, RenderResult, create_candle_chart
@@ -1,12 +1,14 @@
 from typing import List, Optional, TypeVar, Union
 
-from PyQt5.QtCore import QObject, pyqtSignal
-from PyQt5.QtGui import QMouseEvent, QPainter
+from PyQt5.QtCore import QObject, QRect, QRectF, pyqtSignal
+from PyQt5.QtGui import QFontMetricsF, QMouseEvent, QPainter
 from PyQt5.QtWidgets import QVBoxLayout, QWidget
 
-from .axis import AutoGeneratedAxisDataSource, AxisBase
+from .axis import (AutoGeneratedAxisDataSource, AxisBase, LineGridDrawer, TEXT_FLAG,
+                   TextLabelDrawer)
 from .base import Alignment, DrawConfig, Orientation
 from .chart import ChartWidget
+from .scheduler import FrameScheduler
 
 T = TypeVar("T")
 
@@ -16,6 +18,13 @@ class CrossHairAxisQObject(QObject):
 
 
 class CrossHairAxis(AxisBase):
+    """
+    An overlay axis showing a line and a label at the value under cursor.
+
+    It uses the style and label format of underlying_axis,
+    but has its own grid and label DataSource, so underlying_axis is never touched.
+    dirty_rects() tells which part of the chart should be re-painted after the value changed.
+    """
 
     def __init__(self,
                  orientation: "Orientation",
@@ -24,12 +33,18 @@ class CrossHairAxis(AxisBase):
                  ):
         super().__init__(orientation)
         self.qobject = CrossHairAxisQObject(parent)
+        self.overlay = True
 
         self.underlying_axis = underlying_axis
         self._drawer_value = 0
 
         self._links: List[CrossHairAxis] = []
         self._last_config: Optional["DrawConfig"] = None
+        self._painted_rect: Optional["QRect"] = None
+
+        self.grid_drawer = LineGridDrawer(self)
+        self.label_drawer = TextLabelDrawer(self)
+        self._label_source_of = None  # label DataSource of underlying_axis copied from
 
     def set_value_by_ui_pos(self, pos: int):
         if self._last_config is None:
@@ -55,39 +70,104 @@ class CrossHairAxis(AxisBase):
         if self not in target._links:
             target._links.append(self)
 
+    def dirty_rects(self) -> List["QRect"]:
+        """
+        areas of the chart to re-paint after the value changed(in UI coordinate):
+        what was painted last time, and what is going to be painted.
+        """
+        rects = [self._painted_rect, self._rect_of(self._drawer_value)]
+        if rects[1] is None:
+            # hidden: the chart doesn't call this axis anymore, so nothing is going to be painted
+            # after the old one is erased by re-painting these rects.
+            self._painted_rect = None
+        return [i for i in rects if i is not None]
+
     def prepare_draw_axis(self, config: "DrawConfig", painter: "QPainter") -> None:
         self._last_config = config
-        self.underlying_axis.prepare_draw_axis(config, painter)
+        self._painted_rect = None  # set again by draw_grids()/draw_labels() if they paint
+        # look the same as underlying axis
+        underlying = self.underlying_axis
+        self.label_spacing_to_plot_area = underlying.label_spacing_to_plot_area
+        if isinstance(underlying.grid_drawer, LineGridDrawer):
+            self.grid_drawer.grid_color = underlying.grid_drawer.grid_color
+        if isinstance(underlying.label_drawer, TextLabelDrawer):
+            self.label_drawer.label_color = underlying.label_drawer.label_color
+            self.label_drawer.label_font = underlying.label_drawer.label_font
 
     def prepare_draw_grids(self, config: "DrawConfig", painter: "QPainter") -> None:
-        self.underlying_axis.prepare_draw_grids(config, painter)
+        ds = self.grid_drawer.data_source
+        ds.clear()
+        ds.append_by_index(self._drawer_value, Alignment.MID)
 
     def prepare_draw_labels(self, config: "DrawConfig", painter: "QPainter") -> None:
-        self.underlying_axis.prepare_draw_labels(config, painter)
+        self._update_label_data_source(self._drawer_value)
 
     def draw_grids(self, config: "DrawConfig", painter: QPainter):
-        assert isinstance(
-            self.underlying_axis.grid_drawer.data_source, AutoGeneratedAxisDataSource
-        )
-        ds = self.underlying_axis.grid_drawer.data_source
-        ds.clear()
-
-        value = self._drawer_value
-        ds.append_by_index(value, Alignment.MID)
-
-        self.underlying_axis.draw_grids(config, painter)
+        super().draw_grids(config, painter)
+        self._painted_rect = self._rect_of(self._drawer_value)
 
     def draw_labels(self, config: "DrawConfig", painter: QPainter):
-        assert isinstance(
-            self.underlying_axis.label_drawer.data_source, AutoGeneratedAxisDataSource
-        )
-        ds: "AutoGeneratedAxisDataSource" = self.underlying_axis.label_drawer.data_source
+        super().draw_labels(config, painter)
+        self._painted_rect = self._rect_of(self._drawer_value)
+
+    def _update_label_data_source(self, value: float):
+        """generate label of value with the label DataSource of underlying axis"""
+        underlying = self._underlying_label_data_source()
+        if self._label_source_of is not underlying:
+            # same type and same settings(format, etc.) but not the same records
+            self.label_drawer.data_source = underlying.create_empty()
+            self._label_source_of = underlying
+        ds = self.label_drawer.data_source
         ds.clear()
+        ds.append_by_index(value, Alignment.MID)
 
-        value = self._drawer_value
+    def _label_texts_of(self, value: float) -> List[str]:
+        """texts of the label of value, generated without touching the label DataSource"""
+        ds = self._underlying_label_data_source().create_empty()
         ds.append_by_index(value, Alignment.MID)
+        return [text_info.text for text_info in ds]
+
+    def _underlying_label_data_source(self) -> "AutoGeneratedAxisDataSource":
+        underlying = self.underlying_axis.label_drawer.data_source
+        assert isinstance(underlying, AutoGeneratedAxisDataSource)
+        return underlying
 
-        self.underlying_axis.draw_labels(config, painter)
+    def _rect_of(self, value: float) -> Optional["QRect"]:
+        """
+        area covered by the line and the label of value, in UI coordinate.
+        None if nothing would be painted.
+        """
+        config = self._last_config
+        if config is None or config.drawing_cache is None:
+            return None
+        if not (self.axis_visible and (self.grid_visible or self.label_visible)):
+            return None
+        drawing_cache = config.drawing_cache
+        plot_area = drawing_cache.plot_area
+        spacing = self.label_spacing_to_plot_area
+
+        width, height = 0, 0
+        if self.label_visible:
+            metrics = QFontMetricsF(self.label_drawer.label_font)
+            for text in self._label_texts_of(value):
+                rect = metrics.boundingRect(QRectF(0, 0, 1000, 1000), TEXT_FLAG, text)
+                width, height = max(width, rect.width()), max(height, rect.height())
+        # labels of any alignment lie within this margin
+        margin = max(width, height) + 2
+
+        if self.orientation is Orientation.HORIZONTAL:
+            ui_x = drawing_cache.drawer_x_to_ui(value)
+            rect = QRectF(
+                ui_x - margin,
+                plot_area.top() - 1,
+                margin * 2,
+                plot_area.height() + spacing + height + 4,
+            )
+        else:
+            ui_y = drawing_cache.drawer_y_to_ui(value)
+            left = plot_area.left() - spacing - width - 4
+            rect = QRectF(left, ui_y - margin, plot_area.right() + 1 - left, margin * 2)
+        return rect.toAlignedRect()
 
 
 class CrossHairAxisX(CrossHairAxis):
@@ -156,11 +236,16 @@ class SubChartWrapper:
         self.cross_hair_y = axis
 
     def _add_cross_hair(self, axis):
-        axis.qobject.updated.connect(self.on_cross_hair_updated)
+        axis.qobject.updated.connect(lambda: self.on_cross_hair_updated(axis))
         self.chart.add_axis(axis)
 
-    def on_cross_hair_updated(self):
-        self.chart.update()
+    def on_cross_hair_updated(self, axis: Optional["CrossHairAxis"] = None):
+        # re-paint only where the cross hair was and where it will be
+        if axis is None:
+            self.chart.schedule_repaint()
+            return
+        for rect in axis.dirty_rects():
+            self.chart.schedule_repaint(rect)
 
     def create_default_cross_hair(self):
         self.create_cross_hair_x()
@@ -188,10 +273,20 @@ class AdvancedChartWidget(QWidget):
 
     You can add multiple BarChartWidget into one ABC.
     ABC also provide an CrossHair showing information about the value under cursor.
+
+    All the sub charts share one FrameScheduler: scrolling, setting x range or moving cross hair
+    repaints all of them in one pass, at most scheduler.max_fps times per second.
+
+    If use_layer_cache is enabled(it is enabled by default), it is enabled for every sub chart
+    added(see ChartWidget.use_layer_cache): moving the cross hair only blits cached layers,
+    and scrolling paints only the strip exposed.
+    Call invalidate_layers() after changing styles of drawers or axis of sub charts.
     """
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.scheduler = FrameScheduler(parent=self)
+        self.use_layer_cache = True
         self.__init_ui()
         self._sub_wrappers: List["SubChartWrapper"] = []
 
@@ -247,6 +342,9 @@ class AdvancedChartWidget(QWidget):
                 chart.add_axis(cross_hair_x)
             if cross_hair_y:
                 chart.add_axis(cross_hair_y)
+            chart.scheduler = self.scheduler
+            if self.use_layer_cache:
+                chart.use_layer_cache = True
             wrapper = SubChartWrapper(chart, cross_hair_x, cross_hair_y)
             self.main_layout.addWidget(chart, weight)
             self._sub_wrappers.append(wrapper)
@@ -259,6 +357,11 @@ class AdvancedChartWidget(QWidget):
 
             return wrapper
 
+    def invalidate_layers(self):
+        """drop cached layers of every sub chart, see ChartWidget.invalidate_layers()"""
+        for chart in self.charts:
+            chart.invalidate_layers()
+
     def get_x_range(self, chart: Optional[Union["SubChartWrapper", "ChartWidget"]] = None):
         """
         return x_range of specific sub chart
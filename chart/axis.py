@@ -4,13 +4,18 @@ Every
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
 
-from PyQt5.QtCore import QPointF, QRectF, Qt
-from PyQt5.QtGui import QColor, QFont, QPainter, QPalette, QPen
+import numpy as np
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPalette, QPen
 
 from .base import Alignment, DrawConfig, Orientation
 from .data_source import CandleDataSource, DataSource
+from .label_cache import DateTimeLabelCache, format_datetimes
+from .rect_array import line_array
+from .text_cache import TextCache
+from .ticks import TickGenerator, Ticks
 
 T = TypeVar("T")
 
@@ -28,6 +33,8 @@ class AxisBase(ABC):
     def __init__(self, orientation: "Orientation"):
         self.orientation = orientation
         self.axis_visible: bool = True
+        # overlay axis is painted above drawers and never cached by the chart, see ChartWidget
+        self.overlay: bool = False
 
         self.grid_drawer: Optional["GridDrawer"] = LineGridDrawer(self)
         self.grid_visible: bool = True
@@ -131,13 +138,14 @@ class LineGridDrawer(GridDrawer, ABC):
         grid_top = drawing_cache.plot_area.top()
         grid_bottom = drawing_cache.plot_area.bottom()
         # for grid in self.data_source:
-        # ui_x = drawing_cache.drawer_x_to_ui(grid.value)
-        for value in self.data_source:
-            ui_x = drawing_cache.drawer_x_to_ui(value)
-            top_point = QPointF(ui_x, grid_top)
-            # bottom_point = QPointF(ui_x, grid_bottom + grid.tail_length)
-            bottom_point = QPointF(ui_x, grid_bottom)
-            painter.drawLine(top_point, bottom_point)
+        # bottom_point = QPointF(ui_x, grid_bottom + grid.tail_length)
+        # all the grids are mapped at once and drawn by a single drawLines()
+        ui_xs = drawing_cache.drawer_xs_to_ui(self._values())
+        lines = np.empty((len(ui_xs), 4))
+        lines[:, 0] = lines[:, 2] = ui_xs
+        lines[:, 1] = grid_top
+        lines[:, 3] = grid_bottom
+        painter.drawLines(line_array(lines))
 
     def draw_y(self, config: "DrawConfig", painter: QPainter):
         painter.setPen(QPen(QColor(self.grid_color)))
@@ -147,13 +155,16 @@ class LineGridDrawer(GridDrawer, ABC):
         grid_right = drawing_cache.plot_area.right()
 
         # for grid in self.data_source:
-        # ui_y = drawing_cache.drawer_y_to_ui(grid.value)
         # left_point = QPointF(grid_left - grid.tail_length, ui_y)
-        for value in self.data_source:
-            ui_y = drawing_cache.drawer_y_to_ui(value)
-            left_point = QPointF(grid_left, ui_y)
-            right_point = QPointF(grid_right, ui_y)
-            painter.drawLine(left_point, right_point)
+        ui_ys = drawing_cache.drawer_ys_to_ui(self._values())
+        lines = np.empty((len(ui_ys), 4))
+        lines[:, 0] = grid_left
+        lines[:, 2] = grid_right
+        lines[:, 1] = lines[:, 3] = ui_ys
+        painter.drawLines(line_array(lines))
+
+    def _values(self) -> "np.ndarray":
+        return np.fromiter(self.data_source, dtype="f8", count=len(self.data_source))
 
 
 TEXT_FLAG = Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap
@@ -174,18 +185,54 @@ class TextLabelDataSource(AxisDataSource):
 
 
 class DateTimeDataSource(AxisDataSource):
+    """
+    if use_label_cache is enabled, every datetime is formatted only once,
+    and datetime64 not formatted yet are formatted together by format_datetimes().
+    """
+
+    # number of labels to keep before the cache is dropped
+    label_cache_capacity = 4096
 
     def __init__(self, format: str = None):
         super().__init__()
         if format is None:
             format = "%Y-%m-%d"
         self.format = format
+        self.use_label_cache = True
+        self._labels: Dict[Tuple[str, Any], str] = {}
+
+    def create_empty(self) -> "DateTimeDataSource":
+        return self._copy_settings_to(type(self)(self.format))
+
+    def _copy_settings_to(self, data_source: "DateTimeDataSource") -> "DateTimeDataSource":
+        data_source.use_label_cache = self.use_label_cache
+        data_source.label_cache_capacity = self.label_cache_capacity
+        return data_source
 
     def append_by_sequence(
         self, xs: List[float], align: "Alignment", dts: List[datetime]
     ):
-        for x, dt in zip(xs, dts):
-            self.append(TextLabelInfo(x, dt.strftime(self.format), align))
+        if self.use_label_cache:
+            texts = self._format_cached(dts)
+        else:
+            texts = [dt.strftime(self.format) for dt in dts]
+        for x, text in zip(xs, texts):
+            self.append(TextLabelInfo(x, text, align))
+
+    def _format_cached(self, dts: List[datetime]) -> List[str]:
+        labels, format = self._labels, self.format
+        keys = [(format, dt) for dt in dts]
+        missing = list(dict.fromkeys(key for key in keys if key not in labels))
+        if missing:
+            if len(labels) + len(missing) > self.label_cache_capacity:
+                labels.clear()
+            dts = [dt for _, dt in missing]
+            if isinstance(dts[0], np.datetime64):
+                texts = format_datetimes(dts, format)
+            else:
+                texts = [dt.strftime(format) for dt in dts]
+            labels.update(zip(missing, texts))
+        return [labels[key] for key in keys]
 
 
 class ValueLabelDataSource(AutoGeneratedAxisDataSource):
@@ -198,26 +245,65 @@ class ValueLabelDataSource(AutoGeneratedAxisDataSource):
 
         self.data_list: List["float"] = []
 
+    def create_empty(self) -> "ValueLabelDataSource":
+        return type(self)(self.format)
+
     def append_by_index(self, x: float, align: "Alignment" = Alignment.BEFORE):
         self.append(TextLabelInfo(x, self.format % x, align))
 
 
 class CandleLabelDataSource(AutoGeneratedAxisDataSource, DateTimeDataSource):
+    """
+    if use_label_cache is enabled, labels are read from the DateTimeLabelCache
+    of (candle_data_source, format), shared by every axis of that candle_data_source.
+    A candle_data_source which is not a DataSource(such as a list of candles)
+    has no signals to keep a cache up to date, so it is always formatted with strftime().
+    """
 
     def __init__(self, candle_data_source: CandleDataSource, format: str = None):
         super().__init__()
         DateTimeDataSource.__init__(self, format)
         self.candle_data_source: CandleDataSource = candle_data_source
 
+    def create_empty(self) -> "CandleLabelDataSource":
+        return self._copy_settings_to(type(self)(self.candle_data_source, self.format))
+
+    @property
+    def label_cache(self) -> "DateTimeLabelCache":
+        return DateTimeLabelCache.of(self.candle_data_source, self.format)
+
     def append_by_index(self, x: int, align: "Alignment" = Alignment.BEFORE):
+        if self._uses_label_cache():
+            text = self.label_cache.get(int(x))
+            if text is not None:
+                self.append(TextLabelInfo(x, text, align))
+            return
         try:
             data = self.candle_data_source[int(x)]
             self.append(TextLabelInfo(x, data.datetime.strftime(self.format), align))
         except IndexError:
             pass
 
+    def append_by_index_sequence(
+        self, xs: List[float], align: "Alignment" = Alignment.BEFORE
+    ):
+        if not self._uses_label_cache():
+            super().append_by_index_sequence(xs, align)
+            return
+        texts = self.label_cache.get_many([int(x) for x in xs])
+        for x, text in zip(xs, texts):
+            if text is not None:
+                self.append(TextLabelInfo(x, text, align))
+
+    def _uses_label_cache(self) -> bool:
+        return self.use_label_cache and isinstance(self.candle_data_source, DataSource)
+
 
 class TextLabelDrawer(LabelDrawer, ABC):
+    """
+    if use_text_cache is enabled, size and layout of every text are kept in text_cache,
+    so a label shown again(such as a price label while scrolling) isn't measured or shaped again.
+    """
 
     def __init__(self, axis: "AxisBase"):
         super().__init__(axis)
@@ -225,6 +311,8 @@ class TextLabelDrawer(LabelDrawer, ABC):
         self.label_color = palette.color(QPalette.Foreground)
         self.label_font = QFont()
         self.data_source = TextLabelDataSource()
+        self.use_text_cache = True
+        self.text_cache = TextCache()
 
     def draw(self, config: "DrawConfig", painter: QPainter):
         painter.setPen(QPen(QColor(self.label_color)))
@@ -239,23 +327,22 @@ class TextLabelDrawer(LabelDrawer, ABC):
         text_top = (
             drawing_cache.plot_area.bottom() + 1 + self.axis.label_spacing_to_plot_area
         )
+        layout_of = self._text_layout_function(painter)
 
         for text_info in self.data_source:  # type: TextLabelInfo
             ui_x = drawing_cache.drawer_x_to_ui(text_info.value)
             text = text_info.text
-            rect = painter.boundingRect(0, 0, 1000, 1000, TEXT_FLAG, text)
-            text_width = rect.height()
+            static_text, width, height = layout_of(text)
+            text_width = height
 
             align = text_info.align
             if align is Alignment.BEFORE:
-                pos = QRectF(ui_x - text_width, text_top, rect.width(), rect.height())
+                pos = QRectF(ui_x - text_width, text_top, width, height)
             elif align is Alignment.MID:
-                pos = QRectF(
-                    ui_x - text_width / 2, text_top, rect.width(), rect.height()
-                )
+                pos = QRectF(ui_x - text_width / 2, text_top, width, height)
             else:
-                pos = QRectF(ui_x, text_top, rect.width(), rect.height())
-            painter.drawText(pos, text)
+                pos = QRectF(ui_x, text_top, width, height)
+            self._draw_text(painter, pos, text, static_text)
 
     def draw_y(self, config: "DrawConfig", painter: QPainter):
         drawing_cache = config.drawing_cache
@@ -263,37 +350,59 @@ class TextLabelDrawer(LabelDrawer, ABC):
         label_right = (
             drawing_cache.plot_area.left() - 1 - self.axis.label_spacing_to_plot_area
         )
+        layout_of = self._text_layout_function(painter)
 
         for text_info in self.data_source:  # type: TextLabelInfo
             ui_y = drawing_cache.drawer_y_to_ui(text_info.value)
             text = text_info.text
-            rect: QRectF = painter.boundingRect(0, 0, 1000, 1000, TEXT_FLAG, text)
-            label_width = rect.width()
-            label_height = rect.height()
+            static_text, label_width, label_height = layout_of(text)
 
             align = text_info.align
             if align is Alignment.BEFORE:
                 pos = QRectF(
                     label_right - label_width,
                     ui_y + label_height,
-                    rect.width(),
-                    rect.height(),
+                    label_width,
+                    label_height,
                 )
             elif align is Alignment.MID:
                 pos = QRectF(
                     label_right - label_width,
                     ui_y - label_height / 2,
-                    rect.width(),
-                    rect.height(),
+                    label_width,
+                    label_height,
                 )
             else:
                 pos = QRectF(
                     label_right - label_width,
                     ui_y - label_height,
-                    rect.width(),
-                    rect.height(),
+                    label_width,
+                    label_height,
                 )
+            self._draw_text(painter, pos, text, static_text)
+
+    def _text_layout_function(self, painter: "QPainter"):
+        """return a function: text => (QStaticText or None, width, height)"""
+        if self.use_text_cache:
+            font_key = self.label_font.key()
+            cache = self.text_cache
+
+            def layout_of(text: str):
+                return cache.get(painter, text, TEXT_FLAG, font_key)
+
+        else:
+
+            def layout_of(text: str):
+                rect = painter.boundingRect(0, 0, 1000, 1000, TEXT_FLAG, text)
+                return None, rect.width(), rect.height()
+
+        return layout_of
+
+    def _draw_text(self, painter: "QPainter", pos: "QRectF", text: str, static_text):
+        if static_text is None:
             painter.drawText(pos, text)
+        else:
+            painter.drawStaticText(pos.topLeft(), static_text)
 
 
 class ValueSequenceGenerator:
@@ -319,11 +428,16 @@ class ValueSequenceGenerator:
 
 
 class ValueAxis(AxisBase):
+    """
+    grids and labels are placed at round values by tick_generator, see TickGenerator.
+    about label_count ticks are shown, fewer if labels would overlap.
+    """
 
     def __init__(self, orientation: "Orientation"):
         super().__init__(orientation)
         self.format: str = "%.2f"
         self.label_count = 10
+        self.tick_generator = TickGenerator(self.label_count)
 
         self.grid_drawer = LineGridDrawer(self)
         self.label_drawer = TextLabelDrawer(self)
@@ -332,17 +446,40 @@ class ValueAxis(AxisBase):
         self.label_drawer.data_source = self.label_data_source
 
     def prepare_draw_grids(self, config: "DrawConfig", painter: "QPainter") -> None:
-        seq = ValueSequenceGenerator(self, self.label_count).prepare(config, painter)
+        seq = self.ticks(config).values
         ds = self.grid_drawer.data_source
         ds.clear()
         ds.append_by_index_sequence(seq, Alignment.MID)
 
     def prepare_draw_labels(self, config: "DrawConfig", painter: "QPainter") -> None:
-        seq = ValueSequenceGenerator(self, self.label_count).prepare(config, painter)
+        seq = self.ticks(config).values
         ds: ValueLabelDataSource = self.label_data_source
         ds.clear()
         ds.append_by_index_sequence(seq, Alignment.MID)
 
+    def ticks(self, config: "DrawConfig") -> "Ticks":
+        """ticks of current frame, shared by grids and labels"""
+        plot_area = config.drawing_cache.plot_area
+        metrics = QFontMetricsF(self.label_drawer.label_font)
+        self.tick_generator.max_count = self.label_count
+        if self.orientation is Orientation.HORIZONTAL:
+            begin, end = config.begin, config.end
+            label_width = max(
+                metrics.horizontalAdvance(self.label_data_source.format % begin),
+                metrics.horizontalAdvance(self.label_data_source.format % end),
+            )
+            return self.tick_generator.ticks(
+                begin, end, plot_area.width(), label_width + metrics.height()
+            )
+        # skip ticks whose label can never be fully printed
+        return self.tick_generator.ticks(
+            config.y_low,
+            config.y_high,
+            plot_area.height(),
+            metrics.height() * 2,
+            margin=metrics.height() / 2,
+        )
+
 
 class ValueAxisX(ValueAxis):
 
@@ -399,37 +536,64 @@ class BarAxisY(ValueAxis):
 
 
 class CandleAxisX(AxisBase):
+    """
+    grids and labels are placed every 1, 2, 5, 10, 20, 50... candles, see TickGenerator.
+    at most label_count + 1 ticks are shown, fewer if labels would overlap.
+    """
 
     def __init__(self, data_source: "CandleDataSource"):
         super().__init__(Orientation.HORIZONTAL)
         self.label_count = 5
         self.data_source: "CandleDataSource" = data_source
         self.format = "%Y-%m-%d"
+        self.tick_generator = TickGenerator(self.label_count + 1, integer=True)
 
         self.label_data_source = CandleLabelDataSource(data_source)
         self.label_drawer = TextLabelDrawer(self)
         self.label_drawer.data_source = self.label_data_source
+        self._label_spacings: Dict[Tuple[str, str], float] = {}
 
     def prepare_draw_grids(self, config: "DrawConfig", painter: "QPainter") -> None:
-        seq = ValueSequenceGenerator(self, self.label_count + 1).prepare(
-            config, painter
-        )
+        seq = self.ticks(config).values
         ds = self.grid_drawer.data_source
         ds.clear()
-        ds.append_by_index_sequence([int(i) + 0.5 for i in seq])
+        ds.append_by_index_sequence([i + 0.5 for i in seq])
 
     def prepare_draw_labels(self, config: "DrawConfig", painter: "QPainter") -> None:
-        seq = ValueSequenceGenerator(self, self.label_count + 1).prepare(
-            config, painter
-        )
+        seq = self.ticks(config).values
         ds: CandleLabelDataSource = self.label_data_source
         ds.clear()
-        ds.append_by_index_sequence([int(i) + 0.5 for i in seq], Alignment.AFTER)
+        ds.append_by_index_sequence([i + 0.5 for i in seq], Alignment.AFTER)
+
+    def ticks(self, config: "DrawConfig") -> "Ticks":
+        """ticks of current frame(indexes of candles), shared by grids and labels"""
+        self.tick_generator.max_count = self.label_count + 1
+        return self.tick_generator.ticks(
+            config.begin,
+            config.end,
+            config.drawing_cache.plot_area.width(),
+            self._label_spacing(),
+        )
+
+    def _label_spacing(self) -> float:
+        """width of the widest label plus a gap, measured once for every (font, format)"""
+        font = self.label_drawer.label_font
+        key = (font.key(), self.label_data_source.format)
+        spacing = self._label_spacings.get(key)
+        if spacing is None:
+            text = datetime(2000, 12, 28, 20, 58, 58).strftime(key[1])
+            metrics = QFontMetricsF(font)
+            rect = metrics.boundingRect(QRectF(0, 0, 1000, 1000), TEXT_FLAG, text)
+            spacing = self._label_spacings[key] = rect.width() + metrics.height()
+        return spacing
 
 
 def _generate_sequence(begin, end, step):
     """output a sequence between [start, end)"""
-    i = begin
-    while i < end:
-        yield i
-        i += step
+    # begin + i * step: accumulating steps drifts
+    i = 0
+    value = begin
+    while value < end:
+        yield value
+        i += 1
+        value = begin + i * step
@@ -1,12 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, TYPE_CHECKING, TypeVar, Union
+from typing import Optional, TYPE_CHECKING, Tuple, TypeVar, Union
+
+import numpy as np
 
 from PyQt5.QtCore import QPointF, QRectF
 from PyQt5.QtGui import QColor, QTransform
 
 if TYPE_CHECKING:
-    pass
+    from .profiling import FrameProfiler
 
 T = TypeVar("T")
 
@@ -29,11 +31,20 @@ class Alignment(Enum):
     AFTER = 2
 
 
+def _scale_coefficients(
+    transform: Optional["QTransform"],
+) -> Optional[Tuple[float, float, float, float]]:
+    """(m11, dx, m22, dy) of a transform only scaling and translating, otherwise None"""
+    if transform is None or transform.type() > QTransform.TxScale:
+        return None
+    return transform.m11(), transform.dx(), transform.m22(), transform.dy()
+
+
 @dataclass()
 class DrawingCache:
     # intermediate variables to speed up calculation
-    drawer_transform: Optional["QTransform"] = None  # 坐标转化矩阵(UI->drawer)
-    ui_transform: Optional[QTransform] = None  # 坐标转化矩阵(drawer->UI)
+    drawer_transform: Optional["QTransform"] = None  # 坐标转化矩阵(drawer->UI)
+    ui_transform: Optional[QTransform] = None  # 坐标转化矩阵(UI->drawer)
     drawer_area: Optional["QRectF"] = None  # drawer坐标的世界大小
     drawer_area_width: Optional["float"] = None
     # self.drawer_area_height: Optional['float'] = None
@@ -43,6 +54,35 @@ class DrawingCache:
     p2d_w: Optional[float] = None  # drawer_area.width / plot_area.width
     p2d_h: Optional[float] = None  # drawer_area.height / plot_area.height
 
+    # 矩阵只有缩放和平移时的系数(m11, dx, m22, dy)：x和y分别用 m11 * x + dx、m22 * y + dy 计算，
+    # 不需要构造QPointF再调用QTransform.map()。按矩阵对象缓存，矩阵被替换后重新计算
+    _drawer_scale: Optional[Tuple[float, float, float, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _drawer_scale_of: Optional["QTransform"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _ui_scale: Optional[Tuple[float, float, float, float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _ui_scale_of: Optional["QTransform"] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def _drawer_coefficients(self) -> Optional[Tuple[float, float, float, float]]:
+        transform = self.drawer_transform
+        if self._drawer_scale_of is not transform:
+            self._drawer_scale = _scale_coefficients(transform)
+            self._drawer_scale_of = transform
+        return self._drawer_scale
+
+    def _ui_coefficients(self) -> Optional[Tuple[float, float, float, float]]:
+        transform = self.ui_transform
+        if self._ui_scale_of is not transform:
+            self._ui_scale = _scale_coefficients(transform)
+            self._ui_scale_of = transform
+        return self._ui_scale
+
     def drawer_to_ui(self, value: T) -> T:
         """
         将drawer坐标系中的值（点或者矩形）转化为UI坐标系
@@ -53,14 +93,38 @@ class DrawingCache:
         """
         将drawer坐标系中的x值转化为UI坐标系中的x值
         """
+        scale = self._drawer_coefficients()
+        if scale is not None:
+            return scale[0] * value + scale[1]
         return self.drawer_transform.map(QPointF(value, value)).x()
 
     def drawer_y_to_ui(self, value: float) -> float:
         """
         将drawer坐标系中的y值转化为UI坐标系中的y值
         """
+        scale = self._drawer_coefficients()
+        if scale is not None:
+            return scale[2] * value + scale[3]
         return self.drawer_transform.map(QPointF(value, value)).y()
 
+    def drawer_xs_to_ui(self, values: "np.ndarray") -> "np.ndarray":
+        """
+        drawer_x_to_ui() of every value in an array
+        """
+        scale = self._drawer_coefficients()
+        if scale is not None:
+            return values * scale[0] + scale[1]
+        return np.array([self.drawer_x_to_ui(value) for value in values.tolist()])
+
+    def drawer_ys_to_ui(self, values: "np.ndarray") -> "np.ndarray":
+        """
+        drawer_y_to_ui() of every value in an array
+        """
+        scale = self._drawer_coefficients()
+        if scale is not None:
+            return values * scale[2] + scale[3]
+        return np.array([self.drawer_y_to_ui(value) for value in values.tolist()])
+
     def ui_width_to_drawer(self, value: float) -> float:
         return value * self.p2d_w
 
@@ -71,9 +135,15 @@ class DrawingCache:
         return self.ui_transform.map(value)
 
     def ui_x_to_drawer(self, value: float) -> float:
+        scale = self._ui_coefficients()
+        if scale is not None:
+            return scale[0] * value + scale[1]
         return self.ui_transform.map(QPointF(value, value)).x()
 
     def ui_y_to_drawer(self, value: float) -> float:
+        scale = self._ui_coefficients()
+        if scale is not None:
+            return scale[2] * value + scale[3]
         return self.ui_transform.map(QPointF(value, value)).y()
 
 
@@ -85,3 +155,4 @@ class DrawConfig:
     y_high: float = 1  # 图表底端所代表的y值
 
     drawing_cache: Optional["DrawingCache"] = None
+    profiler: Optional["FrameProfiler"] = None  # set while a FrameProfiler is measuring
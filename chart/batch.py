@@ -0,0 +1,141 @@
+"""
+Render many charts into images with a pool of worker processes.
+
+Every worker process runs its own offscreen QApplication, creates the chart of a job,
+renders it with ChartWidget.render_to_image() and sends back the encoded image.
+"""
+import multiprocessing
+import os
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TYPE_CHECKING, Tuple
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QSize
+from PyQt5.QtWidgets import QApplication
+
+from .axis import CandleAxisX, ValueAxisY
+from .chart import ChartWidget
+from .data_source import CandleArrayDataSource
+from .drawer import CandleChartDrawer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass()
+class RenderJob:
+    """
+    A chart to render.
+    Jobs are sent to worker processes, so every field must be picklable:
+    chart_factory should be a module level function, or a functools.partial of it.
+    """
+
+    key: Any  # identify the result of this job
+    chart_factory: Callable[[], "ChartWidget"]  # create the chart, with its DataSource and drawers
+    size: Tuple[int, int] = (800, 600)
+    x_range: Optional[Tuple[int, int]] = None  # None to use x range set by chart_factory
+    format: str = "PNG"
+    quality: int = -1
+
+
+@dataclass()
+class RenderResult:
+    key: Any
+    data: Optional[bytes] = None  # encoded image, None if failed
+    error: Optional[str] = None  # traceback if failed
+
+
+class BatchRenderer:
+    """
+    Render RenderJobs with a pool of processes.
+    ```
+    with BatchRenderer() as renderer:
+        for result in renderer.render(jobs):
+            ...
+    ```
+    Worker processes are started with "spawn", so the script using it
+    must be protected by `if __name__ == "__main__":`.
+    """
+
+    def __init__(self, processes: Optional[int] = None, chunksize: int = 1):
+        """
+        :param processes number of worker processes, os.cpu_count() if it is None.
+        """
+        self.chunksize = chunksize
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(processes, initializer=_init_worker)
+
+    def render(self, jobs: Iterable["RenderJob"]) -> Iterator["RenderResult"]:
+        """render all the jobs, yield results as soon as they are done, in any order"""
+        return self._pool.imap_unordered(_render_job, jobs, self.chunksize)
+
+    def render_to_files(
+        self, jobs: Iterable["RenderJob"], path_of: Callable[[Any], str]
+    ) -> Dict[Any, Optional[str]]:
+        """
+        render all the jobs and save each image to path_of(job.key).
+        :return: key => error(None if succeed) of every job
+        """
+        errors = {}
+        for result in self.render(jobs):
+            if result.data is not None:
+                with open(path_of(result.key), "wb") as f:
+                    f.write(result.data)
+            errors[result.key] = result.error
+        return errors
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def create_candle_chart(
+    columns: Dict[str, "np.ndarray"], x_range: Optional[Tuple[int, int]] = None
+) -> "ChartWidget":
+    """
+    a chart_factory for RenderJob: candlestick chart of columns of CandleArrayDataSource,
+    such as the result of CandleCsvFile.read_columns().
+    usage: RenderJob(key, functools.partial(create_candle_chart, columns))
+    raise ValueError if a field of CandleArrayDataSource is missing in columns.
+    """
+    data_source = CandleArrayDataSource()
+    missing = [name for name, _ in data_source.fields if name not in columns]
+    if missing:
+        raise ValueError(f"columns for {', '.join(missing)} are missing")
+    data_source.extend_columns(**{name: columns[name] for name, _ in data_source.fields})
+    chart = ChartWidget()
+    chart.add_drawer(CandleChartDrawer(data_source))
+    chart.add_axis(CandleAxisX(data_source), ValueAxisY())
+    chart.set_x_range(*(x_range or (0, len(data_source))))
+    return chart
+
+
+_app = None  # QApplication of worker process
+
+
+def _init_worker():
+    global _app
+    # no display is required, even if the parent process runs on one(such as xcb or windows)
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    _app = QApplication.instance() or QApplication([])
+
+
+def _render_job(job: "RenderJob") -> "RenderResult":
+    try:
+        chart = job.chart_factory()
+        image = chart.render_to_image(QSize(*job.size), job.x_range)
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        if not image.save(buffer, job.format, job.quality):
+            raise RuntimeError(f"failed to encode image as {job.format}")
+        buffer.close()
+        return RenderResult(job.key, bytes(data))
+    except Exception:
+        return RenderResult(job.key, error=traceback.format_exc())
@@ -1,16 +1,24 @@
+import math
+from contextlib import ExitStack
 from copy import copy
 from threading import Lock
-from typing import List, TYPE_CHECKING, Tuple, TypeVar
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, Tuple, TypeVar
+from weakref import ref
 
-from PyQt5.QtCore import QRectF, Qt
-from PyQt5.QtGui import (QBrush, QColor, QPaintEvent, QPainter, QPalette, QPen, QTransform)
+from PyQt5.QtCore import QObject, QPoint, QRect, QRectF, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import (QBrush, QColor, QImage, QPaintEvent, QPainter, QPalette, QPen,
+                         QPixmap, QTransform)
 from PyQt5.QtWidgets import QWidget
 
 from .axis import AxisBase, ValueAxisX, ValueAxisY
 from .base import ColorType, DrawConfig, DrawingCache, Orientation
+from .data_source import DataSource
+from .profiling import FrameProfiler, section
+from .render_thread import RenderRequest, RenderThread, RenderedFrame
 
 if TYPE_CHECKING:
     from .drawer import ChartDrawerBase
+    from .scheduler import FrameScheduler
 
 T = TypeVar("T")
 
@@ -32,6 +40,70 @@ class NoVisualAreaError(RuntimeError):
     pass
 
 
+def _to_device(rect: "QRect", pixmap: "QPixmap") -> "QRect":
+    """convert rect in widget into rect of pixels in pixmap"""
+    ratio = pixmap.devicePixelRatio()
+    if ratio == 1:
+        return rect
+    return QRectF(
+        rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio
+    ).toAlignedRect()
+
+
+class _DataSourceWatcher(QObject):
+    """
+    Reports changes of the DataSource of an axis(such as CandleAxisX.data_source)
+    the way ChartDrawerBase.qobject.data_changed does:
+    after a removal, records after the removed ones are moved,
+    so end is the number of records before removal.
+    """
+
+    data_changed = pyqtSignal(int, int)
+
+    def __init__(self, data_source: "DataSource", parent: Optional["QObject"] = None):
+        super().__init__(parent)
+        self._data_source = ref(data_source)
+        qobject = data_source.qobject
+        qobject.data_removed.connect(self._on_data_removed)
+        for signal in (qobject.data_appended, qobject.data_updated, qobject.data_evicted):
+            signal.connect(self.data_changed)
+
+    def _on_data_removed(self, begin: int, end: int):
+        # emitted before removal: len() is still the number of records before removal
+        data_source = self._data_source()
+        size = end if data_source is None else len(data_source)
+        self.data_changed.emit(begin, max(end, size))
+
+
+class _Layer:
+    """
+    A transparent pixmap holding part of a chart,
+    painted again only when its key changes.
+    """
+
+    def __init__(self):
+        self.key: Any = None
+        self.pixmap: Optional["QPixmap"] = None
+
+    def invalidate(self):
+        self.key = None
+
+    def get(self, widget: "QWidget", key: Any, paint: Callable[["QPainter"], None]) -> "QPixmap":
+        if key != self.key or self.pixmap is None:
+            ratio = widget.devicePixelRatioF()
+            size = widget.size() * ratio
+            if self.pixmap is None or self.pixmap.size() != size:
+                self.pixmap = QPixmap(size)
+                self.pixmap.setDevicePixelRatio(ratio)
+            self.pixmap.fill(Qt.transparent)
+            painter = QPainter(self.pixmap)
+            painter.setWorldMatrixEnabled(True)
+            paint(painter)
+            painter.end()
+            self.key = key
+        return self.pixmap
+
+
 class ChartWidget(QWidget):
     """
     Used to show a chart.
@@ -41,6 +113,40 @@ class ChartWidget(QWidget):
 
     Currently, the range of y axis is determined automatically.
       Manually control of Y axis is not supported.
+
+    If use_layer_cache is enabled(it is disabled by default), the chart is painted in layers:
+      background and axis(grids, labels) => series(all drawers) => box edge => overlay axis.
+    The first two layers are cached as pixmaps, and re-painted only when
+    x range, y range, size, drawers/axis or data of drawers(and of axis) changed,
+    so a repaint caused only by overlays(such as a cross hair) costs only two blits.
+    Styles(colors, fonts, pens of drawers and axis) are not tracked:
+    call invalidate_layers() after changing them, or the cached layers are shown unchanged.
+
+    If use_fast_scroll is also enabled(it is enabled by default, but takes effect only
+      with use_layer_cache), and only x range is moved(y range is not changed),
+      pixels of cached series layer are moved instead of re-painting the whole layer,
+      and only the strip exposed is painted by drawers, with a narrowed config.begin/end.
+
+    Every drawer added reports changes of its data(ChartDrawerBase.qobject.data_changed),
+    so does the data source of every axis having one(such as CandleAxisX.data_source).
+    Changes of a data source used by many drawers and axis are reported only once.
+    Changes intersecting the x range shown invalidate both cached layers,
+    and, if use_auto_repaint is enabled, schedule a repaint.
+    Changes out of the x range can't affect what is shown(nor the y range), so they are ignored.
+
+    If scheduler is set, repaints are requested through that FrameScheduler,
+    so they are merged with other charts and limited to its max_fps.
+
+    If use_async_render is enabled, everything but overlay axis is prepared and painted
+    into a QImage by a RenderThread, and paintEvent only blits the latest finished frame,
+    so the GUI thread stays responsive while a large chart is being rendered.
+    Until the new frame is ready, the previous one is shown.
+    Layers are not used in this mode.
+    DataSources of the chart must be changed while holding their lock(DataSource.lock),
+    and drawers/axis must be configured before async rendering is enabled.
+
+    If profiler is set, every frame is measured by that FrameProfiler,
+    and if profiler_hud_visible is also enabled, its latest stats are shown on the chart.
     """
 
     def __init__(self, parent=None):
@@ -63,8 +169,32 @@ class ChartWidget(QWidget):
         self._draw_config.begin = 0
         self._draw_config.end = 0
 
+        self.use_auto_repaint = True
+        # number of changes of data intersecting the x range shown at that time
+        self._data_version = 0
+        # qobject of data source => qobject reporting its changes, see _watch_data_source()
+        self._data_change_reporters: Dict["QObject", "QObject"] = {}
+
+        self.scheduler: Optional["FrameScheduler"] = None
         self._repaint_lock = Lock()
-        self._repaint_scheduled = False
+        self._repaint_scheduled = False  # whether a full repaint is scheduled
+
+        self.use_layer_cache = False
+        # scrolls the cached series layer, so it does nothing unless use_layer_cache is enabled
+        self.use_fast_scroll = True
+        self._axis_layer = _Layer()
+        self._series_layer = _Layer()
+
+        self.profiler: Optional["FrameProfiler"] = None
+        self.profiler_hud_visible = False
+        self.profiler_hud_color: "ColorType" = QColor(0, 0, 0)
+        self.profiler_hud_background_color: "ColorType" = QColor(255, 255, 255, 200)
+
+        self.use_async_render = False
+        self._render_thread: Optional["RenderThread"] = None
+        self._render_lock = Lock()  # held while rendering a frame, see _render_locks()
+        self._requested_frame_key: Any = None
+        self._frame: Optional["RenderedFrame"] = None
 
         self.setMouseTracking(True)
 
@@ -84,19 +214,57 @@ class ChartWidget(QWidget):
         config = self._draw_config
         if (begin, end) != (config.begin, config.end):
             config.begin, config.end = begin, end
-            self.update()
+            self.schedule_repaint()
 
     def scroll_x(self, diff: int):
         config = self._draw_config
         config.begin, config.end = config.begin + diff, config.end + diff
+        if diff:
+            self.schedule_repaint()
+
+    def schedule_repaint(self, rect: Optional["QRect"] = None):
+        """
+        repaint rect(the whole chart if rect is None) in the next frame of scheduler,
+        or just update() if there is no scheduler.
+        """
+        if self.scheduler is None:
+            if rect is None:
+                self.update()
+            else:
+                self.update(rect)
+            return
+        with self._repaint_lock:
+            if self._repaint_scheduled:
+                return
+            if rect is None:
+                self._repaint_scheduled = True
+        self.scheduler.schedule(self, rect)
 
     def add_drawer(self, drawer: "ChartDrawerBase"):
         if drawer not in self._drawers:
-            self._drawers.append(drawer)
-            self.update()
+            with self._render_lock:
+                self._drawers.append(drawer)
+            self._watch_data_source(drawer._data_source, drawer.qobject)
+            self.invalidate_layers()
+            self.schedule_repaint()
 
     def add_axis(self, *axis_list: "AxisBase"):
-        self._axis_list.extend(axis_list)
+        with self._render_lock:
+            self._axis_list.extend(axis_list)
+        for axis in axis_list:
+            # labels of axis such as CandleAxisX are read from its own data source
+            data_source = getattr(axis, "data_source", None)
+            if isinstance(data_source, DataSource):
+                self._watch_data_source(data_source)
+        self.invalidate_layers()
+
+    def invalidate_layers(self):
+        """
+        drop cached layers(and the async rendered frame), the next paint re-paints everything.
+        """
+        self._axis_layer.invalidate()
+        self._series_layer.invalidate()
+        self._requested_frame_key = None
 
     def create_default_axis(self):
         """
@@ -117,15 +285,16 @@ class ChartWidget(QWidget):
     def all_axis_y(self):
         return [i for i in self._axis_list if i.orientation is Orientation.VERTICAL]
 
-    def plot_area(self) -> "QRectF":
+    def plot_area(self, rect: Optional["QRect"] = None) -> "QRectF":
         """
         calculate the area where chart is printed, excluding padding and axis.
         在UI坐标系中计算出绘制区域
 
+        :param rect area of the whole chart, self.rect() if it is None.
         :note: for internal drawing function, use config.drawer_cache.plot_area.
         :note: 内部绘制函数无需调用该函数，查看config.output这个缓存的值即可
         """
-        output: QRectF = QRectF(self.rect())
+        output: QRectF = QRectF(self.rect() if rect is None else rect)
 
         left, top, right, bottom = self.paddings
         output2 = output.adjusted(left, top, -right, -bottom)
@@ -142,12 +311,63 @@ class ChartWidget(QWidget):
             return config.drawing_cache.drawer_transform.mapRect(value)
         return config.drawing_cache.drawer_transform.map(value)
 
+    def render_to_image(
+        self,
+        size: Optional["QSize"] = None,
+        x_range: Optional[Tuple[int, int]] = None,
+        device_pixel_ratio: float = 1.0,
+    ) -> "QImage":
+        """
+        paint the chart into a new QImage, without showing the chart.
+        overlay axis(such as cross hair) is not painted.
+        works without a display, such as with QT_QPA_PLATFORM=offscreen.
+
+        :param size size of the image, size of the chart if it is None.
+        :param x_range x range to paint, current x range if it is None.
+        :note: with use_async_render, this waits for the frame being rendered,
+               don't call it while holding a DataSource.lock of this chart.
+        """
+        size = self.size() if size is None else QSize(size)
+        config: "ExtraDrawConfig" = copy(self._draw_config)
+        if x_range is not None:
+            config.begin, config.end = x_range
+        config.profiler = None
+        background = self.palette().color(QPalette.Background)
+        # the render thread may be using the same drawers and axis
+        with self._render_locks():
+            return self._render(config, size, device_pixel_ratio, background)[0]
+
+    def save_image(
+        self,
+        path: str,
+        size: Optional["QSize"] = None,
+        x_range: Optional[Tuple[int, int]] = None,
+        format: Optional[str] = None,
+        quality: int = -1,
+    ) -> bool:
+        """
+        render_to_image() and save it to path.
+        :param format such as "PNG", "JPG", guessed from path if it is None.
+        :param quality see QImage.save()
+        :return: True if succeed.
+        """
+        return self.render_to_image(size, x_range).save(path, format, quality)
+
     #########################################################################
     # Re-implemented protected methods
     #########################################################################
     def paintEvent(self, event: "QPaintEvent"):
+        if self.use_async_render:
+            self._paint_async(event)
+            return
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame()
+
         # copy config: ensure config is not change while painting
         config: "ExtraDrawConfig" = copy(self._draw_config)
+        config.profiler = profiler
 
         try:
             config = self._prepare_painting(config)
@@ -156,42 +376,296 @@ class ChartWidget(QWidget):
         primary_painter = QPainter(self)
         primary_painter.setWorldMatrixEnabled(True)
 
-        # 清除背景
-        primary_painter.setBrush(self.palette().color(QPalette.Background))
-        primary_painter.setPen(Qt.transparent)
-        primary_painter.drawRect(primary_painter.window())
-
-        # 绘制坐标轴
-        self._paint_axis(config, primary_painter)
-
-        # 绘制所有注册了的序列
-        self._paint_drawers(config, primary_painter)
+        axis_list = [i for i in self._axis_list if not i.overlay]
+        overlay_axis_list = [i for i in self._axis_list if i.overlay]
+
+        def paint_background_and_axis(painter: "QPainter"):
+            # 清除背景
+            painter.setBrush(self.palette().color(QPalette.Background))
+            painter.setPen(Qt.transparent)
+            painter.drawRect(painter.window())
+
+            # 绘制坐标轴
+            self._paint_axis(config, painter, axis_list)
+
+        def paint_series(painter: "QPainter"):
+            # 绘制所有注册了的序列
+            self._paint_drawers(config, painter)
+
+        if self.use_layer_cache:
+            # only the area to update is copied, such as strips of a moving cross hair
+            key = self._layer_key(config)
+            target = event.rect()
+            # labels of axis, such as dates of candles, change with data too
+            axis_key = series_key = key, self._data_version
+            axis_layer = self._axis_layer.get(self, axis_key, paint_background_and_axis)
+            primary_painter.drawPixmap(target, axis_layer, _to_device(target, axis_layer))
+            if self.use_fast_scroll:
+                with section(profiler, "fast_scroll"):
+                    self._scroll_series_layer(config, series_key)
+            series_layer = self._series_layer.get(self, series_key, paint_series)
+            primary_painter.drawPixmap(target, series_layer, _to_device(target, series_layer))
+        else:
+            paint_background_and_axis(primary_painter)
+            paint_series(primary_painter)
 
         # 绘制图表边框
         self._paint_box_edge(config, primary_painter)
 
+        # 绘制浮动在图表之上的坐标轴，例如光标
+        with section(profiler, "overlay"):
+            self._paint_axis(config, primary_painter, overlay_axis_list)
+
+        if profiler is not None and self.profiler_hud_visible:
+            self._paint_profiler_hud(config, primary_painter)
+
         # 结束
         primary_painter.end()
         self._draw_config = config
+        if profiler is not None:
+            profiler.end_frame()
         event.accept()
 
     #########################################################################
     # Private methods
     #########################################################################
-    def _paint_drawers(self, config: "ExtraDrawConfig", painter: "QPainter"):
+    def _render(
+        self,
+        config: "ExtraDrawConfig",
+        size: "QSize",
+        device_pixel_ratio: float,
+        background: "QColor",
+    ) -> Tuple["QImage", "ExtraDrawConfig"]:
+        """
+        paint everything but overlay axis into a new QImage.
+        doesn't use QPixmap or the widget itself, so it can run in any thread.
+        :return: image, prepared config
+        """
+        image = QImage(size * device_pixel_ratio, QImage.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(device_pixel_ratio)
+        # 清除背景
+        image.fill(background)
+        try:
+            config = self._prepare_painting(config, QRect(QPoint(0, 0), size))
+        except NoVisualAreaError:
+            return image, config
+
+        painter = QPainter(image)
+        painter.setWorldMatrixEnabled(True)
+        self._paint_axis(config, painter, [i for i in self._axis_list if not i.overlay])
+        self._paint_drawers(config, painter)
+        self._paint_box_edge(config, painter)
+        painter.end()
+        return image, config
+
+    def _render_frame(self, request: "RenderRequest") -> "RenderedFrame":
+        """called in render thread"""
+        profiler = request.config.profiler
+        if profiler is not None:
+            profiler.begin_frame()
+        with self._render_locks():
+            image, config = self._render(
+                request.config,
+                QSize(request.width, request.height),
+                request.device_pixel_ratio,
+                request.background,
+            )
+        if profiler is not None:
+            profiler.end_frame()
+        return RenderedFrame(request.key, image, config)
+
+    def _render_locks(self) -> "ExitStack":
+        """
+        hold _render_lock and the lock of every DataSource of the chart until exited,
+        so drawers and axis(and their caches) are used by one render at a time.
+        """
+        stack = ExitStack()
+        stack.enter_context(self._render_lock)
+        for lock in self._data_source_locks():
+            stack.enter_context(lock)
+        return stack
+
+    def _data_source_locks(self):
+        """locks of every DataSource used by drawers and axis, in a fixed order"""
+        data_sources = [d._data_source for d in self._drawers]
+        data_sources += [getattr(a, "data_source", None) for a in self._axis_list]
+        unique = {id(i): i for i in data_sources if isinstance(i, DataSource)}
+        return [unique[i].lock for i in sorted(unique)]
+
+    def _frame_key(self, config: "ExtraDrawConfig"):
+        """everything affecting a rendered frame, which is known before rendering"""
+        return (
+            self.width(),
+            self.height(),
+            self.devicePixelRatioF(),
+            tuple(self.paddings),
+            (config.begin, config.end),
+            self._data_version,
+        )
+
+    def _paint_async(self, event: "QPaintEvent"):
+        config: "ExtraDrawConfig" = copy(self._draw_config)
+        config.profiler = self.profiler
+        key = self._frame_key(config)
+        if key != self._requested_frame_key:
+            if self._render_thread is None:
+                self._render_thread = RenderThread(self)
+                self._render_thread.frame_ready.connect(self._on_frame_ready)
+            self._requested_frame_key = key
+            self._render_thread.request(
+                RenderRequest(
+                    key,
+                    config,
+                    self.width(),
+                    self.height(),
+                    self.devicePixelRatioF(),
+                    self.palette().color(QPalette.Background),
+                )
+            )
+
+        frame = self._frame
+        painter = QPainter(self)
+        if frame is None:
+            painter.fillRect(event.rect(), self.palette().color(QPalette.Background))
+        else:
+            target = event.rect()
+            painter.drawImage(target, frame.image, _to_device(target, frame.image))
+            if frame.config.drawing_cache is not None:
+                # 绘制浮动在图表之上的坐标轴，例如光标
+                painter.setWorldMatrixEnabled(True)
+                overlay_axis_list = [i for i in self._axis_list if i.overlay]
+                overlay_config = copy(frame.config)
+                overlay_config.profiler = None  # profiler is used by render thread
+                self._paint_axis(overlay_config, painter, overlay_axis_list)
+                if self.profiler is not None and self.profiler_hud_visible:
+                    self._paint_profiler_hud(overlay_config, painter)
+        painter.end()
+        event.accept()
+
+    def _on_frame_ready(self, frame: "RenderedFrame"):
+        self._frame = frame
+        config = self._draw_config
+        if (frame.config.begin, frame.config.end) == (config.begin, config.end):
+            # coordinates of the frame are what user sees now
+            self._draw_config = copy(frame.config)
+        self.schedule_repaint()
+
+    def _watch_data_source(
+        self, data_source: Optional["DataSource"], drawer_qobject: Optional["QObject"] = None
+    ):
+        """
+        report changes of data_source to _on_drawer_data_changed once,
+        through drawer_qobject(ChartDrawerBase.qobject) if it is drawn by a drawer,
+        or through a _DataSourceWatcher otherwise.
+        """
+        qobject = getattr(data_source, "qobject", None)
+        if qobject is None:
+            # no data source yet: the drawer reports the one set later
+            drawer_qobject.data_changed.connect(self._on_drawer_data_changed)
+            return
+        reporter = self._data_change_reporters.get(qobject)
+        if reporter is not None:
+            if drawer_qobject is None or not isinstance(reporter, _DataSourceWatcher):
+                return
+            # drawn by a drawer now, which reports it from now on
+            reporter.data_changed.disconnect(self._on_drawer_data_changed)
+            reporter.deleteLater()
+        if drawer_qobject is None:
+            reporter = _DataSourceWatcher(data_source, self)
+        else:
+            reporter = drawer_qobject
+        reporter.data_changed.connect(self._on_drawer_data_changed)
+        self._data_change_reporters[qobject] = reporter
+
+    def _on_drawer_data_changed(self, begin: int, end: int):
+        config = self._draw_config
+        if begin < config.end and end > config.begin:
+            self._data_version += 1
+            if self.use_auto_repaint:
+                self.schedule_repaint()
+
+    def _on_repaint_flushed(self):
+        # called by scheduler right before the scheduled update()
+        with self._repaint_lock:
+            self._repaint_scheduled = False
+
+    def _scroll_series_layer(self, config: "ExtraDrawConfig", series_key):
+        """
+        if the cached series layer differs from series_key only by an x range scrolled
+        by whole pixels, move its pixels and paint only the exposed strip.
+        """
+        layer = self._series_layer
+        if layer.key is None or layer.key == series_key or not self.clip_plot_area:
+            return
+        (old_fixed, (old_begin, old_end)), old_version = layer.key
+        (fixed, (begin, end)), version = series_key
+        if (
+            old_fixed != fixed
+            or old_version != version
+            or old_end - old_begin != end - begin
+            or not config.has_showing_data
+        ):
+            return
+
+        plot_area = config.drawing_cache.plot_area
+        ratio = layer.pixmap.devicePixelRatio()
+        shift = (old_begin - begin) / config.drawing_cache.p2d_w * ratio
+        dx = round(shift)
+        if dx == 0 or abs(shift - dx) > 1e-6 or abs(dx) >= plot_area.width() * ratio:
+            return
+
+        layer.pixmap.scroll(dx, 0, _to_device(plot_area.toRect(), layer.pixmap))
+        width = abs(dx) / ratio
+        # strip exposed by scrolling
+        left = plot_area.right() - width if dx < 0 else plot_area.left()
+        strip = QRectF(left, plot_area.top(), width, plot_area.height())
+
+        # draw only records which may be seen in strip
+        drawing_cache = config.drawing_cache
+        narrowed = copy(config)
+        left = math.floor(drawing_cache.ui_x_to_drawer(strip.left()))
+        right = math.ceil(drawing_cache.ui_x_to_drawer(strip.right()))
+        narrowed.begin = max(config.begin, left - 1)
+        narrowed.end = min(config.end, right + 1)
+
+        painter = QPainter(layer.pixmap)
+        painter.setWorldMatrixEnabled(True)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(strip, Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        self._paint_drawers(narrowed, painter, strip)
+        painter.end()
+        layer.key = series_key
+
+    def _paint_drawers(
+        self,
+        config: "ExtraDrawConfig",
+        painter: "QPainter",
+        area: Optional["QRectF"] = None,
+    ):
+        """
+        :param area area to paint(clip), plot_area if it is None
+        """
         if config.has_showing_data:
-            for i, s in enumerate(self._drawers):
-                if s.has_data():
-                    self._paint_drawer(s, config, painter)
+            with section(config.profiler, "paint_drawers"):
+                for i, s in enumerate(self._drawers):
+                    if s.has_data():
+                        with section(config.profiler, "draw", s):
+                            self._paint_drawer(s, config, painter, area)
             self._switch_painter_to_ui_coordinate(painter)
 
     def _paint_drawer(
-        self, drawer: "ChartDrawerBase", config: "ExtraDrawConfig", painter: "QPainter"
+        self,
+        drawer: "ChartDrawerBase",
+        config: "ExtraDrawConfig",
+        painter: "QPainter",
+        area: Optional["QRectF"] = None,
     ):
         if self.clip_plot_area:
-            plot_area = config.drawing_cache.plot_area
+            if area is None:
+                area = config.drawing_cache.plot_area
             painter.setPen(QPen(Qt.transparent))
-            painter.setClipRect(plot_area.toRect())
+            painter.setClipRect(area.toRect())
             self._switch_painter_to_drawer_coordinate(painter, config)
             drawer.draw(copy(config), painter)
             painter.setClipping(False)
@@ -203,59 +677,103 @@ class ChartWidget(QWidget):
     def _should_paint_axis(self, axis):
         return axis and axis.axis_visible and (axis.label_visible or axis.grid_visible)
 
-    def _paint_axis(self, config: "ExtraDrawConfig", painter: "QPainter"):
-        axises = [i for i in self._axis_list if i and self._should_paint_axis(i)]
-        for axis in axises:
-            axis.prepare_draw_axis(copy(config), painter)
-
-        # first: grid
-        if config.has_showing_data:
-            painter.setBrush(QColor(0, 0, 0, 0))
-            for axis in axises:
-                if axis.grid_visible:
-                    axis.prepare_draw_grids(config, painter)
-                    axis.draw_grids(copy(config), painter)
-
-        # last: labels
-        if config.has_showing_data:
+    def _paint_axis(
+        self, config: "ExtraDrawConfig", painter: "QPainter", axis_list: List["AxisBase"]
+    ):
+        profiler = config.profiler
+        axises = [i for i in axis_list if i and self._should_paint_axis(i)]
+        with section(profiler, "paint_axis"):
             for axis in axises:
-                if axis.label_visible:
-                    axis.prepare_draw_labels(config, painter)
-                    painter.setBrush(QColor(0, 0, 0, 0))
-                    axis.draw_labels(copy(config), painter)
+                with section(profiler, "prepare_draw_axis", axis):
+                    axis.prepare_draw_axis(copy(config), painter)
+
+            # first: grid
+            if config.has_showing_data:
+                painter.setBrush(QColor(0, 0, 0, 0))
+                for axis in axises:
+                    if axis.grid_visible:
+                        with section(profiler, "prepare_draw_grids", axis):
+                            axis.prepare_draw_grids(config, painter)
+                        with section(profiler, "draw_grids", axis):
+                            axis.draw_grids(copy(config), painter)
+
+            # last: labels
+            if config.has_showing_data:
+                for axis in axises:
+                    if axis.label_visible:
+                        with section(profiler, "prepare_draw_labels", axis):
+                            axis.prepare_draw_labels(config, painter)
+                        painter.setBrush(QColor(0, 0, 0, 0))
+                        with section(profiler, "draw_labels", axis):
+                            axis.draw_labels(copy(config), painter)
 
     def _paint_box_edge(self, config: "ExtraDrawConfig", painter: "QPainter"):
         if self.plot_area_edge_visible:
-            painter.setBrush(QBrush(Qt.transparent))
-            painter.setPen(QPen(QColor(self.plot_area_edge_color)))
-            painter.drawRect(config.drawing_cache.plot_area)
+            with section(config.profiler, "paint_box_edge"):
+                painter.setBrush(QBrush(Qt.transparent))
+                painter.setPen(QPen(QColor(self.plot_area_edge_color)))
+                painter.drawRect(config.drawing_cache.plot_area)
+
+    def _paint_profiler_hud(self, config: "ExtraDrawConfig", painter: "QPainter"):
+        """show percentiles of total frame time and of the slowest sections"""
+        stats = self.profiler.last_stats
+        if not stats:
+            return
+        names = sorted(stats, key=lambda name: stats[name]["p95"], reverse=True)[:6]
+        lines = [
+            f"{name}: {stats[name]['p50']:.2f} / {stats[name]['p95']:.2f} ms" for name in names
+        ]
+        text = "\n".join(["p50 / p95"] + lines)
+        plot_area = config.drawing_cache.plot_area
+        painter.setWorldMatrixEnabled(False)
+        rect = painter.boundingRect(plot_area, Qt.AlignLeft | Qt.AlignTop, text)
+        rect.translate(4, 4)
+        painter.fillRect(rect.adjusted(-2, -2, 2, 2), QColor(self.profiler_hud_background_color))
+        painter.setPen(QColor(self.profiler_hud_color))
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignTop, text)
+
+    def _layer_key(self, config: "ExtraDrawConfig"):
+        """everything affecting cached layers besides data of drawers: (fixed, x range)"""
+        fixed = (
+            self.width(),
+            self.height(),
+            self.devicePixelRatioF(),
+            tuple(self.paddings),
+            config.y_low,
+            config.y_high,
+        )
+        return fixed, (config.begin, config.end)
 
-    def _prepare_painting(self, config: "ExtraDrawConfig"):
+    def _prepare_painting(self, config: "ExtraDrawConfig", rect: Optional["QRect"] = None):
         """
         提前计算一些在绘图时需要的数据
+        :param rect area of the whole chart, self.rect() if it is None.
         """
-        # get preferred y range
-        has_showing_data = config.end - config.begin
-        config.has_showing_data = has_showing_data
-
-        if has_showing_data and self._drawers:
-            preferred_configs = [
-                s.prepare_draw(copy(config)) for s in self._drawers if s.has_data()
-            ]
-            if preferred_configs:
-                y_low = min(preferred_configs, key=lambda c: c.y_low).y_low
-                y_high = max(preferred_configs, key=lambda c: c.y_high).y_high
-            else:
-                y_low, y_high = 0, 1
-
-            # scale y range
-            config.y_low, config.y_high = scale_from_mid(y_low, y_high, self.y_scale)
-
-        # 一些给其他类使用的中间变量，例如坐标转化矩阵
-        self._prepare_drawing_cache(config)
+        with section(config.profiler, "prepare_painting"):
+            # get preferred y range
+            has_showing_data = config.end - config.begin
+            config.has_showing_data = has_showing_data
+
+            if has_showing_data and self._drawers:
+                preferred_configs = []
+                for s in self._drawers:
+                    if s.has_data():
+                        with section(config.profiler, "prepare_draw", s):
+                            preferred_configs.append(s.prepare_draw(copy(config)))
+                if preferred_configs:
+                    y_low = min(preferred_configs, key=lambda c: c.y_low).y_low
+                    y_high = max(preferred_configs, key=lambda c: c.y_high).y_high
+                else:
+                    y_low, y_high = 0, 1
+
+                # scale y range
+                config.y_low, config.y_high = scale_from_mid(y_low, y_high, self.y_scale)
+
+            # 一些给其他类使用的中间变量，例如坐标转化矩阵
+            self._prepare_drawing_cache(config, rect)
         return config
 
-    def _prepare_drawing_cache(self, config: "ExtraDrawConfig"):
+    def _prepare_drawing_cache(self, config: "ExtraDrawConfig", rect: Optional["QRect"] = None):
         """
         生成一个矩阵用以将painter的坐标系从UI坐标系调整为drawer坐标系
         这样painter中的x和y轴就正好对应数据的x和y了
@@ -268,7 +786,7 @@ class ChartWidget(QWidget):
             max(config.end - config.begin, 1),
             max(config.y_high - config.y_low, 1),
         )
-        plot_area = self.plot_area()
+        plot_area = self.plot_area(rect)
         if plot_area.width() <= 0 or plot_area.height() <= 0:
             raise NoVisualAreaError()
 
@@ -1,9 +1,13 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Generic, Iterable, List, TYPE_CHECKING, TypeVar
+from threading import RLock
+from typing import Any, Dict, Generic, Iterable, List, Optional, TYPE_CHECKING, Tuple, TypeVar
 
+import numpy as np
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from .range_index import MinMaxIndex
+
 if TYPE_CHECKING:
     from .base import Alignment
 
@@ -11,7 +15,24 @@ T = TypeVar("T")
 
 
 class DataSourceQObject(QObject):
-    data_removed = pyqtSignal(int, int)  # (start: int, end: int)
+    # (start: int, end: int): records [start, end) are appended.
+    data_appended = pyqtSignal(int, int)
+    # (start: int, end: int): records [start, end) are about to be removed,
+    # records after them will move forward.
+    data_removed = pyqtSignal(int, int)
+    # (start: int, end: int): records [start, end) are replaced.
+    data_updated = pyqtSignal(int, int)
+    # (start: int, end: int): records [start, end) are dropped,
+    # indexes of other records don't change. (see RingDataSource)
+    data_evicted = pyqtSignal(int, int)
+    # (start: int, end: int): emitted together with every signal above, with the same range:
+    # records [start, end) are appended, removed, replaced or dropped.
+    data_changed = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        for signal in (self.data_appended, self.data_removed, self.data_updated, self.data_evicted):
+            signal.connect(self.data_changed)
 
 
 class DataSource(Generic[T]):
@@ -19,23 +40,135 @@ class DataSource(Generic[T]):
     DataSource for a Drawer.
     A DataSource is just like a list, but not all the operation is supported in list.
     Supported operations are:
-    append(), clear(), __len__(), __getitem__(),
+    append(), clear(), update(), set_last(), __len__(), __getitem__(), __delitem__()
+
+    Besides, min_max() answers the range of values in any [begin, end) in O(log n).
+
+    A DataSource is not thread-safe. If it is drawn by a chart using async rendering
+    (ChartWidget.use_async_render), hold lock while changing it:
+    ```
+    with data_source.lock:
+        data_source.append(record)
+    ```
     """
 
+    # whether min_max_index() is available, which is required by levels > 0 of Pyramid.
+    # min_max_index() of a DataSource whose supports_pyramid is False raises TypeError.
+    supports_pyramid = True
+
     def __init__(self, parent=None):
         super().__init__()
         self.data_list: List[T] = []
         self.qobject = DataSourceQObject(parent)
+        self.lock = RLock()  # held by render thread while reading this DataSource
+        self._min_max_indexes: Dict[Tuple[Optional[str], Optional[str]], "MinMaxIndex"] = {}
 
     def extend(self, seq: Iterable[T]) -> None:
+        begin = len(self.data_list)
         self.data_list.extend(seq)
+        end = len(self.data_list)
+        if begin < end:
+            self.qobject.data_appended.emit(begin, end)
 
     def append(self, object: T) -> None:
         self.data_list.append(object)
+        end = len(self.data_list)
+        self.qobject.data_appended.emit(end - 1, end)
 
     def clear(self) -> None:
         self.qobject.data_removed.emit(0, len(self.data_list))
         self.data_list.clear()
+        self._truncate_min_max_indexes(0)
+
+    @property
+    def first_index(self) -> int:
+        """index of the first available record, records [first_index, len(self)) are available"""
+        return 0
+
+    def create_empty(self) -> "DataSource[T]":
+        """
+        a new DataSource of the same type and settings, without any record.
+        signals, lock and caches are not shared with self.
+        subclasses whose __init__ requires arguments should override this.
+        """
+        return type(self)()
+
+    def update(self, index: int, object: T) -> None:
+        """
+        replace the record at index.
+        """
+        index, _ = _to_range(index, len(self))
+        self.data_list[index] = object
+        self._update_min_max_indexes(index, index + 1)
+        self.qobject.data_updated.emit(index, index + 1)
+
+    def set_last(self, object: T) -> None:
+        """
+        replace the last record, usually used to update the latest bar with live data.
+        """
+        self.update(-1, object)
+
+    def __delitem__(self, item):
+        begin, end = _to_range(item, len(self))
+        if begin < end:
+            self.qobject.data_removed.emit(begin, end)
+            del self.data_list[begin:end]
+            self._delete_from_min_max_indexes(begin, end)
+
+    def column(
+        self,
+        name: Optional[str] = None,
+        begin: int = 0,
+        end: Optional[int] = None,
+        step: int = 1,
+    ) -> "np.ndarray":
+        """
+        return a field of records [begin:end:step] as a numpy array.
+        :param name name of the field, None to use records themselves as values.
+        """
+        items = self.data_list[begin:end:step]
+        if name is None:
+            return np.array(items)
+        return np.array([getattr(i, name) for i in items])
+
+    def min_max(
+        self,
+        begin: int,
+        end: int,
+        low_field: Optional[str] = None,
+        high_field: Optional[str] = None,
+    ) -> Optional[Tuple[float, float]]:
+        """
+        return (minimum of low_field, maximum of high_field) of records [begin, end),
+        or None if there is no record in this range.
+
+        The first call for a pair of fields builds a MinMaxIndex of them,
+        records appended later are added into that index before the next query,
+        so every query costs O(log n) no matter how large the range is.
+        """
+        return self.min_max_index(low_field, high_field).query(begin, end)
+
+    def min_max_index(
+        self, low_field: Optional[str] = None, high_field: Optional[str] = None
+    ) -> "MinMaxIndex":
+        """
+        return the up to date MinMaxIndex of (low_field, high_field), create it if necessary.
+        """
+        key = (low_field, high_field)
+        index = self._min_max_indexes.get(key)
+        if index is None:
+            index = self._min_max_indexes[key] = MinMaxIndex()
+
+        size = len(self)
+        indexed = len(index)
+        if indexed < size:
+            lows = self.column(low_field, indexed, size)
+            if high_field == low_field:
+                highs = lows
+            else:
+                highs = self.column(high_field, indexed, size)
+            index.extend(lows, highs)
+        return index
 
     def append_by_sequence(self, xs: List[float], align: "Alignment", item: List[T]):
         raise NotImplementedError()
@@ -46,6 +179,24 @@ class DataSource(Generic[T]):
     def __len__(self):
         return len(self.data_list)
 
+    def _truncate_min_max_indexes(self, size: int):
+        for index in self._min_max_indexes.values():
+            index.truncate(size)
+
+    def _delete_from_min_max_indexes(self, begin: int, end: int):
+        for index in self._min_max_indexes.values():
+            index.delete(begin, end)
+
+    def _update_min_max_indexes(self, begin: int, end: int):
+        for (low_field, high_field), index in self._min_max_indexes.items():
+            indexed_end = min(end, len(index))
+            if begin < indexed_end:
+                index.set_range(
+                    begin,
+                    self.column(low_field, begin, indexed_end),
+                    self.column(high_field, begin, indexed_end),
+                )
+
     def __str__(self):
         return str(self.data_list)
 
@@ -53,6 +204,20 @@ class DataSource(Generic[T]):
         return repr(self.data_list)
 
 
+def _to_range(item, size: int) -> Tuple[int, int]:
+    """convert an index or a slice with step 1 into range [begin, end)"""
+    if isinstance(item, slice):
+        begin, end, step = item.indices(size)
+        if step != 1:
+            raise ValueError("only slice with step 1 is supported")
+        return begin, max(begin, end)
+    if item < 0:
+        item += size
+    if not 0 <= item < size:
+        raise IndexError("DataSource index out of range")
+    return item, item + 1
+
+
 @dataclass
 class CandleData:
     """
@@ -68,3 +233,352 @@ class CandleData:
 
 CandleDataSource = DataSource["CandleData"]
 HistogramDataSource = DataSource[float]
+
+
+class ArrayDataSource(DataSource[T]):
+    """
+    Columnar DataSource: every field of a record is stored in its own contiguous,
+    growable numpy array (a column) instead of a Python object per record.
+
+    It supports the same operations as DataSource, __getitem__() creates the record on the fly.
+    By default there is a single float column named "value",
+    so it can be used wherever a DataSource[float] is expected.
+
+    To store other records, derive it and override fields, _to_fields() and _from_fields().
+    """
+
+    # (name, numpy dtype) of every column
+    fields: Tuple[Tuple[str, str], ...] = (("value", "f8"),)
+
+    def __init__(self, parent=None, capacity: int = 1024):
+        super().__init__(parent)
+        self.data_list = None  # records are stored in self._columns
+        self._size = 0
+        self._columns = {
+            name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self.fields
+        }
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns[self.fields[0][0]])
+
+    def column(
+        self,
+        name: Optional[str] = None,
+        begin: int = 0,
+        end: Optional[int] = None,
+        step: int = 1,
+    ) -> "np.ndarray":
+        """
+        return a read-only view of a column for records [begin:end:step].
+        the view becomes stale after the DataSource grows.
+        :param name name of the column, None for the first column.
+        """
+        if name is None:
+            name = self.fields[0][0]
+        view = self._columns[name][: self._size][begin:end:step]
+        view.flags.writeable = False
+        return view
+
+    def extend(self, seq: Iterable[T]) -> None:
+        rows = [self._to_fields(i) for i in seq]
+        if rows:
+            self.extend_columns(
+                **{name: values for (name, _), values in zip(self.fields, zip(*rows))}
+            )
+
+    def extend_columns(self, **columns: Iterable[Any]) -> None:
+        """
+        append records field by field: every field must be given as a sequence
+        and all the sequences must have the same length.
+        This is the fastest way to fill an ArrayDataSource.
+        """
+        arrays = {
+            name: np.asarray(columns[name], dtype=dtype) for name, dtype in self.fields
+        }
+        n = len(arrays[self.fields[0][0]])
+        begin, end = self._size, self._size + n
+        self._reserve(end)
+        for name, values in arrays.items():
+            self._columns[name][begin:end] = values
+        self._size = end
+        if n:
+            self.qobject.data_appended.emit(begin, end)
+
+    def append(self, object: T) -> None:
+        i = self._size
+        self._reserve(i + 1)
+        for (name, _), value in zip(self.fields, self._to_fields(object)):
+            self._columns[name][i] = value
+        self._size = i + 1
+        self.qobject.data_appended.emit(i, i + 1)
+
+    def clear(self) -> None:
+        self.qobject.data_removed.emit(0, self._size)
+        self._size = 0
+        self._truncate_min_max_indexes(0)
+
+    def update(self, index: int, object: T) -> None:
+        index, _ = _to_range(index, self._size)
+        for (name, _), value in zip(self.fields, self._to_fields(object)):
+            self._columns[name][index] = value
+        self._update_min_max_indexes(index, index + 1)
+        self.qobject.data_updated.emit(index, index + 1)
+
+    def __delitem__(self, item):
+        begin, end = _to_range(item, self._size)
+        if begin < end:
+            self.qobject.data_removed.emit(begin, end)
+            size = self._size
+            for column in self._columns.values():
+                column[begin: size - (end - begin)] = column[end:size]
+            self._size = size - (end - begin)
+            self._delete_from_min_max_indexes(begin, end)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._from_fields(i) for i in range(*item.indices(self._size))]
+        if item < 0:
+            item += self._size
+        if not 0 <= item < self._size:
+            raise IndexError("ArrayDataSource index out of range")
+        return self._from_fields(item)
+
+    def __len__(self):
+        return self._size
+
+    def __str__(self):
+        return str(self[:])
+
+    def __repr__(self):
+        return repr(self[:])
+
+    def _to_fields(self, object: T) -> Tuple:
+        """convert a record into a tuple of values, in the same order as fields"""
+        return (object,)
+
+    def _from_fields(self, i: int) -> T:
+        """create the i-th record from columns"""
+        return float(self._columns["value"][i])
+
+    def _reserve(self, size: int):
+        capacity = self.capacity
+        if size > capacity:
+            capacity = max(size, capacity * 2)
+            for name, column in self._columns.items():
+                new_column = np.empty(capacity, dtype=column.dtype)
+                new_column[: self._size] = column[: self._size]
+                self._columns[name] = new_column
+
+
+class CandleArrayDataSource(ArrayDataSource["CandleData"]):
+    """
+    Columnar DataSource for CandleChartDrawer.
+    Every item got from __getitem__ is a new CandleData.
+    """
+
+    fields = (
+        ("open_price", "f8"),
+        ("low_price", "f8"),
+        ("high_price", "f8"),
+        ("close_price", "f8"),
+        ("datetime", "datetime64[us]"),
+    )
+
+    def _to_fields(self, object: "CandleData") -> Tuple:
+        return (
+            object.open_price,
+            object.low_price,
+            object.high_price,
+            object.close_price,
+            np.datetime64(object.datetime, "us"),
+        )
+
+    def _from_fields(self, i: int) -> "CandleData":
+        columns = self._columns
+        return CandleData(
+            open_price=float(columns["open_price"][i]),
+            low_price=float(columns["low_price"][i]),
+            high_price=float(columns["high_price"][i]),
+            close_price=float(columns["close_price"][i]),
+            datetime=columns["datetime"][i].item(),
+        )
+
+
+class RingDataSource(DataSource[T]):
+    """
+    DataSource keeping only the latest capacity records, with O(1) append and eviction.
+
+    Indexes are stable: the i-th record ever appended is always at index i,
+    so x range of charts and caches of drawers don't need to be re-indexed after eviction.
+    len() is the number of records ever appended,
+    but only records [first_index, len(self)) are available:
+    accessing an evicted record raises IndexError.
+    When records are evicted, qobject.data_evicted is emitted.
+    Records can't be deleted(del raises TypeError), and there is no min_max_index()
+    (supports_pyramid is False), but min_max() is supported.
+
+    Records are stored in slots: record i is stored in slot i % capacity.
+    """
+
+    supports_pyramid = False
+
+    def __init__(self, capacity: int, parent=None):
+        if capacity <= 0:
+            raise ValueError(f"capacity of RingDataSource must be positive, not {capacity}")
+        super().__init__(parent)
+        self.data_list = None  # records are stored in self._slots
+        self.capacity = capacity
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._end = 0
+        # MinMaxIndex of slots and logical end of records added into that index
+        self._slot_indexes: Dict[Tuple[Optional[str], Optional[str]], "MinMaxIndex"] = {}
+        self._slot_indexed_end: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+
+    @property
+    def first_index(self) -> int:
+        return max(self._end - self.capacity, 0)
+
+    def create_empty(self) -> "RingDataSource[T]":
+        return type(self)(self.capacity)
+
+    def extend(self, seq: Iterable[T]) -> None:
+        items = list(seq)
+        if not items:
+            return
+        begin = self._end
+        end = begin + len(items)
+        if len(items) > self.capacity:
+            items = items[-self.capacity:]
+        self._evict(end)
+        capacity = self.capacity
+        for i, item in enumerate(items, end - len(items)):
+            self._slots[i % capacity] = item
+        self._end = end
+        self.qobject.data_appended.emit(begin, end)
+
+    def append(self, object: T) -> None:
+        end = self._end + 1
+        self._evict(end)
+        self._slots[self._end % self.capacity] = object
+        self._end = end
+        self.qobject.data_appended.emit(end - 1, end)
+
+    def clear(self) -> None:
+        self.qobject.data_removed.emit(0, self._end)
+        self._slots = [None] * self.capacity
+        self._end = 0
+        self._slot_indexes.clear()
+        self._slot_indexed_end.clear()
+
+    def update(self, index: int, object: T) -> None:
+        index = self._check_index(index)
+        self._slots[index % self.capacity] = object
+        for key, indexed_end in self._slot_indexed_end.items():
+            if index < indexed_end:
+                self._set_slot_index(key, index, index + 1)
+        self.qobject.data_updated.emit(index, index + 1)
+
+    def __delitem__(self, item):
+        raise TypeError("RingDataSource doesn't support deleting records, they are only evicted")
+
+    def column(
+        self,
+        name: Optional[str] = None,
+        begin: int = 0,
+        end: Optional[int] = None,
+        step: int = 1,
+    ) -> "np.ndarray":
+        if end is None:
+            end = self._end
+        begin, end = max(begin, self.first_index), min(end, self._end)
+        items = [self._slots[i % self.capacity] for i in range(begin, end, step)]
+        if name is None:
+            return np.array(items)
+        return np.array([getattr(i, name) for i in items])
+
+    def min_max(
+        self,
+        begin: int,
+        end: int,
+        low_field: Optional[str] = None,
+        high_field: Optional[str] = None,
+    ) -> Optional[Tuple[float, float]]:
+        begin, end = max(begin, self.first_index), min(end, self._end)
+        if begin >= end:
+            return None
+        key = (low_field, high_field)
+        self._sync_slot_index(key)
+        index = self._slot_indexes[key]
+        ranges = [index.query(b, e) for b, e in self._slot_ranges(begin, end)]
+        return min(i[0] for i in ranges), max(i[1] for i in ranges)
+
+    def min_max_index(
+        self, low_field: Optional[str] = None, high_field: Optional[str] = None
+    ) -> "MinMaxIndex":
+        # slots are reused, so there is no MinMaxIndex ordered by index
+        raise TypeError("RingDataSource doesn't support min_max_index(), use min_max() instead")
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            begin, end, step = item.indices(self._end)
+            if step > 0:
+                begin = max(begin, self.first_index)
+            else:
+                end = max(end, self.first_index - 1)
+            return [self._slots[i % self.capacity] for i in range(begin, end, step)]
+        return self._slots[self._check_index(item) % self.capacity]
+
+    def __len__(self):
+        return self._end
+
+    def __str__(self):
+        return str(self[:])
+
+    def __repr__(self):
+        return repr(self[:])
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._end
+        if not self.first_index <= index < self._end:
+            raise IndexError("RingDataSource index out of range")
+        return index
+
+    def _evict(self, end: int):
+        """evict records to make room for records before end"""
+        first_index, new_first_index = self.first_index, max(end - self.capacity, 0)
+        if new_first_index > first_index:
+            self.qobject.data_evicted.emit(first_index, min(new_first_index, self._end))
+
+    def _slot_ranges(self, begin: int, end: int) -> List[Tuple[int, int]]:
+        """convert available records [begin, end) into at most 2 ranges of slots"""
+        capacity = self.capacity
+        slot_begin = begin % capacity
+        slot_end = slot_begin + end - begin
+        if slot_end <= capacity:
+            return [(slot_begin, slot_end)]
+        return [(slot_begin, capacity), (0, slot_end - capacity)]
+
+    def _sync_slot_index(self, key: Tuple[Optional[str], Optional[str]]):
+        """add records appended since last query into the index of slots"""
+        index = self._slot_indexes.get(key)
+        if index is None:
+            index = self._slot_indexes[key] = MinMaxIndex()
+            index.extend(np.full(self.capacity, np.inf), np.full(self.capacity, -np.inf))
+            self._slot_indexed_end[key] = 0
+        begin = max(self._slot_indexed_end[key], self.first_index)
+        if begin < self._end:
+            self._set_slot_index(key, begin, self._end)
+        self._slot_indexed_end[key] = self._end
+
+    def _set_slot_index(self, key: Tuple[Optional[str], Optional[str]], begin: int, end: int):
+        index = self._slot_indexes[key]
+        low_field, high_field = key
+        lows = self.column(low_field, begin, end)
+        highs = lows if high_field == low_field else self.column(high_field, begin, end)
+        offset = 0
+        for slot_begin, slot_end in self._slot_ranges(begin, end):
+            n = slot_end - slot_begin
+            index.set_range(slot_begin, lows[offset: offset + n], highs[offset: offset + n])
+            offset += n
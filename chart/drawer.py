@@ -1,11 +1,15 @@
 ﻿from abc import ABC, abstractmethod
 from threading import Lock
-from typing import Optional, TYPE_CHECKING, TypeVar
+from typing import Callable, Optional, TYPE_CHECKING, Tuple, TypeVar
 
-from PyQt5.QtCore import QRectF
+import numpy as np
+from PyQt5.QtCore import QObject, QRectF, pyqtSignal
 from PyQt5.QtGui import QBrush, QColor, QPainter
 
-from .data_source import CandleData, DataSource
+from .data_source import DataSource
+from .profiling import section
+from .pyramid import Pyramid
+from .rect_array import RectArray
 
 if TYPE_CHECKING:
     from .base import ColorType, DrawConfig
@@ -13,6 +17,13 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 
 
+class ChartDrawerQObject(QObject):
+    # (begin: int, end: int): what this drawer draws for records [begin, end) may have changed.
+    # after a removal, records after the removed ones are moved,
+    # so end is the number of records before removal.
+    data_changed = pyqtSignal(int, int)
+
+
 class ChartDrawerBase(ABC):
     """
     数据序列
@@ -31,6 +42,7 @@ class ChartDrawerBase(ABC):
     """
 
     def __init__(self, data_source: Optional["DataSource"] = None):
+        self.qobject = ChartDrawerQObject()
         self._data_source: Optional["DataSource"] = None
         self._data_source_lock = Lock()
         self.set_data_source(data_source)
@@ -42,13 +54,23 @@ class ChartDrawerBase(ABC):
                     self._detach_data_source()
                 self._data_source = data_source
                 self._attach_data_source()
+        self._on_data_source_changed(0, len(data_source) if data_source is not None else 0)
 
     def has_data(self):
         return self._data_source is not None and len(self._data_source)
 
+    def on_data_source_data_appended(self, begin: int, end: int):
+        pass
+
     def on_data_source_data_removed(self, begin: int, end: int):
         pass
 
+    def on_data_source_data_updated(self, begin: int, end: int):
+        pass
+
+    def on_data_source_data_evicted(self, begin: int, end: int):
+        pass
+
     def on_data_source_destroyed(self):
         with self._data_source_lock:
             self._data_source = None
@@ -76,9 +98,23 @@ class ChartDrawerBase(ABC):
         """
         pass
 
+    def _on_data_source_changed(self, begin: int, end: int):
+        self.qobject.data_changed.emit(begin, end)
+
+    def _on_data_source_data_removed(self, begin: int, end: int):
+        # emitted before removal: len() is still the number of records before removal
+        self._on_data_source_changed(begin, max(end, len(self._data_source)))
+
     def _attach_data_source(self):
-        self._data_source.qobject.data_removed.connect(self.on_data_source_data_removed)
-        self._data_source.qobject.destroyed.connect(self.on_data_source_destroyed)
+        qobject = self._data_source.qobject
+        qobject.data_appended.connect(self.on_data_source_data_appended)
+        qobject.data_removed.connect(self.on_data_source_data_removed)
+        qobject.data_updated.connect(self.on_data_source_data_updated)
+        qobject.data_evicted.connect(self.on_data_source_data_evicted)
+        qobject.destroyed.connect(self.on_data_source_destroyed)
+        qobject.data_removed.connect(self._on_data_source_data_removed)
+        for signal in (qobject.data_appended, qobject.data_updated, qobject.data_evicted):
+            signal.connect(self._on_data_source_changed)
 
     def _detach_data_source(self):
         raise RuntimeError("Rest of DataSource is currently not implemented.")
@@ -88,7 +124,17 @@ class CandleChartDrawer(ChartDrawerBase):
     """
     Drawer to present candlestick chart
 
-    if cache is enabled
+    if cache is enabled, rectangles of every candle is generated only once,
+    when it is drawn for the first time.
+
+    if lod is enabled(disabled by default) and there are more than lod_bars_per_pixel candles
+    in one pixel column, candles in the same pixel column are merged into one candle before drawing,
+    so the cost of drawing is limited by the width of chart instead of the number of candles.
+    The result is an approximation: every merged column is painted solid from low to high,
+    in a single color, while drawing every candle leaves sub-pixel gaps and mixes colors.
+    if pyramid is also enabled(disabled by default), pre-merged candles are read from a Pyramid
+    of the DataSource. items of a Pyramid are aligned to 2^k candles instead of pixel columns,
+    so the result differs slightly from lod without pyramid.
     """
 
     def __init__(self, data_source: Optional["DataSource"] = None):
@@ -99,17 +145,33 @@ class CandleChartDrawer(ChartDrawerBase):
         self.growing_color: "ColorType" = "red"
         self.falling_color: "ColorType" = "green"
         self.use_cache = True
+        self.use_lod = False
+        self.lod_bars_per_pixel = 2.0
+        self.use_pyramid = False
 
-        # cached variables for draw
-        self._cache_raising = []
-        self._cache_falling = []
-        self._cache_end = 0
+        # cached variables for draw: body and line of every candle, (raising, falling)
+        self._cache = _RectCache(2, self._generate_cache)
+        self._pyramid: Optional["Pyramid"] = None
 
     def on_data_source_data_removed(self, begin: int, end: int):
-        # todo: fix cache, but not to rebuild it.
-        self.clear_cache()
+        self._cache.remove(begin, end)
+
+    def on_data_source_data_updated(self, begin: int, end: int):
+        self._cache.update(begin, end)
+
+    def on_data_source_data_evicted(self, begin: int, end: int):
+        self._cache.evict(begin, end)
 
     def prepare_draw(self, config: "DrawConfig") -> "DrawConfig":
+        if isinstance(self._data_source, DataSource):
+            y_range = self._data_source.min_max(
+                config.begin, config.end, "low_price", "high_price"
+            )
+            if y_range is not None:
+                config.y_low, config.y_high = y_range
+            return config
+
+        # un-formal DataSource
         showing_data = self._data_source[config.begin: config.end]
         if showing_data:
             low = min(showing_data, key=lambda c: c.low_price).low_price
@@ -123,45 +185,111 @@ class CandleChartDrawer(ChartDrawerBase):
 
         begin, end = config.begin, config.end
 
+        if (
+            self.use_lod
+            and isinstance(self._data_source, DataSource)
+            and config.drawing_cache.p2d_w >= self.lod_bars_per_pixel
+        ):
+            self._draw_lod(config, painter, raising_brush, falling_brush)
+            return
+
         # 如果不使用cache，简单的做法就是每次绘图之前清空一下cache
         if not self.use_cache:
             self.clear_cache()
-        data_len = len(self._data_source)
-        if data_len > self._cache_end:
-            self._generate_cache(self._cache_end, data_len)
+        ds = self._data_source
+        first_index = ds.first_index if isinstance(ds, DataSource) else 0
+        with section(config.profiler, "generate_cache"):
+            self._cache.ensure(max(begin, first_index), min(end, len(ds)))
 
         painter.setBrush(raising_brush)
-        painter.drawRects([i for i in self._cache_raising[begin * 2: end * 2] if i])
+        painter.drawRects(self._cache.first.rects(begin, end))
         painter.setBrush(falling_brush)
-        painter.drawRects([i for i in self._cache_falling[begin * 2: end * 2] if i])
+        painter.drawRects(self._cache.second.rects(begin, end))
 
     def clear_cache(self):
-        self._cache_end = 0
-        self._cache_raising = []
-        self._cache_falling = []
-
-    def _generate_cache(self, begin, end):
-        for i in range(begin, end):
-            data: "CandleData" = self._data_source[i]
+        self._cache.clear()
+
+    @property
+    def pyramid(self) -> "Pyramid":
+        if self._pyramid is None or self._pyramid.data_source is not self._data_source:
+            self._pyramid = Pyramid.candle(self._data_source)
+        return self._pyramid
+
+    def _draw_lod(
+        self,
+        config: "DrawConfig",
+        painter: "QPainter",
+        raising_brush: "QBrush",
+        falling_brush: "QBrush",
+    ):
+        """
+        merge all the candles whose center lies in the same pixel column into one candle:
+        (first open, max high, min low, last close), and draw it as a one pixel wide bar
+        from low to high, colored by the merged open and close.
+        this doesn't look the same as drawing every candle, see use_lod.
 
-            if data.open_price <= data.close_price:
-                push_cache = self._cache_raising
-                nop_cache = self._cache_falling
+        if use_pyramid is enabled, candles are read from the pyramid level matching the
+        number of candles per pixel, so only O(width of chart) candles are touched.
+        """
+        p2d_w = config.drawing_cache.p2d_w
+        with section(config.profiler, "pyramid"):
+            level = self.pyramid.level_for(p2d_w) if self.use_pyramid else 0
+            items = self.pyramid.get(level, config.begin, config.end)
+        if items is None:
+            return
+        lefts, starts, lasts = _merge_by_pixel_column(config, items.begins, items.ends)
+
+        merged_opens = items.opens[starts]
+        merged_closes = items.closes[lasts]
+        merged_lows = np.minimum.reduceat(items.lows, starts)
+        merged_highs = np.maximum.reduceat(items.highs, starts)
+
+        raising_rects = []
+        falling_rects = []
+        for left, open_price, low, high, close in zip(
+            lefts.tolist(),
+            merged_opens.tolist(),
+            merged_lows.tolist(),
+            merged_highs.tolist(),
+            merged_closes.tolist(),
+        ):
+            rect = QRectF(left, low, p2d_w, max(high - low, self.minimum_box_height))
+            if open_price <= close:
+                raising_rects.append(rect)
             else:
-                push_cache = self._cache_falling
-                nop_cache = self._cache_raising
-
-            # draw box
-            box = self.get_rect(i, data.open_price, data.close_price, self.body_width)
-            push_cache.append(box)
-            nop_cache.append(None)
-
-            # draw line
-            line = self.get_rect(i, data.low_price, data.high_price, self.line_width)
-            push_cache.append(line)
-            nop_cache.append(None)
+                falling_rects.append(rect)
 
-        self._cache_end = end
+        painter.setBrush(raising_brush)
+        painter.drawRects(raising_rects)
+        painter.setBrush(falling_brush)
+        painter.drawRects(falling_rects)
+
+    def _generate_cache(
+        self, begin: int, end: int
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """return (indexes, rects, is raising) of records [begin, end), see _RectCache"""
+        ds = self._data_source
+        if isinstance(ds, DataSource):
+            opens = ds.column("open_price", begin, end)
+            lows = ds.column("low_price", begin, end)
+            highs = ds.column("high_price", begin, end)
+            closes = ds.column("close_price", begin, end)
+        else:
+            records = ds[begin:end]
+            opens, lows, highs, closes = (
+                np.array([getattr(i, name) for i in records], dtype="f8")
+                for name in ("open_price", "low_price", "high_price", "close_price")
+            )
+        indexes = np.arange(begin, end)
+
+        # (box, line) of every candle
+        rects = np.hstack(
+            [
+                self.get_rects(indexes, opens, closes, self.body_width),
+                self.get_rects(indexes, lows, highs, self.line_width),
+            ]
+        )
+        return indexes, rects, opens <= closes
 
     def get_rect(self, i, start_y, end_y, width):
         left = i + 0.5 - 0.5 * width
@@ -173,6 +301,25 @@ class CandleChartDrawer(ChartDrawerBase):
         )
         return rect
 
+    def get_rects(
+        self,
+        indexes: "np.ndarray",
+        start_ys: "np.ndarray",
+        end_ys: "np.ndarray",
+        width: float,
+    ) -> "np.ndarray":
+        """
+        vectorized get_rect(): return (left, top, width, height) of every rect as a row.
+        """
+        return np.column_stack(
+            [
+                indexes + 0.5 - 0.5 * width,
+                np.minimum(start_ys, end_ys),
+                np.full(len(indexes), width, dtype="f8"),
+                np.maximum(np.abs(start_ys - end_ys), self.minimum_box_height),
+            ]
+        )
+
 
 class BarChartDrawer(ChartDrawerBase):
     """
@@ -181,6 +328,13 @@ class BarChartDrawer(ChartDrawerBase):
     When use_cache is disable, BarChartDrawer supports any list like DataSource,
       including un-formal DataSource).
     When use_cache is enabled, BarChartDrawer supports only formal DataSource
+
+    For formal DataSource, if lod is enabled(disabled by default) and there are more than
+    lod_bars_per_pixel bars in one pixel column, bars in the same pixel column are merged
+    before drawing: highest positive and lowest negative value are drawn as solid columns,
+    which approximates, but doesn't equal, drawing every bar.
+    if pyramid is also enabled(disabled by default), pre-merged bars are read from a Pyramid
+    of the DataSource, whose items are aligned to 2^k bars instead of pixel columns.
     """
 
     def __init__(self, data_source: Optional["DataSource"] = None):
@@ -190,16 +344,31 @@ class BarChartDrawer(ChartDrawerBase):
         self.negative_color: "ColorType" = "green"
 
         self.use_cache = True
+        self.use_lod = False
+        self.lod_bars_per_pixel = 2.0
+        self.use_pyramid = False
 
-        # cached variables for draw
-        self._cache_positive = []
-        self._cache_negative = []
-        self._cache_end = 0
+        # cached variables for draw: (positive, negative)
+        self._cache = _RectCache(1, self._generate_cache)
+        self._pyramid: Optional["Pyramid"] = None
 
     def on_data_source_data_removed(self, begin: int, end: int):
-        self.clear_cache()
+        self._cache.remove(begin, end)
+
+    def on_data_source_data_updated(self, begin: int, end: int):
+        self._cache.update(begin, end)
+
+    def on_data_source_data_evicted(self, begin: int, end: int):
+        self._cache.evict(begin, end)
 
     def prepare_draw(self, config: "DrawConfig") -> "DrawConfig":
+        if isinstance(self._data_source, DataSource):
+            y_range = self._data_source.min_max(config.begin, config.end)
+            if y_range is not None:
+                config.y_low, config.y_high = y_range
+            return config
+
+        # un-formal DataSource
         showing_data = self._data_source[config.begin: config.end]
         if showing_data:
             low = min(showing_data)
@@ -213,46 +382,198 @@ class BarChartDrawer(ChartDrawerBase):
 
         begin, end = config.begin, config.end
 
+        if (
+            self.use_lod
+            and isinstance(self._data_source, DataSource)
+            and config.drawing_cache.p2d_w >= self.lod_bars_per_pixel
+        ):
+            self._draw_lod(config, painter, raising_brush, falling_brush)
+            return
+
         if not self.use_cache:
             self.clear_cache()
-        cache_end = self._cache_end
-
-        data_len = len(self._data_source)
-        if data_len > cache_end:
-            self._generate_cache(cache_end, data_len)
+        ds = self._data_source
+        first_index = ds.first_index if isinstance(ds, DataSource) else 0
+        with section(config.profiler, "generate_cache"):
+            self._cache.ensure(max(begin, first_index), min(end, len(ds)))
 
         painter.setBrush(raising_brush)
-        painter.drawRects([i for i in self._cache_positive[begin:end] if i])
+        painter.drawRects(self._cache.first.rects(begin, end))
         painter.setBrush(falling_brush)
-        painter.drawRects([i for i in self._cache_negative[begin:end] if i])
+        painter.drawRects(self._cache.second.rects(begin, end))
 
     def clear_cache(self):
-        self._cache_end = 0
-        self._cache_positive = []
-        self._cache_negative = []
-
-    def _generate_cache(self, begin, end):
-        for i in range(begin, end):
-            data: "float" = self._data_source[i]
+        self._cache.clear()
+
+    @property
+    def pyramid(self) -> "Pyramid":
+        if self._pyramid is None or self._pyramid.data_source is not self._data_source:
+            self._pyramid = Pyramid(self._data_source)
+        return self._pyramid
+
+    def _draw_lod(
+        self,
+        config: "DrawConfig",
+        painter: "QPainter",
+        raising_brush: "QBrush",
+        falling_brush: "QBrush",
+    ):
+        p2d_w = config.drawing_cache.p2d_w
+        with section(config.profiler, "pyramid"):
+            level = self.pyramid.level_for(p2d_w) if self.use_pyramid else 0
+            items = self.pyramid.get(level, config.begin, config.end)
+        if items is None:
+            return
+        lefts, starts, lasts = _merge_by_pixel_column(config, items.begins, items.ends)
+        merged_lows = np.minimum.reduceat(items.lows, starts)
+        merged_highs = np.maximum.reduceat(items.highs, starts)
+
+        positive_rects = []
+        negative_rects = []
+        for left, low, high in zip(
+            lefts.tolist(), merged_lows.tolist(), merged_highs.tolist()
+        ):
+            if high > 0:
+                positive_rects.append(QRectF(left, 0, p2d_w, high))
+            if low <= 0:
+                negative_rects.append(QRectF(left, low, p2d_w, -low))
 
-            if data > 0:
-                push_cache = self._cache_positive
-                nop_cache = self._cache_negative
-            else:
-                push_cache = self._cache_negative
-                nop_cache = self._cache_positive
+        painter.setBrush(raising_brush)
+        painter.drawRects(positive_rects)
+        painter.setBrush(falling_brush)
+        painter.drawRects(negative_rects)
 
-            # draw box
-            box = self.get_rect(i, 0, data, self.body_width)
-            push_cache.append(box)
-            nop_cache.append(None)
+    def _generate_cache(
+        self, begin: int, end: int
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """return (indexes, rects, is positive) of records [begin, end), see _RectCache"""
+        if isinstance(self._data_source, DataSource):
+            values = self._data_source.column(None, begin, end)
+        else:
+            values = np.array(self._data_source[begin:end], dtype="f8")
+        indexes = np.arange(begin, end)
 
-        self._cache_end = end
+        rects = self.get_rects(indexes, np.zeros(len(values)), values, self.body_width)
+        return indexes, rects, values > 0
 
     def get_rect(self, i, start_y, end_y, width):
         left = i + 0.5 - 0.5 * width
         rect = QRectF(left, min(start_y, end_y), width, abs(start_y - end_y))
         return rect
 
+    def get_rects(
+        self,
+        indexes: "np.ndarray",
+        start_ys: "np.ndarray",
+        end_ys: "np.ndarray",
+        width: float,
+    ) -> "np.ndarray":
+        """
+        vectorized get_rect(): return (left, top, width, height) of every rect as a row.
+        """
+        return np.column_stack(
+            [
+                indexes + 0.5 - 0.5 * width,
+                np.minimum(start_ys, end_ys),
+                np.full(len(indexes), width, dtype="f8"),
+                np.abs(start_ys - end_ys),
+            ]
+        )
+
+
+class _RectCache:
+    """
+    Rectangles of records [begin, end) of a drawer, split into two RectArray: first and second.
+    Only records that have been drawn are cached, and [begin, end) is always continuous,
+    so a DataSource far longer than the part being shown is never read as a whole.
+
+    generate(begin, end) returns (indexes, rects, is first) of records [begin, end).
+    """
+
+    def __init__(
+        self,
+        rects_per_item: int,
+        generate: Callable[[int, int], Tuple["np.ndarray", "np.ndarray", "np.ndarray"]],
+    ):
+        self.first = RectArray(rects_per_item)
+        self.second = RectArray(rects_per_item)
+        self.begin = 0
+        self.end = 0
+        self._generate = generate
+
+    def clear(self):
+        self.begin = self.end = 0
+        self.first.clear()
+        self.second.clear()
+
+    def ensure(self, begin: int, end: int):
+        """make sure records [begin, end) are cached"""
+        if begin >= end:
+            return
+        if end < self.begin or begin > self.end or self.begin == self.end:
+            # not adjacent to what is cached: start over
+            self.clear()
+            self.begin = self.end = begin
+        if begin < self.begin:
+            self._add(begin, self.begin)
+            self.begin = begin
+        if end > self.end:
+            self._add(self.end, end)
+            self.end = end
+
+    def remove(self, begin: int, end: int):
+        """records [begin, end) are removed and records after them move forward"""
+
+        def moved(i: int) -> int:
+            return i if i <= begin else max(begin, i - (end - begin))
+
+        self.first.remove(begin, end)
+        self.second.remove(begin, end)
+        self.begin, self.end = moved(self.begin), moved(self.end)
+
+    def update(self, begin: int, end: int):
+        """records [begin, end) are replaced: re-generate those in cache only"""
+        begin, end = max(begin, self.begin), min(end, self.end)
+        if begin < end:
+            self.first.remove(begin, end, shift=False)
+            self.second.remove(begin, end, shift=False)
+            self._add(begin, end)
+
+    def evict(self, begin: int, end: int):
+        """records [begin, end) are dropped, indexes of other records don't change"""
+        self.first.remove(begin, end, shift=False)
+        self.second.remove(begin, end, shift=False)
+        if begin <= self.begin:
+            self.begin = min(max(self.begin, end), self.end)
+        elif end >= self.end:
+            self.end = max(begin, self.begin)
+
+    def _add(self, begin: int, end: int):
+        indexes, rects, is_first = self._generate(begin, end)
+        self.first.insert(indexes[is_first], rects[is_first])
+        self.second.insert(indexes[~is_first], rects[~is_first])
+
+
+def _merge_by_pixel_column(
+    config: "DrawConfig", begins: "np.ndarray", ends: "np.ndarray"
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    group items by the pixel column where its center lies,
+    item i covers records [begins[i], ends[i]), items are sorted.
+
+    :return: (left of every pixel column in drawer coordinate,
+              index of the first item of every group,
+              index of the last item of every group)
+    """
+    p2d_w = config.drawing_cache.p2d_w
+    # pixel columns are counted from the left of the whole chart,
+    # even if config.begin is narrowed to draw only a part of the chart
+    origin = config.drawing_cache.drawer_area.left()
+    columns = np.floor(((begins + ends) / 2 - origin) / p2d_w)
+    starts = np.insert(np.flatnonzero(np.diff(columns)) + 1, 0, 0)
+    lasts = np.append(starts[1:], len(columns)) - 1
+    lefts = origin + columns[starts] * p2d_w
+    return lefts, starts, lasts
+
 
 HistogramDrawer = BarChartDrawer
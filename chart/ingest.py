@@ -0,0 +1,83 @@
+import time
+from collections import deque
+from typing import Deque, Generic, Iterable, Optional, TYPE_CHECKING, TypeVar
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+if TYPE_CHECKING:
+    from .data_source import DataSource
+
+T = TypeVar("T")
+
+
+class IngestQueue(QObject, Generic[T]):
+    """
+    Thread-safe front of a DataSource, for producers running in other threads,
+    such as network feeds.
+
+    push()/push_many() can be called from any thread: records are put into a deque
+    without any lock. The queue is drained into the DataSource in the thread owning
+    the IngestQueue(usually the GUI thread), at most max_fps times per second,
+    with a single extend() holding DataSource.lock.
+    So qobject.data_appended of the DataSource is emitted once for every batch,
+    and only the first record pushed into an empty queue posts an event to the GUI thread.
+    """
+
+    _wake = pyqtSignal()
+
+    def __init__(
+        self, data_source: "DataSource[T]", max_fps: float = 60, parent: Optional["QObject"] = None
+    ):
+        super().__init__(parent)
+        self.data_source = data_source
+        self.max_fps = max_fps
+        self._queue: Deque[T] = deque()
+        self._wake_pending = False
+        self._last_drain = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.drain)
+        # queued to the thread of self if emitted from other threads
+        self._wake.connect(self._on_wake)
+
+    def push(self, record: T) -> None:
+        """append record into DataSource in the next drain, can be called from any thread"""
+        self._queue.append(record)
+        self._request_drain()
+
+    def push_many(self, records: Iterable[T]) -> None:
+        """append records into DataSource in the next drain, can be called from any thread"""
+        self._queue.extend(records)
+        self._request_drain()
+
+    def drain(self) -> int:
+        """
+        move every record queued into the DataSource now.
+        should be called in the thread owning the IngestQueue.
+        :return: number of records moved
+        """
+        self._timer.stop()
+        self._wake_pending = False  # records pushed from now on request another drain
+        queue = self._queue
+        records = [queue.popleft() for _ in range(len(queue))]
+        self._last_drain = time.perf_counter()
+        if records:
+            with self.data_source.lock:
+                self.data_source.extend(records)
+        return len(records)
+
+    def __len__(self):
+        """number of records waiting for the next drain"""
+        return len(self._queue)
+
+    def _request_drain(self):
+        if not self._wake_pending:
+            self._wake_pending = True
+            self._wake.emit()
+
+    def _on_wake(self):
+        if not self._timer.isActive():
+            interval = 1 / self.max_fps if self.max_fps > 0 else 0
+            delay = self._last_drain + interval - time.perf_counter()
+            self._timer.start(max(int(delay * 1000), 0))
@@ -0,0 +1,177 @@
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING, Tuple
+from weakref import WeakKeyDictionary, ref
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .data_source import DataSource
+
+# strftime directive => slice of the ISO string of a datetime64[s]: "YYYY-MM-DDTHH:MM:SS"
+_ISO_SLICES = {
+    "Y": (0, 4),
+    "m": (5, 7),
+    "d": (8, 10),
+    "H": (11, 13),
+    "M": (14, 16),
+    "S": (17, 19),
+}
+_ISO_LENGTH = 19
+# strftime("%Y") doesn't pad years before 1000 on every platform
+_ISO_MIN = np.datetime64("1000-01-01T00:00:00", "s")
+_ISO_MAX = np.datetime64("9999-12-31T23:59:59", "s")
+_DIRECTIVE = re.compile(r"%(.)")
+
+
+def _iso_layout(format: str) -> Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]]:
+    """
+    (source, literal_positions, literal_codes) of format:
+    character i of result is character source[i] of the ISO string,
+    except those at literal_positions, which are literal_codes.
+    None if format uses directives not in _ISO_SLICES.
+    """
+    source: List[int] = []
+    literals: List[Tuple[int, int]] = []
+    parts = _DIRECTIVE.split(format)
+    for i, part in enumerate(parts):
+        if i % 2 == 0 or part == "%":
+            for c in part:
+                literals.append((len(source), ord(c)))
+                source.append(0)
+        elif part in _ISO_SLICES:
+            begin, end = _ISO_SLICES[part]
+            source.extend(range(begin, end))
+        else:
+            return None
+    positions = np.array([p for p, _ in literals], dtype=np.intp)
+    codes = np.array([c for _, c in literals], dtype=np.uint32)
+    return np.array(source, dtype=np.intp), positions, codes
+
+
+def format_datetimes(values: Iterable, format: str) -> List[str]:
+    """
+    vectorized datetime.strftime(format) of datetime64(or datetime) values.
+    formats using only %Y %m %d %H %M %S %% are assembled from characters of ISO strings
+    with numpy, other formats fall back to strftime() of every item.
+    """
+    values = np.asarray(values, dtype="datetime64[us]")
+    layout = _iso_layout(format)
+    if layout is not None and len(values):
+        seconds = values.astype("datetime64[s]")
+        if _ISO_MIN <= seconds.min() and seconds.max() <= _ISO_MAX:  # 4 digits years only
+            source, positions, codes = layout
+            if not len(source):
+                return [""] * len(values)
+            iso = np.datetime_as_string(seconds, unit="s").astype(f"U{_ISO_LENGTH}")
+            chars = np.ascontiguousarray(iso.view(np.uint32).reshape(-1, _ISO_LENGTH)[:, source])
+            chars[:, positions] = codes
+            return chars.view(f"U{len(source)}").ravel().tolist()
+    return [i.strftime(format) for i in values.astype(datetime)]
+
+
+class DateTimeLabelCache:
+    """
+    Formatted datetime of records of a DataSource, indexed by the index of record,
+    formatted on first use and kept until the record is changed,
+    or until it is the least recently used one of more than capacity labels.
+
+    Every axis formatting the same DataSource with the same format shares one cache(see of()),
+    so charts sharing a DataSource format every date only once.
+    Records of ArrayDataSource are formatted with format_datetimes() in bulk.
+    """
+
+    _caches: "WeakKeyDictionary[DataSource, Dict[str, DateTimeLabelCache]]" = WeakKeyDictionary()
+
+    def __init__(
+        self,
+        data_source: "DataSource",
+        format: str,
+        field: str = "datetime",
+        capacity: int = 4096,
+    ):
+        # weak: caches are values of _caches, whose keys are data sources
+        self._data_source = ref(data_source)
+        self.format = format
+        self.field = field
+        self.capacity = capacity
+        self._labels: "OrderedDict[int, str]" = OrderedDict()
+
+        qobject = data_source.qobject
+        qobject.data_removed.connect(self._on_data_removed)
+        qobject.data_updated.connect(self._on_data_replaced)
+        qobject.data_evicted.connect(self._on_data_replaced)
+
+    @classmethod
+    def of(cls, data_source: "DataSource", format: str) -> "DateTimeLabelCache":
+        """the cache shared by every user of (data_source, format)"""
+        caches = cls._caches.setdefault(data_source, {})
+        cache = caches.get(format)
+        if cache is None:
+            cache = caches[format] = cls(data_source, format)
+        return cache
+
+    @property
+    def data_source(self) -> "DataSource":
+        return self._data_source()
+
+    def get(self, index: int) -> Optional[str]:
+        """label of record at index, None if there is no such record"""
+        label = self._labels.get(index)
+        if label is None:
+            return self.get_many([index])[0]
+        self._labels.move_to_end(index)
+        return label
+
+    def get_many(self, indexes: List[int]) -> List[Optional[str]]:
+        """labels of records at indexes, None for indexes out of range"""
+        labels = self._labels
+        missing = []
+        for i in indexes:
+            if i in labels:
+                labels.move_to_end(i)
+            else:
+                missing.append(i)
+        if missing:
+            self._format(missing)
+        result = [labels.get(i) for i in indexes]
+        while len(labels) > self.capacity:
+            labels.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._labels.clear()
+
+    def __len__(self):
+        return len(self._labels)
+
+    def _format(self, indexes: List[int]):
+        ds = self.data_source
+        first, size = ds.first_index, len(ds)
+        indexes = [i for i in indexes if first <= i < size]
+        if not indexes:
+            return
+        if getattr(ds, "fields", None) and self.field in dict(ds.fields):
+            # columnar: read the column of the whole range once and format in bulk
+            begin, end = min(indexes), max(indexes) + 1
+            values = ds.column(self.field, begin, end)[np.array(indexes) - begin]
+            texts = format_datetimes(values, self.format)
+        else:
+            texts = [getattr(ds[i], self.field).strftime(self.format) for i in indexes]
+        self._labels.update(zip(indexes, texts))
+
+    def _on_data_removed(self, begin: int, end: int):
+        # records after removed ones are moved
+        labels = self._labels
+        for i in [i for i in labels if i >= begin]:
+            del labels[i]
+
+    def _on_data_replaced(self, begin: int, end: int):
+        labels = self._labels
+        if end - begin < len(labels):
+            for i in range(begin, end):
+                labels.pop(i, None)
+        else:
+            for i in [i for i in labels if begin <= i < end]:
+                del labels[i]
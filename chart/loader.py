@@ -0,0 +1,231 @@
+import mmap
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .data_source import ArrayDataSource, CandleArrayDataSource
+
+# header of the column in csv => field of CandleArrayDataSource
+DEFAULT_COLUMNS: Dict[str, str] = {
+    "代码": "symbol",
+    "时间": "datetime",
+    "开盘价": "open_price",
+    "最高价": "high_price",
+    "最低价": "low_price",
+    "收盘价": "close_price",
+    "成交量(股)": "volume",
+}
+
+# longest symbol supported by the index
+_SYMBOL_WIDTH = 32
+# number of lines scanned at once while building the index
+_INDEX_CHUNK_SIZE = 1 << 20
+
+
+class CandleCsvFile:
+    """
+    Bulk loader of csv files of OHLCV records, such as Stk_Day.csv:
+    ```
+    代码,时间,开盘价,最高价,最低价,收盘价,成交量(股),成交额(元)
+    SH600000,1999-11-10,29.5000,29.8000,27.0000,27.7500,174085000,4859102208.00
+    ```
+    Records are parsed column by column with numpy instead of row by row,
+    and are loaded into columnar DataSources directly.
+
+    The file is indexed once by symbol: load(symbol) only parses lines of that symbol.
+    If index_path is given, the index is saved there and reused
+    until the csv file is modified.
+
+    Every line must have the same number of fields, and no field can be quoted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        encoding: str = "gbk",
+        columns: Optional[Dict[str, str]] = None,
+        index_path: Optional[str] = None,
+    ):
+        """
+        :param columns header => field, defaults to DEFAULT_COLUMNS. columns not listed are ignored.
+        """
+        self.path = path
+        self.encoding = encoding
+        self.index_path = index_path
+        columns = DEFAULT_COLUMNS if columns is None else columns
+
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_end = self._data.find(b"\n") + 1
+        if header_end == 0:
+            header_end = len(self._data)
+        headers = self._decode(0, header_end).strip().split(",")
+        self._body_begin = header_end
+        self._column_count = len(headers)
+        # position of every known field in a line
+        self._positions: Dict[str, int] = {
+            columns[header]: i for i, header in enumerate(headers) if header in columns
+        }
+        # field => header, to name missing columns in errors
+        self._headers: Dict[str, str] = {field: header for header, field in columns.items()}
+        self._index: Optional[Dict[str, List[Tuple[int, int]]]] = None
+
+    @property
+    def symbols(self) -> List[str]:
+        """all the symbols, in the order they first appear"""
+        return list(self.index)
+
+    @property
+    def index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """symbol => byte ranges [begin, end) of its lines, built on first use"""
+        if self._index is None:
+            self._index = self._load_index()
+            if self._index is None:
+                self._index = self._build_index()
+                if self.index_path is not None:
+                    self._save_index()
+        return self._index
+
+    def close(self) -> None:
+        self._data.close()
+
+    def read_columns(self, symbol: Optional[str] = None) -> Dict[str, "np.ndarray"]:
+        """
+        parse records of a symbol(or all the records if symbol is None) into arrays,
+        one array for each field of columns except "symbol".
+        """
+        if symbol is None:
+            ranges = [(self._body_begin, len(self._data))]
+        else:
+            ranges = self.index.get(symbol, [])
+        # numbers and datetime are ascii in any encoding: parse them without decoding
+        data = b"".join(self._data[begin:end] for begin, end in ranges)
+        values = data.replace(b"\r", b"").replace(b"\n", b",").split(b",")
+        if values[-1] == b"":
+            del values[-1]  # ends with a new line
+        n = self._column_count
+        if len(values) % n:
+            raise ValueError(f"lines of {symbol or self.path} have different number of fields")
+
+        result = {}
+        for field, position in self._positions.items():
+            if field == "symbol":
+                continue
+            if field == "datetime":
+                result[field] = _parse_datetimes(values[position::n])
+            else:
+                result[field] = np.array(values[position::n], dtype="f8")
+        return result
+
+    def load(
+        self,
+        symbol: Optional[str] = None,
+        data_source: Optional["ArrayDataSource"] = None,
+        volume_data_source: Optional["ArrayDataSource"] = None,
+    ) -> "ArrayDataSource":
+        """
+        append records of a symbol into data_source, and their volume into volume_data_source.
+        if data_source is None, a new CandleArrayDataSource is created.
+        columns not used by data_source are skipped.
+        raise ValueError if the csv has no column for a field of data_source, or for volume.
+
+        :return: data_source
+        """
+        if data_source is None:
+            data_source = CandleArrayDataSource()
+        fields = [name for name, _ in data_source.fields]
+        if volume_data_source is not None:
+            fields.append("volume")
+        missing = [name for name in fields if name not in self._positions]
+        if missing:
+            names = ", ".join(f"{self._headers.get(name, name)}({name})" for name in missing)
+            raise ValueError(f"{self.path} has no column for {names}")
+
+        columns = self.read_columns(symbol)
+        data_source.extend_columns(**{name: columns[name] for name, _ in data_source.fields})
+        if volume_data_source is not None:
+            volume_data_source.extend_columns(value=columns["volume"])
+        return data_source
+
+    def _decode(self, begin: int, end: int) -> str:
+        return self._data[begin:end].decode(self.encoding)
+
+    def _build_index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """find where the symbol changes with a vectorized scan of the whole file"""
+        if self._positions.get("symbol") != 0:
+            raise ValueError("symbol must be the first column to index a csv file")
+        data = np.frombuffer(self._data, dtype="u1")
+        size = len(data)
+        body = data[self._body_begin:]
+        begins = np.insert(np.flatnonzero(body == ord("\n")) + 1, 0, 0) + self._body_begin
+        begins = begins[begins < size]
+        ends = np.append(begins[1:], size)
+
+        keys = np.empty(len(begins), dtype=f"S{_SYMBOL_WIDTH}")
+        for i in range(0, len(begins), _INDEX_CHUNK_SIZE):
+            # first bytes of every line, with bytes from the first ',' zeroed
+            chunk = begins[i: i + _INDEX_CHUNK_SIZE]
+            heads = data[np.minimum(chunk[:, None] + np.arange(_SYMBOL_WIDTH), size - 1)]
+            heads[np.maximum.accumulate(heads == ord(","), axis=1)] = 0
+            keys[i: i + len(chunk)] = heads.view(f"S{_SYMBOL_WIDTH}").ravel()
+        del data, body
+
+        starts = np.flatnonzero(np.insert(keys[1:] != keys[:-1], 0, True))
+        lasts = np.append(starts[1:], len(keys)) - 1
+        index: Dict[str, List[Tuple[int, int]]] = {}
+        for key, begin, end in zip(
+            keys[starts].tolist(), begins[starts].tolist(), ends[lasts].tolist()
+        ):
+            index.setdefault(key.decode(self.encoding), []).append((begin, end))
+        return index
+
+    def _stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self) -> Optional[Dict[str, List[Tuple[int, int]]]]:
+        """load index from index_path, None if there is none or it is outdated"""
+        if self.index_path is None or not os.path.exists(self.index_path):
+            return None
+        with np.load(self.index_path) as saved:
+            if tuple(saved["stamp"].tolist()) != self._stamp():
+                return None
+            index: Dict[str, List[Tuple[int, int]]] = {}
+            for symbol, begin, end in zip(
+                saved["symbols"].tolist(), saved["begins"].tolist(), saved["ends"].tolist()
+            ):
+                index.setdefault(symbol, []).append((begin, end))
+            return index
+
+    def _save_index(self):
+        runs = [
+            (symbol, begin, end)
+            for symbol, ranges in self._index.items()
+            for begin, end in ranges
+        ]
+        symbols, begins, ends = zip(*runs) if runs else ((), (), ())
+        with open(self.index_path, "wb") as f:
+            np.savez(
+                f,
+                stamp=np.array(self._stamp(), dtype="i8"),
+                symbols=np.array(symbols, dtype="U"),
+                begins=np.array(begins, dtype="i8"),
+                ends=np.array(ends, dtype="i8"),
+            )
+
+
+def _parse_datetimes(values: List[bytes]) -> "np.ndarray":
+    """parse strings such as b"2019-01-02" or b"2019-01-02 09:30:00" into datetime64[us]"""
+    array = np.array(values, dtype="S")
+    if array.dtype.itemsize == 10:
+        # fast path for dates only: calculate from digits directly
+        chars = array.view("u1").reshape(-1, 10)
+        if (chars[:, 4] == ord("-")).all() and (chars[:, 7] == ord("-")).all():
+            digits = chars.astype("i8") - ord("0")
+            years = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+            months = digits[:, 5] * 10 + digits[:, 6]
+            days = digits[:, 8] * 10 + digits[:, 9]
+            dates = ((years - 1970) * 12 + months - 1).astype("datetime64[M]")
+            return (dates.astype("datetime64[D]") + (days - 1)).astype("datetime64[us]")
+    return array.astype("datetime64[us]")
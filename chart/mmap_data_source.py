@@ -0,0 +1,211 @@
+import os
+from typing import Optional, TYPE_CHECKING, Tuple
+
+import numpy as np
+
+from .data_source import CandleArrayDataSource, CandleData, DataSource
+
+if TYPE_CHECKING:
+    from .range_index import MinMaxIndex
+
+MAGIC = b"PQCANDLE"
+VERSION = 1
+HEADER_SIZE = 64
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("record_size", "<u4"),
+        ("count", "<u8"),  # number of records, the file may have room for more
+    ]
+)
+
+# layout of a record in the file, little-endian and fixed-width
+RECORD_DTYPE = np.dtype(
+    [
+        ("datetime", "<M8[us]"),
+        ("open_price", "<f8"),
+        ("high_price", "<f8"),
+        ("low_price", "<f8"),
+        ("close_price", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+
+class MmapCandleDataSource(CandleArrayDataSource):
+    """
+    CandleArrayDataSource stored in a memory-mapped file of fixed-width records.
+
+    File format: a header of HEADER_SIZE bytes(see HEADER_DTYPE),
+    followed by an array of RECORD_DTYPE.
+    Every column is a strided view of the mapped file, so opening a file reads nothing
+    but its header, and the OS only loads pages of the records actually used.
+
+    min_max() scans the records asked instead of building a MinMaxIndex of the whole file,
+    so drawing [begin, end) only touches pages of [begin, end).
+    For the same reason supports_pyramid is False: a Pyramid reads records directly
+    instead of building a MinMaxIndex, which would read every page of the file.
+
+    volume of a record is read from its "volume" attribute if there is one, otherwise 0.
+
+    When records are appended beyond the capacity of the file, the file is unmapped,
+    grown and mapped again(a mapped file can't be resized on Windows):
+    views returned by column() before that are invalidated, and must be released
+    for the file to be unmapped.
+    """
+
+    fields = CandleArrayDataSource.fields + (("volume", "f8"),)
+    supports_pyramid = False
+
+    def __init__(
+        self, path: str, readonly: bool = False, capacity: int = 1024, parent=None
+    ):
+        """
+        open path, or create it if it doesn't exist and readonly is False.
+        :param capacity number of records to make room for when the file is created.
+        """
+        DataSource.__init__(self, parent)
+        self.data_list = None  # records are stored in the file
+        self.path = path
+        self.readonly = readonly
+        if not os.path.exists(path):
+            if readonly:
+                raise FileNotFoundError(path)
+            self._create(path, max(capacity, 1))
+        self._header: Optional["np.memmap"] = None
+        self._records: Optional["np.memmap"] = None
+        self._count = 0
+        self._map()
+
+    @property
+    def _size(self) -> int:
+        return self._count
+
+    @_size.setter
+    def _size(self, size: int):
+        # keep the number of records in the file up to date
+        self._check_writable()
+        self._count = size
+        self._header["count"] = size
+
+    def clear(self) -> None:
+        self._check_writable()
+        super().clear()
+
+    def update(self, index: int, object: "CandleData") -> None:
+        self._check_writable()
+        super().update(index, object)
+
+    def __delitem__(self, item):
+        # checked before anything(such as data_removed) happens
+        self._check_writable()
+        super().__delitem__(item)
+
+    def create_empty(self) -> "DataSource":
+        raise TypeError(
+            "MmapCandleDataSource doesn't support create_empty(), its records are stored in a file"
+        )
+
+    def flush(self) -> None:
+        """write changes back to the file"""
+        if not self.readonly:
+            self._header.flush()
+            if isinstance(self._records, np.memmap):
+                self._records.flush()
+
+    def close(self) -> None:
+        """flush and unmap the file, the DataSource can't be used after close()"""
+        if self._records is not None:
+            self.flush()
+            self._unmap()
+
+    def min_max(
+        self,
+        begin: int,
+        end: int,
+        low_field: Optional[str] = None,
+        high_field: Optional[str] = None,
+    ) -> Optional[Tuple[float, float]]:
+        """
+        like DataSource.min_max(), but costs O(end - begin)
+        and touches only the pages of records [begin, end).
+        """
+        begin, end = max(begin, 0), min(end, self._size)
+        if begin >= end:
+            return None
+        lows = self.column(low_field, begin, end)
+        highs = self.column(high_field, begin, end)
+        return float(lows.min()), float(highs.max())
+
+    def min_max_index(
+        self, low_field: Optional[str] = None, high_field: Optional[str] = None
+    ) -> "MinMaxIndex":
+        raise TypeError(
+            "MmapCandleDataSource doesn't support min_max_index(), "
+            "which reads the whole file, use min_max() instead"
+        )
+
+    def _to_fields(self, object: "CandleData") -> Tuple:
+        return super()._to_fields(object) + (getattr(object, "volume", 0.0),)
+
+    def _check_writable(self):
+        if self.readonly:
+            raise PermissionError(f"{self.path} is opened as readonly")
+
+    def _reserve(self, size: int):
+        self._check_writable()
+        capacity = self.capacity
+        if size > capacity:
+            capacity = max(size, capacity * 2)
+            self.flush()
+            self._unmap()
+            with open(self.path, "r+b") as f:
+                f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+            self._map()
+
+    def _unmap(self):
+        # the file is unmapped once the last view of it is released
+        self._header = None
+        self._records = None
+        self._columns = {}
+
+    @staticmethod
+    def _create(path: str, capacity: int):
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["record_size"] = RECORD_DTYPE.itemsize
+        with open(path, "wb") as f:
+            f.write(header.tobytes())
+            f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+
+    def _map(self):
+        """(re)map the whole file"""
+        mode = "r" if self.readonly else "r+"
+        header = np.memmap(self.path, dtype=HEADER_DTYPE, mode=mode, shape=(1,))
+        if header["magic"][0] != MAGIC or header["version"][0] != VERSION:
+            raise ValueError(f"{self.path} is not a candle file")
+        if header["record_size"][0] != RECORD_DTYPE.itemsize:
+            raise ValueError(f"unexpected record size in {self.path}")
+
+        capacity = (os.path.getsize(self.path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        count = int(header["count"][0])
+        if count > capacity:
+            raise ValueError(f"{self.path} is truncated")
+        if capacity:
+            records = np.memmap(
+                self.path,
+                dtype=RECORD_DTYPE,
+                mode=mode,
+                offset=HEADER_SIZE,
+                shape=(capacity,),
+            )
+        else:
+            records = np.empty(0, dtype=RECORD_DTYPE)
+
+        self._header = header
+        self._records = records
+        self._count = count
+        self._columns = {name: records[name] for name, _ in self.fields}
@@ -0,0 +1,168 @@
+import time
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# used in place of FrameProfiler.section() when profiling is disabled, see section()
+NO_PROFILING = nullcontext()
+
+
+def section(profiler: Optional["FrameProfiler"], name: str, owner: Any = None):
+    """
+    profiler.section(name), or a context doing nothing if profiler is None.
+    :param owner drawer or axis the section belongs to, name is prefixed with its name.
+    """
+    if profiler is None:
+        return NO_PROFILING
+    if owner is not None:
+        name = f"{profiler.name_of(owner)}.{name}"
+    return profiler.section(name)
+
+
+@dataclass()
+class FrameProfile:
+    total: float = 0  # seconds spent in the whole frame
+    # name of section => seconds spent in it, nested sections are named as "outer/inner"
+    sections: Dict[str, float] = field(default_factory=dict)
+
+    def slowest(self, n: int = 5) -> List[Tuple[str, float]]:
+        """the n slowest sections: [(name, seconds)]"""
+        return sorted(self.sections.items(), key=lambda i: i[1], reverse=True)[:n]
+
+
+class _Section:
+
+    def __init__(self, profiler: "FrameProfiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        profiler = self._profiler
+        profiler._stack.append(self._name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self._start
+        profiler = self._profiler
+        name = "/".join(profiler._stack)
+        profiler._stack.pop()
+        sections = profiler._current.sections
+        sections[name] = sections.get(name, 0) + elapsed
+
+
+class FrameProfiler(QObject):
+    """
+    Measures time spent in every phase of painting frames of a chart.
+
+    Set ChartWidget.profiler to enable it: the chart times _prepare_painting,
+    prepare_draw()/draw() of every drawer, prepare_draw_*()/draw_*() of every axis,
+    and drawers time the generation of their caches.
+    Nothing is measured while ChartWidget.profiler is None.
+
+    The latest window frames are kept to calculate rolling percentiles(see stats()),
+    which are emitted by stats_updated every report_interval frames.
+    Frames taking more than budget_ms are emitted by budget_exceeded,
+    FrameProfile.slowest() tells which drawer or axis blew the budget.
+
+    A FrameProfiler should be used by charts in the same thread.
+    """
+
+    # (profile: FrameProfile): emitted after every frame
+    frame_profiled = pyqtSignal(object)
+    # (profile: FrameProfile): emitted after every frame taking more than budget_ms
+    budget_exceeded = pyqtSignal(object)
+    # (stats: Dict[str, Dict[str, float]]): see stats(), emitted every report_interval frames
+    stats_updated = pyqtSignal(object)
+
+    def __init__(
+        self,
+        window: int = 120,
+        report_interval: int = 30,
+        budget_ms: float = 16,
+        parent: Optional["QObject"] = None,
+    ):
+        super().__init__(parent)
+        self.report_interval = report_interval
+        self.budget_ms = budget_ms
+        self.percentiles: Tuple[float, ...] = (50, 95, 99)
+        self.profiles: Deque["FrameProfile"] = deque(maxlen=window)
+        self.last_stats: Dict[str, Dict[str, float]] = {}  # result of stats() last reported
+        self._current = FrameProfile()
+        # owner => its name, weak: ids of owners collected may be reused by new ones
+        self._names: "WeakKeyDictionary[Any, str]" = WeakKeyDictionary()
+        self._name_counts: Dict[str, int] = {}  # type name => number of names given
+        self._stack: List[str] = []
+        self._frame_start = 0.0
+        self._frames = 0
+
+    def section(self, name: str) -> "_Section":
+        """context manager timing a section of current frame"""
+        return _Section(self, name)
+
+    def name_of(self, owner: Any) -> str:
+        """name of a drawer or axis used in sections, such as CandleChartDrawer#0"""
+        name = self._names.get(owner)
+        if name is None:
+            # names of owners collected are never given again
+            type_name = type(owner).__name__
+            count = self._name_counts.get(type_name, 0)
+            self._name_counts[type_name] = count + 1
+            name = self._names[owner] = f"{type_name}#{count}"
+        return name
+
+    def begin_frame(self) -> None:
+        self._current = FrameProfile()
+        self._stack.clear()
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> "FrameProfile":
+        profile = self._current
+        profile.total = time.perf_counter() - self._frame_start
+        self.profiles.append(profile)
+        self._frames += 1
+
+        self.frame_profiled.emit(profile)
+        if profile.total * 1000 > self.budget_ms:
+            self.budget_exceeded.emit(profile)
+        if self.report_interval > 0 and self._frames % self.report_interval == 0:
+            self.last_stats = self.stats()
+            self.stats_updated.emit(self.last_stats)
+        return profile
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        percentiles of milliseconds spent in every section(and "total") in the latest frames:
+        {name: {"p50": ms, "p95": ms, "p99": ms, "max": ms}}
+        a section not entered in a frame counts as 0 ms in that frame.
+        """
+        profiles = list(self.profiles)
+        if not profiles:
+            return {}
+        names = {"total": None}
+        for profile in profiles:
+            names.update(dict.fromkeys(profile.sections))
+        result = {}
+        for name in names:
+            if name == "total":
+                values = np.array([p.total for p in profiles]) * 1000
+            else:
+                values = np.array([p.sections.get(name, 0) for p in profiles]) * 1000
+            stats = {
+                f"p{q:g}": float(v)
+                for q, v in zip(self.percentiles, np.percentile(values, self.percentiles))
+            }
+            stats["max"] = float(values.max())
+            result[name] = stats
+        return result
+
+    def clear(self) -> None:
+        self.profiles.clear()
+        self.last_stats = {}
+        self._frames = 0
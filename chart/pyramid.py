@@ -0,0 +1,117 @@
+import math
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .data_source import DataSource
+
+
+@dataclass()
+class PyramidLevel:
+    """
+    Items of a Pyramid level, every field is an array with one value per item.
+    Item i represents records [begins[i], ends[i]) of the DataSource.
+    """
+
+    begins: "np.ndarray"
+    ends: "np.ndarray"
+    lows: "np.ndarray"
+    highs: "np.ndarray"
+    opens: Optional["np.ndarray"] = None  # None if Pyramid has no open_field
+    closes: Optional["np.ndarray"] = None  # None if Pyramid has no close_field
+
+
+class Pyramid:
+    """
+    Multi-resolution view of a DataSource.
+    Level k merges every 2^k records (aligned to multiples of 2^k) into one item:
+    (first open, min low, max high, last close).
+
+    Lows and highs of every level are the levels of the MinMaxIndex of the DataSource,
+    which is updated incrementally as records are appended.
+    Opens and closes are picked from the DataSource directly,
+    so a Pyramid costs no memory besides that index.
+
+    If DataSource.supports_pyramid is False, only level 0 is available.
+    """
+
+    def __init__(
+        self,
+        data_source: "DataSource",
+        low_field: Optional[str] = None,
+        high_field: Optional[str] = None,
+        open_field: Optional[str] = None,
+        close_field: Optional[str] = None,
+    ):
+        self.data_source = data_source
+        self.low_field = low_field
+        self.high_field = high_field
+        self.open_field = open_field
+        self.close_field = close_field
+
+    @classmethod
+    def candle(cls, data_source: "DataSource") -> "Pyramid":
+        """create a Pyramid for a DataSource of CandleData"""
+        return cls(data_source, "low_price", "high_price", "open_price", "close_price")
+
+    def level_for(self, bars_per_pixel: float) -> int:
+        """
+        return the coarsest level having at least two items per pixel.
+        items are aligned to multiples of 2^level instead of pixel columns,
+        keeping them narrower than half a pixel limits the error of merging by pixel.
+        """
+        if bars_per_pixel < 4 or not self.data_source.supports_pyramid:
+            return 0
+        index = self.data_source.min_max_index(self.low_field, self.high_field)
+        return max(min(int(math.log2(bars_per_pixel)) - 1, index.level_count - 1), 0)
+
+    def get(self, level: int, begin: int, end: int) -> Optional["PyramidLevel"]:
+        """
+        return all the items of a level intersecting records [begin, end),
+        None if there is no record in [begin, end)
+        """
+        ds = self.data_source
+        size = len(ds)
+        begin, end = max(begin, ds.first_index), min(end, size)
+        if begin >= end:
+            return None
+        if not ds.supports_pyramid:
+            # only the original records are available
+            return self._get_records(begin, end)
+
+        lows, highs = ds.min_max_index(self.low_field, self.high_field).level(level)
+        width = 1 << level
+        first, last = begin >> level, ((end - 1) >> level) + 1
+        begins = np.arange(first, last) * width
+        ends = np.minimum(begins + width, size)
+        items = PyramidLevel(begins, ends, lows[first:last], highs[first:last])
+
+        if self.open_field is not None:
+            items.opens = ds.column(self.open_field, first * width, last * width, width)
+        if self.close_field is not None:
+            closes = ds.column(
+                self.close_field, first * width + width - 1, last * width, width
+            )
+            if len(closes) < len(begins):
+                # the last item is not full
+                closes = np.append(closes, ds.column(self.close_field, size - 1, size))
+            items.closes = closes
+        return items
+
+    def _get_records(self, begin: int, end: int) -> "PyramidLevel":
+        """return records [begin, end) as items of level 0"""
+        ds = self.data_source
+        begins = np.arange(begin, end)
+        items = PyramidLevel(
+            begins,
+            begins + 1,
+            ds.column(self.low_field, begin, end),
+            ds.column(self.high_field, begin, end),
+        )
+        if self.open_field is not None:
+            items.opens = ds.column(self.open_field, begin, end)
+        if self.close_field is not None:
+            items.closes = ds.column(self.close_field, begin, end)
+        return items
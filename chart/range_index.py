@@ -0,0 +1,168 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class MinMaxIndex:
+    """
+    Range-min/range-max index over a sequence of (low, high) pairs.
+
+    The index is a bottom-up binary tree stored level by level:
+    level 0 holds the raw values, the j-th item of level k holds the minimum of lows
+    and the maximum of highs of items [j * 2^k, (j + 1) * 2^k) of level 0.
+    The last item of a level may cover less than 2^k items.
+
+    Appending or overwriting m items costs O(m + log n), querying any range costs O(log n).
+    """
+
+    def __init__(self):
+        self._size = 0
+        # levels[k] = (lows, highs), capacity of each level is grown on demand
+        self._levels: List[Tuple["np.ndarray", "np.ndarray"]] = []
+
+    def __len__(self):
+        return self._size
+
+    def level(self, k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        return (lows, highs) of level k: each item covers 2^k items of the original sequence.
+        """
+        lows, highs = self._levels[k]
+        size = self._level_size(k)
+        return lows[:size], highs[:size]
+
+    @property
+    def level_count(self) -> int:
+        return len(self._levels)
+
+    def extend(self, lows: Sequence[float], highs: Sequence[float]) -> None:
+        self.set_range(self._size, lows, highs)
+
+    def set_range(self, begin: int, lows: Sequence[float], highs: Sequence[float]) -> None:
+        """
+        overwrite items [begin, begin + len(lows)).
+        if the range exceeds the end of the index, the index grows.
+        """
+        lows = np.asarray(lows, dtype="f8")
+        highs = np.asarray(highs, dtype="f8")
+        end = begin + len(lows)
+        if begin > self._size:
+            raise IndexError("MinMaxIndex can only be set continuously")
+        if end == begin:
+            return
+        self._size = max(self._size, end)
+        self._reserve()
+        level_lows, level_highs = self._levels[0]
+        level_lows[begin:end] = lows
+        level_highs[begin:end] = highs
+        self._rebuild(begin, end)
+
+    def truncate(self, size: int) -> None:
+        """
+        keep only the first size items.
+        """
+        if size >= self._size:
+            return
+        self._size = size
+        if size:
+            self._reserve()
+            self._rebuild(size - 1, size)
+        else:
+            self._levels = []
+
+    def delete(self, begin: int, end: int) -> None:
+        """
+        remove items [begin, end), items after them move forward.
+        """
+        end = min(end, self._size)
+        if begin >= end:
+            return
+        n = end - begin
+        lows, highs = self._levels[0]
+        lows[begin: self._size - n] = lows[end: self._size]
+        highs[begin: self._size - n] = highs[end: self._size]
+        self._size -= n
+        if self._size == 0:
+            self._levels = []
+            return
+        self._reserve()
+        self._rebuild(min(begin, self._size - 1), self._size)
+
+    def clear(self) -> None:
+        self.truncate(0)
+
+    def query(self, begin: int, end: int) -> Optional[Tuple[float, float]]:
+        """
+        :return: (min of lows, max of highs) of items [begin, end), or None if range is empty.
+        """
+        begin = max(begin, 0)
+        end = min(end, self._size)
+        if begin >= end:
+            return None
+        low, high = np.inf, -np.inf
+        for lows, highs in self._levels:
+            if begin >= end:
+                break
+            if begin & 1:
+                low = min(low, lows[begin])
+                high = max(high, highs[begin])
+                begin += 1
+            if end & 1:
+                end -= 1
+                low = min(low, lows[end])
+                high = max(high, highs[end])
+            begin >>= 1
+            end >>= 1
+        return float(low), float(high)
+
+    def _level_size(self, k: int) -> int:
+        return (self._size + (1 << k) - 1) >> k
+
+    def _reserve(self):
+        """make sure every level is large enough for self._size items"""
+        k = 0
+        while True:
+            size = self._level_size(k)
+            if k == len(self._levels):
+                capacity = max(size, 1024 >> k, 1)
+                self._levels.append(
+                    (np.empty(capacity, dtype="f8"), np.empty(capacity, dtype="f8"))
+                )
+            else:
+                lows, highs = self._levels[k]
+                if len(lows) < size:
+                    capacity = max(size, len(lows) * 2)
+                    new_lows = np.empty(capacity, dtype="f8")
+                    new_highs = np.empty(capacity, dtype="f8")
+                    new_lows[: len(lows)] = lows
+                    new_highs[: len(highs)] = highs
+                    self._levels[k] = new_lows, new_highs
+            if size == 1:
+                break
+            k += 1
+        del self._levels[k + 1:]
+
+    def _rebuild(self, begin: int, end: int):
+        """recalculate all the items covering [begin, end) of level 0"""
+        for k in range(1, len(self._levels)):
+            child_size = self._level_size(k - 1)
+            child_lows, child_highs = self._levels[k - 1]
+            lows, highs = self._levels[k]
+            begin, end = begin >> 1, ((end - 1) >> 1) + 1
+            child_begin, child_end = begin * 2, min(end * 2, child_size)
+            if child_end - child_begin == 1:
+                lows[begin] = child_lows[child_begin]
+                highs[begin] = child_highs[child_begin]
+                continue
+            count = child_end - child_begin
+            full_end = child_begin + count // 2 * 2
+            lows[begin: begin + count // 2] = child_lows[child_begin:full_end].reshape(
+                -1, 2
+            ).min(axis=1)
+            highs[begin: begin + count // 2] = child_highs[child_begin:full_end].reshape(
+                -1, 2
+            ).max(axis=1)
+            if count & 1:
+                # last item has only one child
+                lows[end - 1] = child_lows[child_end - 1]
+                highs[end - 1] = child_highs[child_end - 1]
@@ -0,0 +1,200 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+from PyQt5 import sip
+from PyQt5.QtCore import QLineF, QRectF
+
+# sip.array is available since PyQt5 5.15: QRectF stored contiguously,
+# which can be filled through numpy and drawn by QPainter.drawRects directly.
+HAS_SIP_ARRAY = hasattr(sip, "array")
+
+RectsType = Union["sip.array", List[QRectF]]
+LinesType = Union["sip.array", List[QLineF]]
+
+
+def line_array(values: "np.ndarray") -> "LinesType":
+    """
+    lines which can be passed to QPainter.drawLines(),
+    :param values (x1, y1, x2, y2) of lines, one row per line
+    """
+    n = len(values)
+    if HAS_SIP_ARRAY:
+        lines = sip.array(QLineF, n)
+        if n:
+            buffer = sip.voidptr(lines, n * 4 * 8)
+            np.frombuffer(buffer, dtype="f8").reshape(-1, 4)[:] = values
+        return lines
+    return [QLineF(*i) for i in np.asarray(values, dtype="f8").tolist()]
+
+
+class RectArray:
+    """
+    Packed array of rectangles grouped by item, used as the cache of drawers.
+    Every item has an index(index of record in DataSource)
+    and rects_per_item rectangles stored as (left, top, width, height).
+    Items must be added in ascending order of their indexes.
+    Like every bar drawn by a drawer, rectangles of an item are horizontally centered on
+    index + 0.5: left = index + 0.5 - 0.5 * width.
+
+    With sip.array, rects() gives QPainter.drawRects a slice of the array itself,
+    so no Python object is created per rectangle.
+    """
+
+    def __init__(self, rects_per_item: int = 1, capacity: int = 1024):
+        self.rects_per_item = rects_per_item
+        self._offset = 0  # storage position of the first item
+        self._size = 0
+        self._indexes = np.empty(0, dtype="i8")
+        self._objects = None  # sip.array holding memory of self._values
+        self._values = np.empty((0, 4), dtype="f8")
+        self._reserve(capacity)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def indexes(self) -> "np.ndarray":
+        return self._indexes[self._offset: self._offset + self._size]
+
+    @property
+    def values(self) -> "np.ndarray":
+        """(left, top, width, height) of all the rectangles, one row per rectangle"""
+        rpi = self.rects_per_item
+        return self._values[self._offset * rpi: (self._offset + self._size) * rpi]
+
+    def extend(self, indexes: "np.ndarray", values: "np.ndarray") -> None:
+        """
+        :param indexes indexes of new items
+        :param values rectangles of new items, shape: (len(indexes), rects_per_item * 4)
+        """
+        n = len(indexes)
+        if n == 0:
+            return
+        self._reserve(self._size + n)
+        begin = self._offset + self._size
+        end = begin + n
+        self._indexes[begin:end] = indexes
+        rpi = self.rects_per_item
+        self._values[begin * rpi: end * rpi] = np.reshape(values, (-1, 4))
+        self._size += n
+
+    def insert(self, indexes: "np.ndarray", values: "np.ndarray") -> None:
+        """
+        like extend(), but new items can be placed before existing items,
+        as long as no existing item has an index between indexes of new items.
+        Inserting at the end costs O(len(indexes)).
+        """
+        n = len(indexes)
+        if n == 0:
+            return
+        position = int(np.searchsorted(self.indexes, indexes[0]))
+        if position == self._size:
+            self.extend(indexes, values)
+            return
+        self._reserve(self._size + n)
+        rpi = self.rects_per_item
+        position += self._offset
+        end = self._offset + self._size
+        self._indexes[position + n: end + n] = self._indexes[position:end]
+        self._indexes[position: position + n] = indexes
+        self._values[(position + n) * rpi: (end + n) * rpi] = self._values[
+            position * rpi: end * rpi
+        ]
+        self._values[position * rpi: (position + n) * rpi] = np.reshape(values, (-1, 4))
+        self._size += n
+
+    def clear(self) -> None:
+        self._offset = 0
+        self._size = 0
+
+    def remove(self, begin: int, end: int, shift: bool = True) -> None:
+        """
+        remove items whose index is in [begin, end).
+        if shift is True, items after them move forward: their indexes decrease by
+        (end - begin), and so do the left of their rects.
+        """
+        first, last = self.find(begin, end)
+        size = self._size
+        removed = last - first
+        if removed == 0 and not shift:
+            return
+
+        if last == size:
+            # fast path: remove from the end
+            self._size = first
+            return
+        if first == 0 and not shift:
+            # fast path: remove from the beginning
+            self._offset += removed
+            self._size -= removed
+            return
+
+        rpi = self.rects_per_item
+        first += self._offset
+        last += self._offset
+        size_end = self._offset + size
+        moved = size_end - last
+
+        indexes = self._indexes[last:size_end]
+        if shift:
+            indexes = indexes - (end - begin)
+        self._indexes[first: first + moved] = indexes
+        values = self._values[first * rpi: (first + moved) * rpi]
+        values[:] = self._values[last * rpi: size_end * rpi]
+        if shift:
+            # calculate left exactly as a new rect would do
+            values[:, 0] = np.repeat(indexes, rpi) + 0.5 - 0.5 * values[:, 2]
+        self._size = size - removed
+
+    def find(self, begin: int, end: int) -> Tuple[int, int]:
+        """return the range of positions of items whose index is in [begin, end)"""
+        indexes = self.indexes
+        return (
+            int(np.searchsorted(indexes, begin)),
+            int(np.searchsorted(indexes, end)),
+        )
+
+    def rects(self, begin: int, end: int) -> "RectsType":
+        """
+        return rectangles of items whose index is in [begin, end),
+        which can be passed to QPainter.drawRects().
+        """
+        first, last = self.find(begin, end)
+        rpi = self.rects_per_item
+        first, last = (first + self._offset) * rpi, (last + self._offset) * rpi
+        if HAS_SIP_ARRAY:
+            return self._objects[first:last]
+        return [QRectF(*i) for i in self._values[first:last].tolist()]
+
+    def _reserve(self, size: int):
+        """make sure there is room for size items after self._offset"""
+        capacity = len(self._indexes)
+        if self._offset + size <= capacity:
+            return
+        rpi = self.rects_per_item
+        used_begin, used_end = self._offset, self._offset + self._size
+        if size <= capacity // 2:
+            # enough room if removed items at the beginning are dropped
+            self._indexes[: self._size] = self._indexes[used_begin:used_end]
+            self._values[: self._size * rpi] = self._values[used_begin * rpi: used_end * rpi]
+            self._offset = 0
+            return
+
+        capacity = max(size, capacity * 2)
+        rects_count = capacity * rpi
+
+        indexes = np.empty(capacity, dtype="i8")
+        indexes[: self._size] = self._indexes[used_begin:used_end]
+        if HAS_SIP_ARRAY:
+            objects = sip.array(QRectF, rects_count)
+            buffer = sip.voidptr(objects, rects_count * 4 * 8)
+            values = np.frombuffer(buffer, dtype="f8").reshape(-1, 4)
+        else:
+            objects = None
+            values = np.empty((rects_count, 4), dtype="f8")
+        values[: self._size * rpi] = self._values[used_begin * rpi: used_end * rpi]
+
+        self._indexes = indexes
+        self._objects = objects
+        self._values = values
+        self._offset = 0
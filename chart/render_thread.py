@@ -0,0 +1,86 @@
+import traceback
+from dataclasses import dataclass
+from threading import Condition
+from typing import Any, Optional, TYPE_CHECKING
+
+from PyQt5.QtCore import QCoreApplication, QThread, pyqtSignal
+from PyQt5.QtGui import QColor, QImage
+
+if TYPE_CHECKING:
+    from .chart import ChartWidget, ExtraDrawConfig
+
+
+@dataclass()
+class RenderRequest:
+    key: Any  # identify what is rendered, see ChartWidget._frame_key()
+    config: "ExtraDrawConfig"  # snapshot of config of the chart
+    width: int
+    height: int
+    device_pixel_ratio: float
+    background: "QColor"
+
+
+@dataclass()
+class RenderedFrame:
+    key: Any
+    image: "QImage"
+    config: "ExtraDrawConfig"  # config used to render image, with drawing_cache prepared
+
+
+class RenderThread(QThread):
+    """
+    Renders frames of a chart into QImage in a worker thread.
+
+    Only the latest request is kept: requests made while a frame is being rendered
+    replace each other, and the next frame renders the newest one.
+    Finished frames are delivered by frame_ready, which is queued to the GUI thread.
+
+    Every DataSource of the chart is locked(DataSource.lock) while a frame is rendered.
+    """
+
+    # (frame: RenderedFrame)
+    frame_ready = pyqtSignal(object)
+
+    def __init__(self, chart: "ChartWidget"):
+        super().__init__()
+        self._chart = chart
+        self._condition = Condition()
+        self._request: Optional["RenderRequest"] = None
+        self._stopped = False
+
+        # a running QThread must not be destroyed: stop it together with chart and app
+        chart.destroyed.connect(self.stop)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    def request(self, request: "RenderRequest") -> None:
+        """render request as soon as possible, replacing the pending one"""
+        with self._condition:
+            self._request = request
+            self._condition.notify()
+        if not self.isRunning() and not self._stopped:
+            self.start()
+
+    def stop(self) -> None:
+        """finish the frame being rendered and stop the thread"""
+        with self._condition:
+            self._stopped = True
+            self._request = None
+            self._condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._request is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                request, self._request = self._request, None
+            try:
+                frame = self._chart._render_frame(request)
+            except Exception:
+                traceback.print_exc()
+                continue
+            self.frame_ready.emit(frame)
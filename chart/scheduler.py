@@ -0,0 +1,72 @@
+import time
+from threading import Lock
+from typing import Dict, Optional, TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QRegion
+
+if TYPE_CHECKING:
+    from .chart import ChartWidget
+
+
+class FrameScheduler(QObject):
+    """
+    Collects repaint requests of charts and flushes them together once per frame,
+    at most max_fps frames per second.
+
+    Every request between two frames is merged: a chart asking for repaint many times,
+    or many charts asking for repaint at the same time(such as linked sub charts of an
+    AdvancedChartWidget), results in a single repaint pass.
+
+    Set ChartWidget.scheduler to use a FrameScheduler. schedule() should be called
+    from the GUI thread.
+    """
+
+    # emitted after repaint requests are flushed: (number of charts)
+    flushed = pyqtSignal(int)
+
+    def __init__(self, max_fps: float = 60, parent: Optional["QObject"] = None):
+        super().__init__(parent)
+        self.max_fps = max_fps
+        self._lock = Lock()
+        # chart => area to repaint, None to repaint the whole chart
+        self._pending: Dict["ChartWidget", Optional["QRegion"]] = {}
+        self._last_flush = 0.0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def frame_interval(self) -> float:
+        """minimum interval between two frames, in seconds"""
+        return 1 / self.max_fps if self.max_fps > 0 else 0
+
+    def schedule(self, chart: "ChartWidget", rect: Optional["QRect"] = None) -> None:
+        """
+        repaint rect of chart(the whole chart if rect is None) in the next frame.
+        """
+        with self._lock:
+            if chart in self._pending:
+                region = self._pending[chart]
+                if region is not None:
+                    self._pending[chart] = None if rect is None else region.united(rect)
+            else:
+                self._pending[chart] = None if rect is None else QRegion(rect)
+        if not self._timer.isActive():
+            delay = self._last_flush + self.frame_interval - time.perf_counter()
+            self._timer.start(max(int(delay * 1000), 0))
+
+    def flush(self) -> None:
+        """repaint every chart scheduled now"""
+        self._timer.stop()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        self._last_flush = time.perf_counter()
+        for chart, region in pending.items():
+            chart._on_repaint_flushed()
+            if region is None:
+                chart.update()
+            else:
+                chart.update(region)
+        self.flushed.emit(len(pending))
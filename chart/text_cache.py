@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPainter, QStaticText, QTransform
+
+# (static text, width, height): static text is None for texts QStaticText can't lay out
+TextLayout = Tuple[Optional["QStaticText"], float, float]
+
+
+class TextCache:
+    """
+    LRU cache of texts laid out for drawing: (font, text) => TextLayout.
+
+    Size of a text is measured by QPainter.boundingRect() once,
+    and the text is prepared as a QStaticText, whose glyphs are laid out only once,
+    so drawing it again costs no text shaping.
+    QStaticText has no line breaks, so texts with "\\n" are measured but not prepared.
+
+    Not thread-safe: use one TextCache for every painting thread.
+    """
+
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._layouts: "OrderedDict[Tuple[str, str], TextLayout]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, painter: "QPainter", text: str, flags: int, font_key: str) -> "TextLayout":
+        """
+        layout of text drawn by painter with its current font.
+        :param flags flags measuring text, see QPainter.boundingRect()
+        :param font_key painter.font().key(), which is the same for every text of a label drawer
+        """
+        key = (font_key, text)
+        layouts = self._layouts
+        layout = layouts.get(key)
+        if layout is not None:
+            layouts.move_to_end(key)
+            self.hits += 1
+            return layout
+
+        self.misses += 1
+        rect = painter.boundingRect(0, 0, 1000, 1000, flags, text)
+        if "\n" in text:
+            static_text = None
+        else:
+            static_text = QStaticText(text)
+            static_text.setTextFormat(Qt.PlainText)
+            static_text.prepare(QTransform(), painter.font())
+        layout = layouts[key] = (static_text, rect.width(), rect.height())
+        if len(layouts) > self.capacity:
+            layouts.popitem(last=False)
+        return layout
+
+    def clear(self) -> None:
+        self._layouts.clear()
+
+    def __len__(self):
+        return len(self._layouts)
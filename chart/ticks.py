@@ -0,0 +1,99 @@
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+def nice_step(step: float, min_step: float = 0) -> float:
+    """the smallest 1, 2 or 5 * 10^k not less than step and min_step"""
+    step = max(step, min_step)
+    if not step > 0 or not math.isfinite(step):
+        return min_step if min_step > 0 else 1
+    exponent = math.floor(math.log10(step))
+    for mantissa in (1, 2, 5, 10):
+        if exponent >= 0:
+            nice = mantissa * 10.0 ** exponent
+        else:
+            nice = mantissa / 10.0 ** -exponent  # exact for 0.1, 0.2, 0.05...
+        if nice >= step * (1 - 1e-9):
+            return nice
+    return step  # unreachable
+
+
+@dataclass(frozen=True)
+class Ticks:
+    step: float
+    # multiples of step in the range, used as positions of both grids and labels
+    values: Tuple[float, ...]
+
+
+class TickGenerator:
+    """
+    Ticks at round steps(1, 2 or 5 * 10^k) for grids and labels of an axis.
+
+    The step is the smallest round step keeping ticks at least min_spacing pixels apart
+    and at most max_count ticks in the range. Every tick is a multiple of the step,
+    so ticks stay at the same values while scrolling or when the range changes slightly,
+    which keeps pixmaps of axes cached by the chart valid.
+
+    Results are memoized by (begin, end, pixel_length, min_spacing, margin):
+    grids and labels painted in the same frame share one calculation.
+    """
+
+    def __init__(self, max_count: int = 10, integer: bool = False, capacity: int = 64):
+        self.max_count = max_count
+        self.integer = integer  # ticks are integers, such as indexes of candles
+        self.capacity = capacity
+        self._cache: "OrderedDict[tuple, Ticks]" = OrderedDict()
+
+    def ticks(
+        self,
+        begin: float,
+        end: float,
+        pixel_length: float,
+        min_spacing: float,
+        margin: float = 0,
+    ) -> "Ticks":
+        """
+        ticks in [begin, end).
+        :param pixel_length pixels between begin and end on the screen
+        :param min_spacing minimum pixels between two ticks, usually the size of a label
+        :param margin ticks closer than margin pixels to begin or end are skipped,
+                      such as those whose labels can never be fully printed
+        """
+        key = (begin, end, pixel_length, min_spacing, margin, self.max_count, self.integer)
+        cache = self._cache
+        ticks = cache.get(key)
+        if ticks is not None:
+            cache.move_to_end(key)
+            return ticks
+        ticks = cache[key] = self._generate(begin, end, pixel_length, min_spacing, margin)
+        if len(cache) > self.capacity:
+            cache.popitem(last=False)
+        return ticks
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def _generate(
+        self, begin: float, end: float, pixel_length: float, min_spacing: float, margin: float
+    ) -> "Ticks":
+        length = end - begin
+        if not length > 0 or not pixel_length > 0:
+            return Ticks(nice_step(0, 1 if self.integer else 0), ())
+        count = max(min(self.max_count, pixel_length / max(min_spacing, 1)), 1)
+        step = nice_step(length / count, 1 if self.integer else 0)
+
+        # multiples of step: k * step, which doesn't drift as accumulated steps do
+        margin_value = margin * length / pixel_length
+        first = math.ceil((begin + margin_value) / step)
+        last = math.ceil((end - margin_value) / step)  # exclusive
+        values = np.arange(first, max(last, first)) * step
+        if self.integer:
+            values = np.round(values)
+        else:
+            # remove noise such as 0.30000000000000004
+            values = np.round(values, max(0, -math.floor(math.log10(step))))
+        return Ticks(step, tuple(values.tolist()))
@@ -0,0 +1,90 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from chart import (  # noqa: E402
+    CandleArrayDataSource,
+    CandleAxisX,
+    CandleChartDrawer,
+    CandleData,
+    ChartWidget,
+    DataSource,
+    ValueAxisY,
+)
+
+
+@pytest.fixture(scope="session")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def candles(begin: int, end: int):
+    start = datetime(2020, 1, 1)
+    return [
+        CandleData(10 + i % 7, 9 + i % 7, 12 + i % 7, 11 + i % 7, start + timedelta(days=i))
+        for i in range(begin, end)
+    ]
+
+
+def record(i: float) -> "CandleData":
+    return CandleData(i, i - 1, i + 1, i + 0.5, datetime(2020, 1, 1))
+
+
+def record_signals(data_source: "DataSource") -> list:
+    """[(name of signal, begin, end)] emitted by data_source from now on"""
+    emitted = []
+    qobject = data_source.qobject
+    for name in ("data_appended", "data_removed", "data_updated", "data_evicted"):
+        getattr(qobject, name).connect(
+            lambda begin, end, name=name: emitted.append((name, begin, end))
+        )
+    return emitted
+
+
+def candle_columns(n: int, seed: int = 0) -> dict:
+    """columns of n random walk candles, one per minute"""
+    random = np.random.default_rng(seed)
+    close = 100 + np.cumsum(random.normal(0, 1, n))
+    open = close + random.normal(0, 1, n)
+    return {
+        "datetime": np.datetime64("2000-01-01", "us") + np.arange(n) * np.timedelta64(1, "m"),
+        "open_price": open,
+        "high_price": np.maximum(open, close) + 1,
+        "low_price": np.minimum(open, close) - 1,
+        "close_price": close,
+    }
+
+
+def candle_data_source(n: int, seed: int = 0) -> "CandleArrayDataSource":
+    data_source = CandleArrayDataSource()
+    data_source.extend_columns(**candle_columns(n, seed))
+    return data_source
+
+
+def create_chart(
+    data_source: "DataSource",
+    axis_data_source: "DataSource" = None,
+    drawer: "CandleChartDrawer" = None,
+) -> "ChartWidget":
+    chart = ChartWidget()
+    chart.resize(600, 300)
+    chart.add_drawer(drawer or CandleChartDrawer(data_source))
+    chart.add_axis(CandleAxisX(axis_data_source or data_source), ValueAxisY())
+    chart.use_layer_cache = True
+    return chart
+
+
+def wait_until(condition, timeout: float = 5):
+    """process events of GUI thread until condition() is True"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        QApplication.processEvents()
+        time.sleep(0.001)
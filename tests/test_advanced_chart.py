@@ -0,0 +1,96 @@
+from chart import (
+    AdvancedChartWidget,
+    CandleAxisX,
+    CandleChartDrawer,
+    ChartWidget,
+    DataSource,
+    ValueAxisY,
+)
+from chart.advanced_chart import CrossHairAxisX
+
+from conftest import candles, create_chart
+
+
+def create_cross_hair_chart():
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = create_chart(data_source)
+    chart.set_x_range(0, 100)
+    cross_hair = CrossHairAxisX(chart.all_axis_x[0])
+    chart.add_axis(cross_hair)
+    cross_hair._set_drawer_value(10.5)
+    chart.grab()
+    return chart, cross_hair
+
+
+def test_dirty_rects_dont_touch_label_data_source(app):
+    chart, cross_hair = create_cross_hair_chart()
+    texts = [i.text for i in cross_hair.label_drawer.data_source]
+    assert texts == ["2020-01-11"]
+
+    cross_hair._set_drawer_value(50.5)
+    old, new = cross_hair.dirty_rects()
+    assert [i.text for i in cross_hair.label_drawer.data_source] == texts
+    assert old != new
+
+
+def test_dirty_rects_without_labels(app):
+    chart, cross_hair = create_cross_hair_chart()
+    with_label = cross_hair.dirty_rects()[0]
+
+    cross_hair.label_visible = False
+    chart.grab()
+    painted = cross_hair.dirty_rects()[0]
+    assert with_label.contains(painted) and painted != with_label
+
+    cross_hair.axis_visible = False
+    assert cross_hair.dirty_rects() == [painted]  # erase the one painted
+    chart.grab()
+    assert cross_hair.dirty_rects() == []
+
+
+def test_sub_charts_use_layer_cache(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    advanced = AdvancedChartWidget()
+    chart = ChartWidget()
+    chart.add_drawer(CandleChartDrawer(data_source))
+    chart.add_axis(CandleAxisX(data_source), ValueAxisY())
+    wrapper = advanced.add_chart(chart).create_default_cross_hair()
+    advanced.resize(600, 300)
+    advanced.set_x_range(0, 100)
+    assert chart.use_layer_cache
+    chart.grab()
+
+    painted = []
+    paint_drawers = chart._paint_drawers
+    chart._paint_drawers = lambda *args: painted.append(args) or paint_drawers(*args)
+    wrapper.cross_hair_x._set_drawer_value(50.5)
+    chart.grab()
+    assert painted == []  # cached series layer is blitted
+    advanced.invalidate_layers()
+    chart.grab()
+    assert len(painted) == 1
+
+
+def test_sub_charts_scroll_fast(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 300))
+    advanced = AdvancedChartWidget()
+    chart = ChartWidget()
+    chart.add_drawer(CandleChartDrawer(data_source))
+    advanced.add_chart(chart)
+    advanced.main_layout.setContentsMargins(0, 0, 0, 0)
+    advanced.resize(590, 300)  # paddings of sub charts are 80 + 10: 5 pixels per bar
+    advanced.layout().activate()
+    advanced.set_x_range(100, 200)
+    chart.grab()
+
+    areas = []
+    paint_drawers = chart._paint_drawers
+    chart._paint_drawers = lambda config, painter, area=None: (
+        areas.append(area) or paint_drawers(config, painter, area)
+    )
+    advanced.scroll_x(1)
+    chart.grab()
+    assert [area.width() for area in areas] == [5]  # only the strip of a bar is painted
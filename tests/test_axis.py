@@ -0,0 +1,50 @@
+from chart import CandleLabelDataSource, DataSource, RingDataSource, ValueLabelDataSource
+
+from conftest import candles, create_chart
+
+
+def assert_independent(data_source: "DataSource", empty: "DataSource"):
+    assert type(empty) is type(data_source)
+    assert len(empty) == 0
+    assert empty.qobject is not data_source.qobject
+    assert empty.lock is not data_source.lock
+
+
+def test_create_empty_keeps_settings(app):
+    value_labels = ValueLabelDataSource("%.4f")
+    value_labels.append_by_index(1.5)
+    empty = value_labels.create_empty()
+    assert_independent(value_labels, empty)
+    assert empty.format == "%.4f"
+    assert len(value_labels) == 1
+
+    candles = DataSource()
+    date_labels = CandleLabelDataSource(candles, "%Y%m%d")
+    date_labels.use_label_cache = False
+    empty = date_labels.create_empty()
+    assert_independent(date_labels, empty)
+    assert empty.candle_data_source is candles
+    assert (empty.format, empty.use_label_cache) == ("%Y%m%d", False)
+
+    ring = RingDataSource(8)
+    ring.append(1)
+    empty = ring.create_empty()
+    assert_independent(ring, empty)
+    assert empty.capacity == 8
+
+
+def test_candle_labels_of_a_plain_sequence(app):
+    # labels of a sequence without signals are not cached
+    records = candles(0, 90)
+    labels = CandleLabelDataSource(records)
+    labels.append_by_index_sequence([0, 10, 200])
+    assert [i.text for i in labels] == ["2020-01-01", "2020-01-11"]
+
+    data_source = DataSource()
+    data_source.extend(records)
+    images = []
+    for axis_data_source in (records, data_source):
+        chart = create_chart(data_source, axis_data_source)
+        chart.set_x_range(0, 100)
+        images.append(chart.render_to_image())
+    assert images[0] == images[1]
@@ -0,0 +1,69 @@
+from functools import partial
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+from chart import ChartWidget
+from chart.batch import BatchRenderer, RenderJob, create_candle_chart
+
+from conftest import candle_columns
+
+
+def chart_columns(n: int) -> dict:
+    columns = candle_columns(n)
+    columns["volume"] = np.full(n, 100.0)  # columns not used by the chart are ignored
+    return columns
+
+
+def test_create_candle_chart(app):
+    chart = create_candle_chart(chart_columns(20), (5, 15))
+    assert chart.x_range == (5, 15)
+    assert not chart.render_to_image(QSize(200, 100)).isNull()
+
+
+def test_create_candle_chart_missing_columns(app):
+    columns = chart_columns(20)
+    del columns["low_price"], columns["datetime"]
+    with pytest.raises(ValueError) as info:
+        create_candle_chart(columns)
+    assert "low_price" in str(info.value) and "datetime" in str(info.value)
+
+
+def test_batch_renderer(app):
+    columns = chart_columns(20)
+    jobs = [
+        RenderJob("all", partial(create_candle_chart, columns), size=(200, 100)),
+        RenderJob("half", partial(create_candle_chart, columns), (200, 100), x_range=(10, 20)),
+        RenderJob("missing", partial(create_candle_chart, {}), size=(200, 100)),
+    ]
+    with BatchRenderer(processes=1) as renderer:
+        results = {result.key: result for result in renderer.render(jobs)}
+
+    assert set(results) == {"all", "half", "missing"}
+    missing = results["missing"]
+    assert missing.data is None and "ValueError" in missing.error
+    for key in ("all", "half"):
+        assert results[key].error is None
+    images = [QImage.fromData(results[key].data, "PNG") for key in ("all", "half")]
+    assert [(i.width(), i.height()) for i in images] == [(200, 100), (200, 100)]
+    expected = create_candle_chart(columns).render_to_image(QSize(200, 100))
+    assert images[0].convertToFormat(QImage.Format_RGB32) == expected.convertToFormat(
+        QImage.Format_RGB32
+    )
+
+
+def offscreen_chart() -> "ChartWidget":
+    platform = QApplication.platformName()
+    if platform != "offscreen":
+        raise RuntimeError(f"worker runs on {platform}")
+    return create_candle_chart(chart_columns(5))
+
+
+def test_workers_are_offscreen(app, monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "minimal")  # inherited by workers
+    with BatchRenderer(processes=1) as renderer:
+        result, = renderer.render([RenderJob("chart", offscreen_chart, size=(50, 50))])
+    assert result.error is None
@@ -0,0 +1,30 @@
+from argparse import Namespace
+
+import pytest
+
+import benchmark
+
+
+def args(**kwargs) -> "Namespace":
+    settings = dict(frames=2, window=20, width=320, height=200, lod=False)
+    settings.update(kwargs)
+    return Namespace(**settings)
+
+
+def assert_result(result: dict, bars: int):
+    assert result["bars"] == bars
+    assert result["first_frame_ms"] > 0
+    assert result["scroll"]["fps"] > 0 and result["zoom"]["fps"] > 0
+
+
+def test_bench_chart(app):
+    result = benchmark.bench_chart(benchmark.synthetic_columns(50), args())
+    assert_result(result, 50)
+    assert set(result["frame"]["window"]["phases"]) == set(benchmark.PHASES)
+
+
+def test_bench_legacy(app):
+    pytest.importorskip("PyQt5.QtChart")
+    legacy = benchmark.load_legacy()
+    assert legacy is not None
+    assert_result(benchmark.bench_legacy(legacy, benchmark.synthetic_columns(50), args()), 50)
@@ -0,0 +1,171 @@
+from PyQt5.QtGui import QImage
+
+from chart import CandleAxisX, CandleChartDrawer, ChartWidget, DataSource, ValueAxisY
+
+from conftest import candles, create_chart, record
+
+
+def test_layer_cache_repaints_axis_after_data_appended(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 40))
+    chart = create_chart(data_source)
+    chart.set_x_range(0, 100)
+    chart.grab()  # layers are cached
+
+    data_source.extend(candles(40, 90))
+    cached = chart.grab().toImage()
+    chart.use_layer_cache = False
+    uncached = chart.grab().toImage()
+    assert cached == uncached
+    rendered = chart.render_to_image().convertToFormat(QImage.Format_RGB32)
+    assert cached.convertToFormat(QImage.Format_RGB32) == rendered
+
+
+def test_layer_cache_repaints_axis_after_axis_data_changed(app):
+    # axis using a data source not drawn by any drawer
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    axis_data_source = DataSource()
+    axis_data_source.extend(candles(0, 40))
+    chart = create_chart(data_source, axis_data_source)
+    chart.set_x_range(0, 100)
+    chart.grab()
+
+    axis_data_source.extend(candles(40, 90))
+    cached = chart.grab().toImage()
+    chart.use_layer_cache = False
+    assert cached == chart.grab().toImage()
+
+
+def test_layer_cache_repaints_axis_after_axis_data_removed(app):
+    # labels in the x range are moved by removing records before it
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    axis_data_source = DataSource()
+    axis_data_source.extend(candles(0, 90))
+    chart = create_chart(data_source, axis_data_source)
+    chart.set_x_range(40, 90)
+    chart.grab()
+
+    del axis_data_source[0:30]
+    cached = chart.grab().toImage()
+    chart.use_layer_cache = False
+    assert cached == chart.grab().toImage()
+
+
+def test_style_change_is_shown_without_layer_cache(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = ChartWidget()
+    chart.resize(600, 300)
+    drawer = CandleChartDrawer(data_source)
+    chart.add_drawer(drawer)
+    chart.add_axis(CandleAxisX(data_source), ValueAxisY())
+    chart.set_x_range(0, 100)
+    before = chart.grab().toImage()
+
+    drawer.growing_color = "blue"
+    after = chart.grab().toImage()
+    assert after != before
+    assert after.convertToFormat(QImage.Format_RGB32) == chart.render_to_image().convertToFormat(
+        QImage.Format_RGB32
+    )
+
+
+def test_layer_cache_repaints_after_invalidate_layers(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    drawer = CandleChartDrawer(data_source)
+    chart = create_chart(data_source, drawer=drawer)
+    chart.set_x_range(0, 100)
+    before = chart.grab().toImage()
+
+    drawer.growing_color = "blue"
+    assert chart.grab().toImage() == before  # styles are not tracked by cached layers
+    chart.invalidate_layers()
+    chart.use_layer_cache = False
+    uncached = chart.grab().toImage()
+    assert uncached != before
+    chart.use_layer_cache = True
+    assert chart.grab().toImage() == uncached
+
+
+def test_fast_scroll_equals_full_repaint(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 300))
+    chart = create_chart(data_source)
+    reference = create_chart(data_source)
+    reference.use_layer_cache = False
+    chart.set_x_range(100, 200)  # 5 pixels per bar
+    chart.grab()
+    areas = []
+    paint_drawers = chart._paint_drawers
+
+    def spy(config, painter, area=None):
+        areas.append(area)
+        paint_drawers(config, painter, area)
+
+    chart._paint_drawers = spy
+
+    for diff in (1, 7, -3, -20):
+        chart.scroll_x(diff)
+        reference.set_x_range(*chart.x_range)
+        assert chart.grab().toImage() == reference.grab().toImage(), diff
+    # only strips are painted
+    assert [area.width() for area in areas] == [5, 35, 15, 100]
+
+
+def test_only_changes_in_x_range_repaint(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = create_chart(data_source)
+    chart.set_x_range(20, 50)
+    repaints = []
+    chart.schedule_repaint = lambda rect=None: repaints.append(rect)
+    version = chart._data_version
+
+    data_source.update(60, data_source[61])
+    data_source.update(19, data_source[18])
+    data_source.extend(candles(90, 100))
+    data_source.set_last(data_source[0])
+    assert repaints == [] and chart._data_version == version
+
+    # drawn by the drawer and labeled by the axis, but reported once
+    data_source.update(20, data_source[21])
+    assert repaints == [None]
+    chart.set_x_range(95, 105)
+    repaints.clear()
+    data_source.extend(candles(100, 101))
+    assert repaints == [None]
+    assert chart._data_version == version + 2
+
+
+def test_no_repaint_without_auto_repaint(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = create_chart(data_source)
+    chart.set_x_range(0, 100)
+    before = chart.grab().toImage()
+    chart.use_auto_repaint = False
+    repaints = []
+    chart.schedule_repaint = lambda rect=None: repaints.append(rect)
+
+    data_source.update(10, record(50))
+    assert repaints == []
+    # but cached layers are not shown any more
+    assert chart.grab().toImage() != before
+
+
+def test_axis_added_before_drawer_reports_once(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = ChartWidget()
+    chart.add_axis(CandleAxisX(data_source), ValueAxisY())
+    chart.add_drawer(CandleChartDrawer(data_source))
+    chart.add_drawer(CandleChartDrawer(data_source))
+    chart.set_x_range(0, 100)
+    repaints = []
+    chart.schedule_repaint = lambda rect=None: repaints.append(rect)
+
+    del data_source[80:]
+    assert repaints == [None]
@@ -0,0 +1,47 @@
+import pytest
+
+from chart import ArrayDataSource, CandleArrayDataSource, DataSource
+
+from conftest import record, record_signals
+
+
+@pytest.fixture(params=[DataSource, CandleArrayDataSource])
+def candles(request):
+    data_source = request.param()
+    data_source.extend([record(i) for i in range(5)])
+    return data_source
+
+
+def test_update(candles):
+    emitted = record_signals(candles)
+    candles.update(2, record(20))
+    candles.update(-1, record(40))
+    assert emitted == [("data_updated", 2, 3), ("data_updated", 4, 5)]
+    assert [i.open_price for i in candles] == [0, 1, 20, 3, 40]
+    # index, low and high are kept up to date
+    assert candles.min_max(0, 5, "low_price", "high_price") == (-1, 41)
+
+
+def test_set_last(candles):
+    emitted = record_signals(candles)
+    candles.set_last(record(9))
+    assert emitted == [("data_updated", 4, 5)]
+    assert candles[4].open_price == 9
+    assert len(candles) == 5
+
+
+@pytest.mark.parametrize("index", [5, -6])
+def test_update_out_of_range(candles, index):
+    emitted = record_signals(candles)
+    with pytest.raises(IndexError):
+        candles.update(index, record(9))
+    assert emitted == []
+
+
+def test_update_of_array_data_source():
+    data_source = ArrayDataSource()
+    data_source.extend([1.0, 2.0, 3.0])
+    emitted = record_signals(data_source)
+    data_source.set_last(-5.0)
+    assert emitted == [("data_updated", 2, 3)]
+    assert data_source.min_max(0, 3) == (-5, 2)
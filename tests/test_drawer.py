@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage
+
+from chart import (
+    ArrayDataSource,
+    BarChartDrawer,
+    CandleChartDrawer,
+    ChartWidget,
+    DataSource,
+    DataSourceQObject,
+)
+
+from conftest import candle_data_source, candles
+
+
+class UnformalDataSource(list):
+    """a plain sequence of records with signals, not a subclass of DataSource"""
+
+    def __init__(self, records):
+        super().__init__(records)
+        self.qobject = DataSourceQObject()
+
+
+def render(data_source, drawer_type=CandleChartDrawer, **settings) -> "QImage":
+    chart = ChartWidget()
+    drawer = drawer_type(data_source)
+    for name, value in settings.items():
+        setattr(drawer, name, value)
+    chart.add_drawer(drawer)
+    chart.set_x_range(0, len(data_source))
+    return chart.render_to_image(QSize(400, 200))
+
+
+def bar_data_source(n: int) -> "ArrayDataSource":
+    data_source = ArrayDataSource()
+    data_source.extend(np.random.default_rng(0).normal(0, 10, n).tolist())
+    return data_source
+
+
+def test_candle_drawer_supports_unformal_data_source(app):
+    records = candles(0, 50)
+    data_source = DataSource()
+    data_source.extend(records)
+    assert render(UnformalDataSource(records)) == render(data_source)
+
+
+@pytest.mark.parametrize(
+    "drawer_type, create_data_source",
+    [(CandleChartDrawer, candle_data_source), (BarChartDrawer, bar_data_source)],
+)
+def test_default_drawing_equals_drawing_every_bar(app, drawer_type, create_data_source):
+    # lod merges bars of a pixel column into a solid column, which is only opt-in
+    data_source = create_data_source(5000)
+    every_bar = render(data_source, drawer_type, use_lod=False)
+    assert render(data_source, drawer_type) == every_bar
+    assert render(data_source, drawer_type, use_lod=True) != every_bar
+
+
+@pytest.mark.parametrize(
+    "drawer_type, create_data_source",
+    [(CandleChartDrawer, candle_data_source), (BarChartDrawer, bar_data_source)],
+)
+def test_lod_is_unused_below_lod_bars_per_pixel(app, drawer_type, create_data_source):
+    data_source = create_data_source(300)  # less than 1 bar per pixel
+    lod = render(data_source, drawer_type, use_lod=True)
+    assert lod == render(data_source, drawer_type, use_lod=False)
+
+
+def cached_rects(drawer) -> tuple:
+    cache = drawer._cache
+    return (
+        cache.begin,
+        cache.end,
+        cache.first.indexes.tolist(),
+        cache.first.values.tolist(),
+        cache.second.indexes.tolist(),
+        cache.second.values.tolist(),
+    )
+
+
+def spy_generated_ranges(drawer) -> list:
+    """record every range of records the cache of drawer generates"""
+    ranges = []
+    generate = drawer._cache._generate
+
+    def spy(begin, end):
+        ranges.append((begin, end))
+        return generate(begin, end)
+
+    drawer._cache._generate = spy
+    return ranges
+
+
+def assert_cache_matches_fresh_drawer(drawer, begin: int, end: int):
+    fresh = type(drawer)(drawer._data_source)
+    fresh._cache.ensure(drawer._cache.begin, drawer._cache.end)
+    assert cached_rects(drawer) == cached_rects(fresh)
+    # and what is drawn next matches too
+    drawer._cache.ensure(begin, end)
+    fresh._cache.ensure(begin, end)
+    assert cached_rects(drawer) == cached_rects(fresh)
+
+
+@pytest.mark.parametrize("begin, end", [(0, 5), (10, 20), (95, 100), (30, 31)])
+def test_cache_is_repaired_after_delete(begin, end):
+    data_source = candle_data_source(100)
+    drawer = CandleChartDrawer(data_source)
+    drawer._cache.ensure(0, 100)
+    generated = spy_generated_ranges(drawer)
+
+    del data_source[begin:end]
+    assert generated == []  # cached rects are moved, not generated again
+    assert_cache_matches_fresh_drawer(drawer, 0, len(data_source))
+
+
+@pytest.mark.parametrize("index", [0, 42, 99, -1])
+def test_cache_is_repaired_after_update(index):
+    data_source = candle_data_source(100)
+    drawer = CandleChartDrawer(data_source)
+    drawer._cache.ensure(0, 100)
+    generated = spy_generated_ranges(drawer)
+
+    record = data_source[index]
+    # a raising candle becomes a falling one: it moves from first to second
+    record.open_price, record.close_price = record.close_price + 5, record.open_price - 5
+    data_source.update(index, record)
+    position = index % len(data_source)
+    assert generated == [(position, position + 1)]
+    assert_cache_matches_fresh_drawer(drawer, 0, 100)
+
+
+def test_cache_is_repaired_after_set_last():
+    data_source = candle_data_source(100)
+    drawer = CandleChartDrawer(data_source)
+    drawer._cache.ensure(50, 100)
+    generated = spy_generated_ranges(drawer)
+
+    record = data_source[-1]
+    record.high_price += 10
+    data_source.set_last(record)
+    assert generated == [(99, 100)]
+    assert_cache_matches_fresh_drawer(drawer, 50, 100)
+
+
+def test_cache_ignores_update_out_of_cache():
+    data_source = candle_data_source(100)
+    drawer = CandleChartDrawer(data_source)
+    drawer._cache.ensure(50, 100)
+    generated = spy_generated_ranges(drawer)
+    data_source.update(10, data_source[10])
+    assert generated == []
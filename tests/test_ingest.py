@@ -0,0 +1,73 @@
+from threading import Thread
+
+import numpy as np
+
+from chart import DataSource, IngestQueue
+
+from conftest import record_signals, wait_until
+
+THREADS = 4
+RECORDS = 500  # pushed by every thread
+
+
+def produce(queue: "IngestQueue", producer: int):
+    for i in range(0, RECORDS, 2):
+        queue.push((producer, i))
+        queue.push_many([(producer, i + 1)])
+
+
+def start_producers(queue: "IngestQueue") -> list:
+    threads = [Thread(target=produce, args=(queue, i)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def assert_records(data_source: "DataSource"):
+    assert len(data_source) == THREADS * RECORDS
+    for producer in range(THREADS):
+        # records of a producer keep their order
+        assert [i for p, i in data_source if p == producer] == list(range(RECORDS))
+
+
+class RecordedIngestQueue(IngestQueue):
+    """records number of records moved by every drain"""
+
+    def __init__(self, *args, **kwargs):
+        self.drained = []
+        super().__init__(*args, **kwargs)
+
+    def drain(self) -> int:
+        n = super().drain()
+        self.drained.append(n)
+        return n
+
+
+def test_records_pushed_before_a_drain_are_appended_at_once(app):
+    data_source = DataSource()
+    emitted = record_signals(data_source)
+    queue = IngestQueue(data_source)
+    for thread in start_producers(queue):
+        thread.join()
+    assert len(data_source) == 0 and len(queue) == THREADS * RECORDS
+
+    wait_until(lambda: len(queue) == 0)
+    assert emitted == [("data_appended", 0, THREADS * RECORDS)]
+    assert_records(data_source)
+
+
+def test_one_data_appended_per_drain(app):
+    data_source = DataSource()
+    emitted = record_signals(data_source)
+    queue = RecordedIngestQueue(data_source, max_fps=1000)
+
+    threads = start_producers(queue)
+    wait_until(lambda: len(data_source) == THREADS * RECORDS)
+    for thread in threads:
+        thread.join()
+
+    batches = [n for n in queue.drained if n]
+    assert [end - begin for _, begin, end in emitted] == batches
+    assert [begin for _, begin, _ in emitted] == [0] + list(np.cumsum(batches[:-1]))
+    assert {name for name, _, _ in emitted} == {"data_appended"}
+    assert_records(data_source)
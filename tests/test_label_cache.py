@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from chart import CandleArrayDataSource, CandleData, DataSource, DateTimeLabelCache, RingDataSource
+from chart import format_datetimes
+
+from conftest import candles
+
+
+@pytest.mark.parametrize(
+    "format",
+    ["%Y-%m-%d", "%Y%m%d %H:%M:%S", "%H%M", "100%% %d", "", "%b %d, %Y", "%Y年%m月"],
+)
+def test_format_datetimes_equals_strftime(format):
+    random = np.random.default_rng(0)
+    # years from 70 to 3870
+    values = np.datetime64("1970-01-01", "us") + random.integers(
+        -6 * 10 ** 16, 6 * 10 ** 16, 100
+    ).astype("timedelta64[us]")
+    dts = values.tolist() + [
+        datetime(1, 1, 1),
+        datetime(999, 12, 31, 23, 59, 59),
+        datetime(1000, 1, 1),
+        datetime(9999, 12, 31, 23, 59, 59, 999999),
+    ]
+    expected = [dt.strftime(format) for dt in dts]
+    assert format_datetimes(dts, format) == expected
+    assert format_datetimes(np.array(dts, dtype="datetime64[us]"), format) == expected
+    assert format_datetimes([], format) == []
+
+
+@pytest.fixture(params=[DataSource, CandleArrayDataSource])
+def data_source(request):
+    data_source = request.param()
+    data_source.extend(candles(0, 10))
+    return data_source
+
+
+def dates(data_source) -> list:
+    return [i.datetime.strftime("%Y-%m-%d") for i in data_source[:]]
+
+
+def test_cache_is_shared(data_source):
+    cache = DateTimeLabelCache.of(data_source, "%Y-%m-%d")
+    assert DateTimeLabelCache.of(data_source, "%Y-%m-%d") is cache
+    assert DateTimeLabelCache.of(data_source, "%Y%m%d") is not cache
+    assert cache.get_many([9, 0, 10, -1]) == ["2020-01-10", "2020-01-01", None, None]
+    assert cache.get(3) == "2020-01-04"
+    assert len(cache) == 3
+
+
+def test_cache_is_invalidated_on_remove(data_source):
+    cache = DateTimeLabelCache.of(data_source, "%Y-%m-%d")
+    cache.get_many(range(10))
+    del data_source[2:4]
+    assert len(cache) == 2  # labels before removed records are kept
+    assert cache.get_many(range(10)) == dates(data_source) + [None, None]
+    data_source.clear()
+    assert len(cache) == 0 and cache.get(0) is None
+
+
+def test_cache_is_invalidated_on_update(data_source):
+    cache = DateTimeLabelCache.of(data_source, "%Y-%m-%d")
+    cache.get_many(range(10))
+    data_source.update(5, CandleData(1, 1, 1, 1, datetime(2021, 2, 3)))
+    last = data_source[-1]
+    last.datetime += timedelta(days=100)
+    data_source.set_last(last)
+    assert cache.get_many(range(10)) == dates(data_source)
+    assert cache.get(5) == "2021-02-03"
+
+
+def test_cache_is_invalidated_on_eviction():
+    data_source = RingDataSource(4)
+    data_source.extend(candles(0, 4))
+    cache = DateTimeLabelCache.of(data_source, "%Y-%m-%d")
+    assert cache.get_many(range(4)) == dates(data_source)
+    data_source.extend(candles(4, 6))
+    assert cache.get_many(range(6)) == [None, None] + dates(data_source)
+
+
+def test_cache_keeps_recently_used_labels():
+    data_source = RingDataSource(100)
+    data_source.extend(candles(0, 10))
+    cache = DateTimeLabelCache(data_source, "%Y-%m-%d", capacity=4)
+    assert cache.get_many(range(6)) == dates(data_source)[:6]  # more than capacity at once
+    assert len(cache) == 4
+    assert cache.get(2) == "2020-01-03"  # 2, 3, 4, 5 are kept, 2 is the newest now
+    cache.get_many([8, 9])
+    assert sorted(cache._labels) == [2, 5, 8, 9]
+
+    # a live chart formats every new record
+    for i in range(10, 300):
+        data_source.extend(candles(i, i + 1))
+        assert cache.get(i) == data_source[i].datetime.strftime("%Y-%m-%d")
+    assert len(cache) == 4
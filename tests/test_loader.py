@@ -0,0 +1,48 @@
+import pytest
+
+from chart import ArrayDataSource, CandleCsvFile
+
+HEADER = "代码,时间,开盘价,最高价,最低价,收盘价,成交量(股),成交额(元)"
+LINES = [
+    "SH600000,1999-11-10,29.5000,29.8000,27.0000,27.7500,174085000,4859102208.00",
+    "SH600000,1999-11-11,27.5800,28.3800,27.5300,27.7100,29403400,821582208.00",
+    "SZ000001,1991-04-03,49.0000,49.0000,49.0000,49.0000,100,5000.00",
+]
+
+
+def write_csv(path, header, lines):
+    path.write_text("\n".join([header] + lines) + "\n", encoding="gbk")
+    return str(path)
+
+
+def test_load(tmp_path):
+    csv = CandleCsvFile(write_csv(tmp_path / "day.csv", HEADER, LINES))
+    volume = ArrayDataSource()
+    data_source = csv.load("SH600000", volume_data_source=volume)
+    csv.close()
+
+    assert len(data_source) == 2
+    assert data_source[1].close_price == 27.71
+    assert [float(v) for v in volume] == [174085000, 29403400]
+
+
+def test_load_missing_column(tmp_path):
+    header = HEADER.replace("最低价,", "")
+    lines = [",".join(line.split(",")[:4] + line.split(",")[5:]) for line in LINES]
+    csv = CandleCsvFile(write_csv(tmp_path / "day.csv", header, lines))
+    with pytest.raises(ValueError, match="最低价"):
+        csv.load("SH600000")
+    csv.close()
+
+
+def test_load_missing_volume(tmp_path):
+    header = HEADER.replace("成交量(股),", "")
+    lines = [",".join(line.split(",")[:6] + line.split(",")[7:]) for line in LINES]
+    csv = CandleCsvFile(write_csv(tmp_path / "day.csv", header, lines))
+    volume = ArrayDataSource()
+    with pytest.raises(ValueError, match="volume"):
+        csv.load("SH600000", volume_data_source=volume)
+    # candles alone can still be loaded
+    assert len(csv.load("SH600000")) == 2
+    assert len(volume) == 0
+    csv.close()
@@ -0,0 +1,97 @@
+import weakref
+from datetime import datetime
+
+import pytest
+from PyQt5.QtCore import QSize
+
+from chart import CandleChartDrawer, CandleData, ChartWidget, MmapCandleDataSource
+from chart import mmap_data_source
+
+
+@pytest.fixture()
+def readonly_data_source(tmp_path):
+    path = str(tmp_path / "candles.bin")
+    data_source = MmapCandleDataSource(path)
+    data_source.extend(
+        [CandleData(1 + i, 0.5 + i, 2 + i, 1.5 + i, datetime(2020, 1, 1 + i)) for i in range(3)]
+    )
+    data_source.close()
+    data_source = MmapCandleDataSource(path, readonly=True)
+    yield data_source
+    data_source.close()
+
+
+def assert_unchanged(data_source: "MmapCandleDataSource"):
+    assert len(data_source) == 3
+    assert [i.open_price for i in data_source] == [1, 2, 3]
+
+
+def test_readonly_clear(readonly_data_source):
+    removed = []
+    readonly_data_source.qobject.data_removed.connect(lambda *args: removed.append(args))
+    with pytest.raises(PermissionError):
+        readonly_data_source.clear()
+    assert removed == []
+    assert_unchanged(readonly_data_source)
+
+
+def test_readonly_del(readonly_data_source):
+    removed = []
+    readonly_data_source.qobject.data_removed.connect(lambda *args: removed.append(args))
+    with pytest.raises(PermissionError):
+        del readonly_data_source[0]
+    with pytest.raises(PermissionError):
+        del readonly_data_source[1:]
+    assert removed == []
+    assert_unchanged(readonly_data_source)
+
+
+def test_readonly_update_and_append(readonly_data_source):
+    record = CandleData(9, 9, 9, 9, datetime(2021, 1, 1))
+    with pytest.raises(PermissionError):
+        readonly_data_source.update(0, record)
+    with pytest.raises(PermissionError):
+        readonly_data_source.append(record)
+    assert_unchanged(readonly_data_source)
+
+
+def test_zoomed_out_drawing_reads_no_index(app, tmp_path):
+    data_source = MmapCandleDataSource(str(tmp_path / "candles.bin"))
+    data_source.extend(
+        [CandleData(1 + i % 5, 0.5, 7, 2, datetime(2020, 1, 1)) for i in range(5000)]
+    )
+    assert not data_source.supports_pyramid
+    with pytest.raises(TypeError):
+        data_source.min_max_index("low_price", "high_price")
+    with pytest.raises(TypeError, match="create_empty"):
+        data_source.create_empty()
+
+    chart = ChartWidget()
+    drawer = CandleChartDrawer(data_source)
+    drawer.use_lod = drawer.use_pyramid = True
+    chart.add_drawer(drawer)
+    chart.set_x_range(0, len(data_source))
+    chart.render_to_image(QSize(200, 100))
+    assert drawer.pyramid.level_for(25) == 0
+    assert data_source._min_max_indexes == {}
+    data_source.close()
+
+
+def test_file_is_unmapped_before_growing(tmp_path, monkeypatch):
+    data_source = MmapCandleDataSource(str(tmp_path / "candles.bin"), capacity=2)
+    records = [
+        CandleData(1 + i, 0.5 + i, 2 + i, 1.5 + i, datetime(2020, 1, 1 + i)) for i in range(5)
+    ]
+    data_source.extend(records[:2])
+    mapped = weakref.ref(data_source._records)
+
+    def open_unmapped(*args, **kwargs):
+        # a mapped file can't be resized on Windows
+        assert mapped() is None
+        return open(*args, **kwargs)
+
+    monkeypatch.setattr(mmap_data_source, "open", open_unmapped, raising=False)
+    data_source.extend(records[2:])
+    assert data_source.capacity == 5
+    assert [i.open_price for i in data_source] == [1, 2, 3, 4, 5]
+    data_source.close()
@@ -0,0 +1,99 @@
+import gc
+import time
+
+import pytest
+
+from chart import CandleChartDrawer, DataSource, FrameProfiler
+from chart.profiling import NO_PROFILING, section
+
+from conftest import candles, create_chart
+
+
+def profile_frame(profiler: "FrameProfiler", seconds: float = 0):
+    profiler.begin_frame()
+    with profiler.section("outer"):
+        with profiler.section("inner"):
+            time.sleep(seconds)
+        with profiler.section("inner"):
+            pass
+    return profiler.end_frame()
+
+
+def test_sections():
+    profiler = FrameProfiler()
+    profile = profile_frame(profiler, 0.01)
+    assert set(profile.sections) == {"outer", "outer/inner"}
+    assert 0.01 <= profile.sections["outer/inner"] <= profile.sections["outer"] <= profile.total
+    assert profile.slowest(1) == [("outer", profile.sections["outer"])]
+
+
+def test_section_of_owner():
+    assert section(None, "draw") is NO_PROFILING
+    profiler = FrameProfiler()
+    first, second = CandleChartDrawer(DataSource()), CandleChartDrawer(DataSource())
+    profiler.begin_frame()
+    for drawer in (first, second, first):
+        with section(profiler, "draw", drawer):
+            pass
+    profile = profiler.end_frame()
+    assert set(profile.sections) == {"CandleChartDrawer#0.draw", "CandleChartDrawer#1.draw"}
+
+
+def test_signals():
+    profiler = FrameProfiler(window=4, report_interval=3, budget_ms=5)
+    profiled, exceeded, reported = [], [], []
+    profiler.frame_profiled.connect(profiled.append)
+    profiler.budget_exceeded.connect(exceeded.append)
+    profiler.stats_updated.connect(reported.append)
+
+    profiles = [profile_frame(profiler, 0.01 if i == 1 else 0) for i in range(6)]
+    assert profiled == profiles
+    assert exceeded == [profiles[1]]
+    assert len(reported) == 2 and reported[-1] is profiler.last_stats
+    # stats of the latest 4 frames
+    assert list(profiler.profiles) == profiles[2:]
+    stats = profiler.stats()
+    assert set(stats) == {"total", "outer", "outer/inner"}
+    assert set(stats["total"]) == {"p50", "p95", "p99", "max"}
+    assert stats["total"]["max"] == pytest.approx(max(p.total for p in profiles[2:]) * 1000)
+
+    profiler.clear()
+    assert profiler.stats() == {} and profiler.last_stats == {}
+
+
+def test_chart_frames_are_profiled(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = create_chart(data_source)
+    chart.use_layer_cache = False  # every section is entered
+    chart.set_x_range(0, 100)
+    chart.profiler = profiler = FrameProfiler()
+    chart.grab()
+    chart.profiler_hud_visible = True
+    chart.grab()
+
+    assert len(profiler.profiles) == 2
+    sections = profiler.profiles[-1].sections
+    for name in (
+        "prepare_painting",
+        "paint_axis",
+        "paint_drawers",
+        "paint_drawers/CandleChartDrawer#0.draw",
+        "paint_box_edge",
+        "overlay",
+    ):
+        assert name in sections
+
+    chart.profiler = None
+    chart.grab()
+    assert len(profiler.profiles) == 2
+
+
+def test_names_of_collected_owners_are_not_reused():
+    profiler = FrameProfiler()
+    drawer = CandleChartDrawer(DataSource())
+    assert profiler.name_of(drawer) == "CandleChartDrawer#0"
+    del drawer
+    gc.collect()
+    assert len(profiler._names) == 0
+    assert profiler.name_of(CandleChartDrawer(DataSource())) == "CandleChartDrawer#1"
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from chart import Pyramid
+
+from conftest import candle_columns, candle_data_source
+
+
+def assert_level(pyramid: "Pyramid", level: int):
+    """items of level equal merging records of every 2^level aligned group"""
+    ds = pyramid.data_source
+    n = len(ds)
+    items = pyramid.get(level, 0, n)
+    width = 1 << level
+    starts = np.arange(0, n, width)
+    np.testing.assert_array_equal(items.begins, starts)
+    np.testing.assert_array_equal(items.ends, np.minimum(starts + width, n))
+    lows, highs = ds.column("low_price"), ds.column("high_price")
+    np.testing.assert_array_equal(items.lows, np.minimum.reduceat(lows, starts))
+    np.testing.assert_array_equal(items.highs, np.maximum.reduceat(highs, starts))
+    np.testing.assert_array_equal(items.opens, ds.column("open_price")[starts])
+    np.testing.assert_array_equal(
+        items.closes, ds.column("close_price")[np.minimum(starts + width, n) - 1]
+    )
+
+
+@pytest.mark.parametrize(
+    "bars_per_pixel, level",
+    [(0.5, 0), (1, 0), (3.9, 0), (4, 1), (7.9, 1), (8, 2), (100, 5), (1000, 8)],
+)
+def test_level_for_bars_per_pixel(bars_per_pixel, level):
+    # the coarsest level whose items are at most half a pixel wide
+    pyramid = Pyramid.candle(candle_data_source(5000))
+    assert pyramid.level_for(bars_per_pixel) == level
+    assert (1 << level) <= max(bars_per_pixel / 2, 1)
+
+
+def test_level_for_is_limited_by_number_of_bars():
+    # 5 levels: 1, 2, 4, 8 and 16 records per item, the last one has a single item
+    pyramid = Pyramid.candle(candle_data_source(10))
+    assert pyramid.level_for(1e6) == 4
+
+
+def test_levels_are_updated_incrementally():
+    data_source = candle_data_source(1000)
+    pyramid = Pyramid.candle(data_source)
+    for level in range(4):
+        assert_level(pyramid, level)
+    index = data_source.min_max_index("low_price", "high_price")
+
+    data_source.extend_columns(**candle_columns(37, seed=1))
+    for level in range(4):
+        assert_level(pyramid, level)
+    # the same index is extended by the new bars only
+    assert data_source.min_max_index("low_price", "high_price") is index
+    assert len(index) == 1037
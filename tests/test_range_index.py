@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from chart import MinMaxIndex
+
+
+def assert_queries(index: "MinMaxIndex", lows: "np.ndarray", highs: "np.ndarray"):
+    n = len(lows)
+    assert len(index) == n
+    for begin in range(0, n + 1):
+        for end in range(begin, n + 2):
+            expected = (
+                None if begin >= min(end, n)
+                else (lows[begin:end].min(), highs[begin:end].max())
+            )
+            assert index.query(begin, end) == expected, (begin, end)
+
+
+@pytest.fixture()
+def values():
+    random = np.random.default_rng(0)
+    lows = random.normal(0, 10, 70)
+    return lows, lows + random.uniform(0, 5, 70)
+
+
+def test_extend(values):
+    lows, highs = values
+    index = MinMaxIndex()
+    assert index.query(0, 10) is None
+    for begin, end in ((0, 1), (1, 17), (17, 33), (33, 70)):
+        index.extend(lows[begin:end], highs[begin:end])
+        assert_queries(index, lows[:end], highs[:end])
+
+
+def test_set_range(values):
+    lows, highs = values
+    index = MinMaxIndex()
+    index.extend(lows, highs)
+    lows, highs = lows.copy(), highs.copy()
+    lows[20:25], highs[20:25] = -100, 100
+    index.set_range(20, lows[20:25], highs[20:25])
+    assert_queries(index, lows, highs)
+    with pytest.raises(IndexError):
+        index.set_range(71, [1], [2])
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 33, 64, 69, 70])
+def test_truncate(values, size):
+    lows, highs = values
+    index = MinMaxIndex()
+    index.extend(lows, highs)
+    index.truncate(size)
+    assert_queries(index, lows[:size], highs[:size])
+    # still usable after truncation
+    index.extend(lows[size:], highs[size:])
+    assert_queries(index, lows, highs)
+
+
+@pytest.mark.parametrize("begin, end", [(0, 1), (0, 70), (10, 11), (5, 40), (64, 70), (69, 80)])
+def test_delete(values, begin, end):
+    lows, highs = values
+    index = MinMaxIndex()
+    index.extend(lows, highs)
+    index.delete(begin, end)
+    kept = np.r_[0:begin, min(end, 70):70]
+    assert_queries(index, lows[kept], highs[kept])
+
+
+def test_clear(values):
+    lows, highs = values
+    index = MinMaxIndex()
+    index.extend(lows, highs)
+    index.clear()
+    assert len(index) == 0 and index.query(0, 70) is None
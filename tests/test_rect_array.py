@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from PyQt5.QtCore import QLineF, QRectF
+
+from chart import RectArray
+from chart import rect_array
+from chart.rect_array import line_array
+
+
+def item_values(indexes, rects_per_item: int = 2) -> "np.ndarray":
+    """rects_per_item rects for every index, centered on index + 0.5 like rects of drawers"""
+    rows = []
+    for index in indexes:
+        for j in range(rects_per_item):
+            width = 0.5 / (j + 1)
+            rows.append([index + 0.5 - 0.5 * width, index * 10 + j, width, j + 1])
+    return np.array(rows, dtype="f8").reshape(len(indexes), rects_per_item * 4)
+
+
+def as_tuples(rects) -> list:
+    return [(r.left(), r.top(), r.width(), r.height()) for r in rects]
+
+
+def expected_tuples(indexes, rects_per_item: int = 2) -> list:
+    return [tuple(row) for row in item_values(indexes, rects_per_item).reshape(-1, 4).tolist()]
+
+
+@pytest.fixture(params=[True, False], ids=["sip.array", "list"])
+def use_sip_array(request, monkeypatch):
+    if request.param and not rect_array.HAS_SIP_ARRAY:
+        pytest.skip("sip.array is not available")
+    monkeypatch.setattr(rect_array, "HAS_SIP_ARRAY", request.param)
+    return request.param
+
+
+def test_extend_and_rects(use_sip_array):
+    array = RectArray(2, capacity=4)  # grows several times
+    indexes = np.array([0, 1, 2, 5, 6, 9, 10, 11, 12, 13])
+    array.extend(indexes[:3], item_values(indexes[:3]))
+    array.extend(indexes[3:], item_values(indexes[3:]))
+
+    assert len(array) == 10
+    np.testing.assert_array_equal(array.indexes, indexes)
+    assert as_tuples(array.rects(0, 100)) == expected_tuples(indexes)
+    # items whose index is in [begin, end)
+    assert as_tuples(array.rects(3, 10)) == expected_tuples([5, 6, 9])
+    assert as_tuples(array.rects(7, 9)) == []
+    assert array.find(3, 10) == (3, 6)
+    rects = array.rects(5, 6)
+    assert all(isinstance(r, QRectF) for r in rects)
+
+
+def test_insert(use_sip_array):
+    array = RectArray(2)
+    array.extend(np.array([5, 6, 10]), item_values([5, 6, 10]))
+    array.insert(np.array([1, 2]), item_values([1, 2]))  # before all
+    array.insert(np.array([7, 8]), item_values([7, 8]))  # in the middle
+    array.insert(np.array([11]), item_values([11]))  # at the end
+    indexes = [1, 2, 5, 6, 7, 8, 10, 11]
+    np.testing.assert_array_equal(array.indexes, indexes)
+    assert as_tuples(array.rects(0, 100)) == expected_tuples(indexes)
+
+
+def test_clear(use_sip_array):
+    array = RectArray(1)
+    array.extend(np.arange(3), item_values(range(3), 1))
+    array.clear()
+    assert len(array) == 0
+    assert as_tuples(array.rects(0, 10)) == []
+    array.extend(np.arange(2), item_values(range(2), 1))
+    assert as_tuples(array.rects(0, 10)) == expected_tuples(range(2), 1)
+
+
+@pytest.mark.parametrize("begin, end", [(0, 2), (2, 4), (5, 7), (8, 20), (12, 20), (3, 4)])
+def test_remove_shifts_following_items(use_sip_array, begin, end):
+    array = RectArray(2)
+    array.extend(np.arange(10), item_values(range(10)))
+    array.remove(begin, end)
+    # items after the removed ones move forward, as if their records were moved:
+    # their indexes and lefts decrease by (end - begin), other values are kept
+    kept = [i for i in range(10) if not begin <= i < end]
+    indexes = [i if i < begin else i - (end - begin) for i in kept]
+    values = item_values(kept).reshape(-1, 4)
+    values[:, 0] = np.repeat(indexes, 2) + 0.5 - 0.5 * values[:, 2]
+    np.testing.assert_array_equal(array.indexes, indexes)
+    assert as_tuples(array.rects(-100, 100)) == [tuple(i) for i in values.tolist()]
+
+
+@pytest.mark.parametrize("begin, end", [(0, 2), (5, 7), (8, 10)])
+def test_remove_without_shift(use_sip_array, begin, end):
+    array = RectArray(2)
+    array.extend(np.arange(10), item_values(range(10)))
+    array.remove(begin, end, shift=False)
+    indexes = [i for i in range(10) if not begin <= i < end]
+    np.testing.assert_array_equal(array.indexes, indexes)
+    assert as_tuples(array.rects(0, 100)) == expected_tuples(indexes)
+
+
+def test_line_array(use_sip_array):
+    values = np.array([[0, 1, 2, 3], [4.5, 5.5, 6.5, 7.5], [-1, 0, 1e9, 0.25]])
+    lines = line_array(values)
+    assert [(i.x1(), i.y1(), i.x2(), i.y2()) for i in lines] == [
+        tuple(row) for row in values.tolist()
+    ]
+    assert all(isinstance(i, QLineF) for i in lines)
+
+
+def test_line_array_empty(use_sip_array):
+    assert len(line_array(np.empty((0, 4)))) == 0
@@ -0,0 +1,71 @@
+import time
+
+from PyQt5.QtCore import QEvent
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+from chart import DataSource
+
+from conftest import candles, create_chart, wait_until
+
+
+def create_async_chart():
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = create_chart(data_source)
+    chart.use_layer_cache = False
+    chart.use_async_render = True
+    chart.set_x_range(0, 100)
+    return chart, data_source
+
+
+def rendered_frames(chart, data_source) -> list:
+    """frames rendered from now on, the first one is being rendered"""
+    frames = []
+    with data_source.lock:  # the first frame waits until connected
+        chart.grab()  # create the render thread
+        chart._render_thread.frame_ready.connect(frames.append)
+    return frames
+
+
+def test_async_frame_equals_render_to_image(app):
+    chart, _ = create_async_chart()
+    chart.grab()  # request the first frame
+    wait_until(lambda: chart._frame is not None)
+
+    shown = chart.grab().toImage().convertToFormat(QImage.Format_RGB32)
+    assert shown == chart.render_to_image().convertToFormat(QImage.Format_RGB32)
+
+
+def test_requests_during_a_render_give_one_frame(app):
+    chart, data_source = create_async_chart()
+    frames = rendered_frames(chart, data_source)
+    wait_until(lambda: len(frames) == 1)
+
+    thread = chart._render_thread
+    with data_source.lock:  # blocks the render thread
+        chart.set_x_range(10, 110)
+        chart.grab()
+        wait_until(lambda: thread._request is None)  # being rendered
+        for i in range(20, 60, 10):
+            chart.set_x_range(i, i + 100)
+            chart.grab()
+    wait_until(lambda: len(frames) == 3)
+    wait_until(lambda: chart._frame is frames[-1])
+    time.sleep(0.05)
+    QApplication.processEvents()
+
+    assert [(f.config.begin, f.config.end) for f in frames[1:]] == [(10, 110), (50, 150)]
+    assert chart.x_range == (50, 150)
+
+
+def test_render_thread_is_stopped_with_chart(app):
+    chart, data_source = create_async_chart()
+    frames = rendered_frames(chart, data_source)
+    thread = chart._render_thread
+    wait_until(lambda: len(frames) == 1)
+    assert thread.isRunning()
+
+    chart.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert thread.isFinished()
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from chart import CandleChartDrawer, RingDataSource
+
+from conftest import record, record_signals
+
+
+def test_append_evicts_oldest_records():
+    data_source = RingDataSource(3)
+    emitted = record_signals(data_source)
+    for i in range(5):
+        data_source.append(i)
+    assert emitted == [
+        ("data_appended", 0, 1),
+        ("data_appended", 1, 2),
+        ("data_appended", 2, 3),
+        ("data_evicted", 0, 1),
+        ("data_appended", 3, 4),
+        ("data_evicted", 1, 2),
+        ("data_appended", 4, 5),
+    ]
+    # indexes are stable: record i is still at index i
+    assert len(data_source) == 5
+    assert data_source.first_index == 2
+    assert [data_source[i] for i in range(2, 5)] == [2, 3, 4]
+    assert data_source[-1] == 4
+    assert data_source[:] == [2, 3, 4]
+    assert data_source[3:] == [3, 4]
+
+
+def test_extend_evicts_in_one_signal():
+    data_source = RingDataSource(4)
+    data_source.extend(range(3))
+    emitted = record_signals(data_source)
+    data_source.extend(range(3, 10))  # more than capacity
+    assert emitted == [("data_evicted", 0, 3), ("data_appended", 3, 10)]
+    assert data_source[:] == [6, 7, 8, 9]
+
+
+@pytest.mark.parametrize("index", [0, 1, -5, 5])
+def test_evicted_records_are_unavailable(index):
+    data_source = RingDataSource(3)
+    data_source.extend(range(5))
+    with pytest.raises(IndexError):
+        data_source[index]
+    with pytest.raises(IndexError):
+        data_source.update(index, 0)
+
+
+def test_min_max_across_wrap_around():
+    values = np.random.default_rng(0).normal(0, 10, 50).tolist()
+    data_source = RingDataSource(8)
+    for i, value in enumerate(values):
+        data_source.append(value)
+        first = data_source.first_index
+        for begin in range(first, i + 1):
+            expected = min(values[begin: i + 1]), max(values[begin: i + 1])
+            assert data_source.min_max(begin, i + 1) == expected
+    assert data_source.min_max(0, 10) is None  # evicted
+    data_source.update(45, 1000.0)
+    assert data_source.min_max(42, 50)[1] == 1000
+
+
+def test_min_max_of_fields():
+    data_source = RingDataSource(4)
+    data_source.extend([record(i) for i in range(6)])
+    assert data_source.min_max(0, 6, "low_price", "high_price") == (1, 6)
+
+
+def test_drawer_cache_follows_eviction():
+    data_source = RingDataSource(10)
+    data_source.extend([record(i) for i in range(10)])
+    drawer = CandleChartDrawer(data_source)
+    drawer._cache.ensure(0, 10)
+
+    data_source.extend([record(i) for i in range(10, 14)])
+    cache = drawer._cache
+    assert (cache.begin, cache.end) == (4, 10)
+    cached = sorted(cache.first.indexes.tolist() + cache.second.indexes.tolist())
+    assert cached == list(range(4, 10))
+    cache.ensure(data_source.first_index, len(data_source))
+    cached = sorted(cache.first.indexes.tolist() + cache.second.indexes.tolist())
+    assert cached == list(range(4, 14))
+
+
+def test_unsupported_operations():
+    data_source = RingDataSource(3)
+    data_source.extend(range(5))
+    assert not data_source.supports_pyramid
+    with pytest.raises(TypeError, match="evicted"):
+        del data_source[3]
+    with pytest.raises(TypeError, match="min_max"):
+        data_source.min_max_index()
+    assert data_source[:] == [2, 3, 4]
+
+
+@pytest.mark.parametrize("capacity", [0, -1])
+def test_capacity_must_be_positive(capacity):
+    with pytest.raises(ValueError, match="capacity"):
+        RingDataSource(capacity)
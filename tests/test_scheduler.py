@@ -0,0 +1,68 @@
+import time
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QRegion
+
+from chart import ChartWidget, FrameScheduler
+
+from conftest import wait_until
+
+
+def create_charts(scheduler: "FrameScheduler", n: int) -> list:
+    """charts using scheduler, recording arguments of every update() into chart.updates"""
+    charts = []
+    for _ in range(n):
+        chart = ChartWidget()
+        chart.scheduler = scheduler
+        chart.updates = []
+        chart.update = lambda *args, chart=chart: chart.updates.append(args)
+        charts.append(chart)
+    return charts
+
+
+def record_flushes(scheduler: "FrameScheduler") -> list:
+    """[(perf_counter(), number of charts)] of every flush from now on"""
+    flushes = []
+    scheduler.flushed.connect(lambda n: flushes.append((time.perf_counter(), n)))
+    return flushes
+
+
+def test_requests_are_merged(app):
+    scheduler = FrameScheduler()
+    flushes = record_flushes(scheduler)
+    first, second = create_charts(scheduler, 2)
+    for i in range(10):
+        first.set_x_range(i, i + 100)
+        second.schedule_repaint()
+    wait_until(lambda: flushes)
+
+    assert [n for _, n in flushes] == [2]
+    assert first.updates == [()] and second.updates == [()]
+
+
+def test_rects_are_merged(app):
+    scheduler = FrameScheduler()
+    flushes = record_flushes(scheduler)
+    partial, whole = create_charts(scheduler, 2)
+    partial.schedule_repaint(QRect(0, 0, 10, 10))
+    partial.schedule_repaint(QRect(20, 0, 10, 10))
+    whole.schedule_repaint(QRect(0, 0, 10, 10))
+    whole.schedule_repaint()
+    wait_until(lambda: flushes)
+
+    expected = QRegion(QRect(0, 0, 10, 10)).united(QRect(20, 0, 10, 10))
+    assert partial.updates == [(expected,)]
+    assert whole.updates == [()]
+
+
+def test_max_fps(app):
+    scheduler = FrameScheduler(max_fps=20)
+    flushes = record_flushes(scheduler)
+    chart, = create_charts(scheduler, 1)
+    for i in range(3):
+        chart.schedule_repaint()
+        wait_until(lambda: len(flushes) == i + 1)
+
+    intervals = [b - a for (a, _), (b, _) in zip(flushes, flushes[1:])]
+    assert min(intervals) >= scheduler.frame_interval * 0.9
+    assert len(chart.updates) == 3
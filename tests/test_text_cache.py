@@ -0,0 +1,46 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter
+
+from chart import DataSource, TextCache
+
+from conftest import candles, create_chart
+
+
+def test_lru_eviction(app):
+    image = QImage(100, 100, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    font_key = painter.font().key()
+    cache = TextCache(capacity=2)
+    a = cache.get(painter, "a", Qt.AlignLeft, font_key)
+    cache.get(painter, "b", Qt.AlignLeft, font_key)
+    assert cache.get(painter, "a", Qt.AlignLeft, font_key) is a  # b is the oldest now
+    cache.get(painter, "c", Qt.AlignLeft, font_key)
+    assert len(cache) == 2 and (cache.hits, cache.misses) == (1, 3)
+
+    assert cache.get(painter, "a", Qt.AlignLeft, font_key) is a
+    cache.get(painter, "b", Qt.AlignLeft, font_key)
+    assert (cache.hits, cache.misses) == (2, 4)
+    # texts of other fonts are cached separately
+    cache.get(painter, "a", Qt.AlignLeft, font_key + "bold")
+    assert (cache.hits, cache.misses) == (2, 5)
+
+    static_text, width, height = cache.get(painter, "a\nb", Qt.AlignLeft, font_key)
+    assert static_text is None and height > a[2]
+    painter.end()
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cached_labels_equal_uncached(app):
+    data_source = DataSource()
+    data_source.extend(candles(0, 90))
+    chart = create_chart(data_source)
+    chart.set_x_range(0, 100)
+    chart.render_to_image()
+    cached = chart.render_to_image()  # with texts from text cache
+    drawers = [axis.label_drawer for axis in chart.all_axis]
+    assert all(drawer.text_cache.hits for drawer in drawers)
+
+    for drawer in drawers:
+        drawer.use_text_cache = False
+    assert chart.render_to_image() == cached
@@ -0,0 +1,73 @@
+import pytest
+
+from chart import TickGenerator, nice_step
+
+
+@pytest.mark.parametrize(
+    "step, min_step, nice",
+    [
+        (1, 0, 1),
+        (1.01, 0, 2),
+        (2, 0, 2),
+        (3, 0, 5),
+        (7, 0, 10),
+        (42, 0, 50),
+        (0.3, 0, 0.5),
+        (0.011, 0, 0.02),
+        (0.3, 1, 1),
+        (0, 0, 1),
+        (0, 5, 5),
+        (float("nan"), 0, 1),
+        (float("inf"), 0, 1),
+    ],
+)
+def test_nice_step(step, min_step, nice):
+    assert nice_step(step, min_step) == nice
+
+
+def test_ticks():
+    generator = TickGenerator(max_count=5)
+    ticks = generator.ticks(0.1, 1.05, 500, 20)
+    assert ticks.step == 0.2
+    assert ticks.values == (0.2, 0.4, 0.6, 0.8, 1.0)
+    # ticks are at least min_spacing apart
+    assert generator.ticks(0, 100, 500, 60).values == (0, 20, 40, 60, 80)
+    # ticks closer than margin pixels to begin or end are skipped
+    assert generator.ticks(0, 100, 500, 60, margin=50).values == (20, 40, 60, 80)
+    assert generator.ticks(0, 0, 500, 60).values == ()
+
+
+def test_integer_ticks():
+    generator = TickGenerator(max_count=5, integer=True)
+    assert generator.ticks(0, 3, 500, 10).values == (0, 1, 2)
+    assert generator.ticks(103, 113, 100, 10).values == (104, 106, 108, 110, 112)
+
+
+def test_ticks_dont_move_while_scrolling():
+    generator = TickGenerator(max_count=5, integer=True)
+    ticks = [generator.ticks(begin, begin + 100, 500, 20).values for begin in range(0, 50, 7)]
+    assert all(set(i) & set(j) for i, j in zip(ticks, ticks[1:]))
+    assert all(value % 20 == 0 for values in ticks for value in values)
+
+
+def test_ticks_are_memoized():
+    generator = TickGenerator(capacity=2)
+    calls = []
+    generate = generator._generate
+    generator._generate = lambda *args: calls.append(args) or generate(*args)
+
+    first = generator.ticks(0, 10, 100, 10)
+    assert generator.ticks(0, 10, 100, 10) is first
+    generator.ticks(0, 20, 100, 10)
+    generator.ticks(0, 10, 100, 10)  # moved to the newest
+    generator.ticks(0, 30, 100, 10)  # evicts (0, 20)
+    assert generator.ticks(0, 10, 100, 10) is first
+    assert len(calls) == 3
+    generator.ticks(0, 20, 100, 10)
+    assert len(calls) == 4
+
+    # settings are part of the key
+    generator.max_count = 3
+    assert generator.ticks(0, 10, 100, 10) is not first
+    generator.clear()
+    assert generator.ticks(0, 10, 100, 10) is not first